@@ -1,2 +1,2 @@
 from .user import UserAdmin
-from .ctypyo import CurrencyAdmin, BlockAdmin, ProviderAdmin
\ No newline at end of file
+from .ctypyo import CurrencyAdmin, BlockAdmin, ProviderAdmin, TransactionAdmin, IngestEventAdmin
\ No newline at end of file
@@ -1,15 +1,69 @@
 from django.contrib import admin
 
-from ..models import Currency, Block, Provider
+from ..api.latest_blocks import latest_blocks
+from ..models import Currency, Block, IngestEvent, Provider, Transaction
+from .paginator import EstimatedCountPaginator
 
 @admin.register(Currency)
 class CurrencyAdmin(admin.ModelAdmin):
-    pass
+    list_display = ("id", "name")
+    search_fields = ("name",)
+    ordering = ("name",)
 
 @admin.register(Block)
 class BlockAdmin(admin.ModelAdmin):
-    pass
+    list_display = ("id", "currency", "block_number", "provider_names", "created_at", "stored_at")
+    list_select_related = ("currency",)
+    # currency and providers are small tables; both filters hit indexed FKs
+    list_filter = ("currency", "providers")
+    date_hierarchy = "stored_at"
+    ordering = ("-stored_at",)
+    # exact match on the (currency, block_number) index instead of LIKE scans
+    search_fields = ("=block_number",)
+    autocomplete_fields = ("currency", "providers")
+    paginator = EstimatedCountPaginator
+    # skip the second, unfiltered COUNT(*) behind "N total"
+    show_full_result_count = False
+
+    def get_queryset(self, request):  # type: ignore
+        return super().get_queryset(request).prefetch_related("providers")
+
+    def save_related(self, request, form, formsets, change):  # type: ignore
+        super().save_related(request, form, formsets, change)
+        # Blocks added here bypass store_block's push into the Redis window
+        latest_blocks.invalidate()
+
+    @admin.display(description="Providers")
+    def provider_names(self, obj: Block) -> str:
+        return ", ".join(provider.name for provider in obj.providers.all())
 
 @admin.register(Provider)
 class ProviderAdmin(admin.ModelAdmin):
-    pass
\ No newline at end of file
+    # api_key stays on the change form only
+    list_display = ("id", "name")
+    search_fields = ("name",)
+    ordering = ("name",)
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = ("id", "block", "index", "hash", "sender", "recipient", "value", "failed")
+    list_select_related = ("block",)
+    # the table grows by hundreds of rows per block: index-backed exact matches only
+    search_fields = ("=hash",)
+    raw_id_fields = ("block",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(IngestEvent)
+class IngestEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "provider", "currency", "block", "fetched_at")
+    list_select_related = ("provider", "currency", "block")
+    list_filter = ("provider", "currency")
+    date_hierarchy = "fetched_at"
+    ordering = ("-fetched_at",)
+    raw_id_fields = ("block",)
+    # a record of what the provider sent; not edited by hand
+    readonly_fields = ("currency", "provider", "block", "fetched_at", "payload")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,39 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the planner's row estimate for unfiltered changelists.
+
+    ``COUNT(*)`` over a large Postgres table is a full scan. When the
+    changelist isn't filtered, ``pg_class.reltuples`` (kept current by
+    autovacuum/ANALYZE) is close enough for page links. Small tables,
+    filtered querysets and other backends still get an exact count.
+    """
+
+    exact_count_below = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._estimate()
+        if estimate is None or estimate < self.exact_count_below:
+            return super().count
+        return estimate
+
+    def _estimate(self):  # type: ignore[no-untyped-def]
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is None or query.where or query.distinct or query.combinator:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 for tables that were never vacuumed/analyzed
+        return int(row[0]) if row and row[0] >= 0 else None
@@ -1,3 +1,13 @@
-from .auth import AuthAPI
-from .user import UserAPI
-from .crypto import CryptoAPI
+import importlib
+
+# Resolved on first use so workers importing app.api.serializers or
+# app.api.latest_blocks don't load the FastAPI stack.
+_EXPORTS = {"AuthAPI": ".auth", "UserAPI": ".user", "CryptoAPI": ".crypto"}
+
+__all__ = tuple(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,250 @@
+"""Two-tier cache for single-block lookups.
+
+An in-process LRU (L1) sits in front of Redis (L2). Entries hold the full
+block payload, stored under the block's id, its (currency, number) key and
+its hash, so any lookup fills the others. Lookups that found nothing are
+cached too, briefly, because clients poll heights that haven't been
+ingested yet.
+
+Saving, deleting or re-linking a block busts its keys (``store_block``
+included, through the signals below), as does deleting a provider. Keys are
+gathered per transaction and busted in one call once it commits, so
+deleting many blocks doesn't cost a query and a DEL per row. Busting only
+reaches this process's L1, so L1 keeps misses for at most ``L1_MISS_TTL``
+seconds and the short ``BLOCK_CACHE_MISS_TTL`` bounds them in Redis.
+Blocks replaced by a reorg stay in other processes' L1 for up to
+``BLOCK_CACHE_L1_TTL``.
+
+A bust doesn't delete keys but overwrites them with a ``BUSTED`` marker for
+``BLOCK_CACHE_BUST_TTL`` seconds, and fills only write keys that are absent
+(``SET NX``). A request that read the old row before the bust, or from a
+lagging replica after it, can't put it back. Lookups treat the marker as a
+miss. Renaming a currency or
+provider doesn't bust anything; cached payloads carry the old name for up
+to ``BLOCK_CACHE_TTL``.
+"""
+
+import asyncio
+import threading
+import time
+from logging import getLogger
+from typing import Any, Iterable, Optional
+
+import orjson
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from redis.exceptions import RedisError
+
+from app.models.crypto import Block, Currency, Provider
+from config.cache import LRUCache
+from config.db import on_commit_once
+from config.redis import get_redis
+
+logger = getLogger(__name__)
+
+# Stored for lookups that found nothing
+MISSING = b""
+# Stored over busted keys until BLOCK_CACHE_BUST_TTL passes
+BUSTED = b"\x00busted"
+L1_MISS_TTL = 1.0
+# Blocks stored this recently may still be getting their providers linked,
+# so they are only cached as briefly as misses.
+SETTLE_SECONDS = 10.0
+
+
+def id_key(block_id: int) -> str:
+    return f"blocks:id:{block_id}"
+
+
+def number_key(currency_name: str, block_number: int) -> str:
+    return f"blocks:number:{currency_name.lower()}:{block_number}"
+
+
+def hash_key(block_hash: str) -> str:
+    return f"blocks:hash:{block_hash}"
+
+
+def block_keys(block_id: int, currency_name: str, block_number: int, block_hash: Optional[str]) -> tuple[str, ...]:
+    keys = (id_key(block_id), number_key(currency_name, block_number))
+    return (*keys, hash_key(block_hash)) if block_hash else keys
+
+
+class BlockCache:
+    """L1 (process) + L2 (Redis) cache of block payloads and misses."""
+
+    # After a Redis error the L2 is skipped for this long.
+    backoff_seconds = 5.0
+
+    def __init__(self, ttl: float, miss_ttl: float, l1_size: int, l1_ttl: float, bust_ttl: float) -> None:
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.bust_ttl = bust_ttl
+        self.l1 = LRUCache(maxsize=l1_size, ttl=l1_ttl)
+        self._skip_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get(self, key: str) -> tuple[bool, Optional[dict[str, Any]]]:
+        """(hit, block); a hit with ``None`` is a cached miss"""
+        if not self.enabled:
+            return False, None
+        value = self.l1.get(key)
+        if value is None and self._l2_available():
+            try:
+                value = await asyncio.to_thread(get_redis().get, key)
+            except RedisError:
+                self._l2_failed()
+            if value == BUSTED:
+                value = None
+            elif value is not None:
+                value = orjson.loads(value) if value != MISSING else MISSING
+                self._l1_set(key, value, ttl=None if value is not MISSING else min(L1_MISS_TTL, self.miss_ttl))
+        if value is None or value is BUSTED:
+            return False, None
+        return True, None if value is MISSING else value
+
+    async def set(self, block: dict[str, Any]) -> None:
+        """Cache a block under all of its keys"""
+        if not self.enabled:
+            return
+        keys = block_keys(block["id"], block["currency"]["name"], block["block_number"], block.get("hash"))
+        settled = time.time() - block["stored_at"].timestamp() > SETTLE_SECONDS
+        ttl = self.ttl if settled else self.miss_ttl
+        for key in keys:
+            self._l1_set(key, block, ttl=None if settled else min(L1_MISS_TTL, ttl))
+        await self._l2_set(keys, orjson.dumps(block), ttl)
+
+    async def set_missing(self, key: str) -> None:
+        if not self.enabled:
+            return
+        self._l1_set(key, MISSING, ttl=min(L1_MISS_TTL, self.miss_ttl))
+        await self._l2_set((key,), MISSING, self.miss_ttl)
+
+    def bust(self, *keys: str) -> None:
+        if not self.enabled:
+            return
+        for key in keys:
+            self.l1.set(key, BUSTED, ttl=self.bust_ttl)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for key in keys:
+                pipe.set(key, BUSTED, px=int(self.bust_ttl * 1000))
+            pipe.execute()
+        except RedisError:
+            logger.warning("Could not bust block cache keys %s", keys, exc_info=True)
+
+    def _l1_set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if self.l1.get(key) is not BUSTED:
+            self.l1.set(key, value, ttl=ttl)
+
+    async def _l2_set(self, keys: tuple[str, ...], value: bytes, ttl: float) -> None:
+        if not self._l2_available():
+            return
+
+        def _write() -> None:
+            pipe = get_redis().pipeline(transaction=False)
+            for key in keys:
+                pipe.set(key, value, px=int(ttl * 1000), nx=True)
+            pipe.execute()
+
+        try:
+            await asyncio.to_thread(_write)
+        except RedisError:
+            self._l2_failed()
+
+    def _l2_available(self) -> bool:
+        return time.monotonic() >= self._skip_until
+
+    def _l2_failed(self) -> None:
+        self._skip_until = time.monotonic() + self.backoff_seconds
+        # Logged quietly: while Redis is down this happens on every lookup
+        logger.debug("Block cache L2 unavailable, using L1 and the database", exc_info=True)
+
+
+block_cache = BlockCache(
+    ttl=settings.BLOCK_CACHE_TTL,
+    miss_ttl=settings.BLOCK_CACHE_MISS_TTL,
+    l1_size=settings.BLOCK_CACHE_L1_SIZE,
+    l1_ttl=settings.BLOCK_CACHE_L1_TTL,
+    bust_ttl=settings.BLOCK_CACHE_BUST_TTL,
+)
+
+
+def bust_block(block: Block) -> None:
+    block_cache.bust(*block_keys(block.pk, block.currency.name, block.block_number, block.hash))
+
+
+class PendingBusts(threading.local):
+    """Keys to bust when the current transaction commits.
+
+    Connections are per thread, and so are their transactions.
+    """
+
+    def __init__(self) -> None:
+        self.keys: set[str] = set()
+        # Currency names looked up for blocks whose currency isn't loaded
+        self.currency_names: dict[int, str] = {}
+
+
+_pending = PendingBusts()
+
+
+def _flush_busts() -> None:
+    keys, _pending.keys = _pending.keys, set()
+    _pending.currency_names.clear()
+    if keys:
+        block_cache.bust(*keys)
+
+
+def bust_on_commit(keys: Iterable[str]) -> None:
+    # Keys left over from a rolled back transaction are busted with the next one
+    _pending.keys.update(keys)
+    on_commit_once(_flush_busts)
+
+
+def _currency_name(block: Block) -> str:
+    if Block.currency.is_cached(block):
+        return block.currency.name
+    # Cascading deletes hand over blocks without their currency: one lookup per currency
+    name = _pending.currency_names.get(block.currency_id)
+    if name is None:
+        name = Currency.objects.values_list("name", flat=True).get(pk=block.currency_id)
+        _pending.currency_names[block.currency_id] = name
+    return name
+
+
+def _instance_keys(block: Block) -> tuple[str, ...]:
+    return block_keys(block.pk, _currency_name(block), block.block_number, block.hash)
+
+
+def _linked_keys(**filters: Any) -> list[str]:
+    """Keys of the blocks matching ``filters``, in one query"""
+    rows = Block.objects.filter(**filters).values_list("pk", "currency__name", "block_number", "hash")
+    return [key for row in rows for key in block_keys(*row)]
+
+
+@receiver([post_save, pre_delete], sender=Block)
+def _bust_block_cache(sender, instance: Block, **kwargs) -> None:
+    bust_on_commit(_instance_keys(instance))
+
+
+@receiver(pre_delete, sender=Provider)
+def _bust_block_cache_on_provider_delete(sender, instance: Provider, **kwargs) -> None:
+    # The provider's links are deleted with it, without m2m_changed
+    bust_on_commit(_linked_keys(providers=instance))
+
+
+@receiver(m2m_changed, sender=Block.providers.through)
+def _bust_block_cache_on_providers(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            bust_on_commit(_instance_keys(instance))
+    elif action in ("post_add", "post_remove") and pk_set:
+        # Linked from the provider side: bust every affected block
+        bust_on_commit(_linked_keys(pk__in=pk_set))
+    elif action == "pre_clear":
+        # post_clear has no pk_set; collect the provider's blocks while still linked
+        bust_on_commit(_linked_keys(providers=instance))
@@ -1,193 +1,426 @@
-from typing import Optional, List
-from django.core.paginator import Paginator
-from django.db.models import Q
-from asgiref.sync import sync_to_async
-from fastapi import HTTPException, Depends, Query
+import asyncio
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Any, Optional
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from fastapi import HTTPException, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from app.models import User
-from app.models.crypto import Currency, Provider, Block
-from app.schemas.crypto import (
-    BlockSchema,
-    BlockListResponse,
-    ProviderSchema,
-    CurrencySchema
+from app.models.crypto import Block, Currency, Provider, Transaction
+from app.api.block_cache import block_cache, hash_key, id_key, number_key
+from app.api.latest_blocks import latest_blocks, parse_stored_at, project
+from app.api.serializers import (
+    ALL_BLOCK_FIELDS,
+    BLOCK_FIELD_COLUMNS,
+    DEFAULT_BLOCK_FIELDS,
+    normalize_block_hash,
+    serialize_blocks,
+    serialize_currencies,
+    serialize_provider_detail,
+    serialize_providers,
+    serialize_transactions,
 )
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, get_current_admin_user
+from config.cache import LRUCache
+from config.db import run_db
+from config.db_router import replica_reads
+from config.singleflight import SingleFlight
+from config.http import has_conditional_headers, is_not_modified, make_etag, not_modified, validator_headers
+
+EXPANDABLE = {"providers"}
+
+# Identical concurrent reads share one DB round trip; see config.singleflight.
+blocks_flight = SingleFlight("blocks")
+block_flight = SingleFlight("block")
+
+# Provider credentials are served from their own cache so they never need to
+# ride along in block payloads. It is per process and deliberately not in
+# Redis, so API keys aren't copied there: saving or deleting a provider only
+# clears this process's entry, and other processes serve the old key for up
+# to PROVIDER_DETAIL_CACHE_TTL seconds.
+provider_detail_cache = LRUCache(maxsize=256, ttl=settings.PROVIDER_DETAIL_CACHE_TTL)
+
+
+@receiver([post_save, post_delete], sender=Provider)
+def _invalidate_provider_detail(sender, instance: Provider, **kwargs) -> None:
+    provider_detail_cache.delete(instance.pk)
+
+
+def parse_expand(expand: Optional[str]) -> set[str]:
+    """Parse a comma-separated ?expand= value"""
+    if not expand:
+        return set()
+    requested = {part.strip() for part in expand.split(",") if part.strip()}
+    unknown = requested - EXPANDABLE
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot expand: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def parse_block_fields(fields: Optional[str], expand: Optional[str]) -> tuple[str, ...]:
+    """Resolve ?fields= and ?expand= into the block fields to return, in schema order"""
+    if fields is not None:
+        requested = {part.strip() for part in fields.split(",") if part.strip()}
+        unknown = requested - BLOCK_FIELD_COLUMNS.keys()
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not requested:
+            # Would return every block as {}
+            raise HTTPException(status_code=400, detail="No fields requested")
+    else:
+        requested = set(DEFAULT_BLOCK_FIELDS)
+    requested |= parse_expand(expand)
+    return tuple(field for field in BLOCK_FIELD_COLUMNS if field in requested)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query timestamps without an offset are taken as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """The last id of the previous page; 400 for anything not produced by ``encode_cursor``"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _read(func):
+    """Run a read-only closure on the DB executor, allowing replica reads"""
+    with replica_reads():
+        return await run_db(func)
+
+
+async def _cached_block(key: str, queryset) -> Optional[dict[str, Any]]:
+    """Full block payload through the block cache, or None (cached as a miss)"""
+    hit, block = await block_cache.get(key)
+    if hit:
+        return block
+
+    async def _fetch():
+        blocks = await _read(lambda: serialize_blocks(queryset[:1], ALL_BLOCK_FIELDS))
+        if blocks:
+            await block_cache.set(blocks[0])
+            return blocks[0]
+        await block_cache.set_missing(key)
+        return None
+
+    return await block_flight.do(key, _fetch)
+
+
+def _respond(
+    request: Request, content: Any, etag: Optional[str] = None, last_modified: Optional[datetime] = None
+) -> Response:
+    """ORJSON response carrying validators, or 304 when the client's copy is current"""
+    etag = etag or make_etag(content)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    return ORJSONResponse(content, headers=validator_headers(etag, last_modified))
+
+
+def _blocks_page(
+    blocks: list[dict[str, Any]], total: int, page: int, page_size: int, etag: str, last_modified: Optional[datetime]
+) -> Response:
+    return ORJSONResponse(
+        {
+            "blocks": blocks,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        },
+        headers=validator_headers(etag, last_modified)
+    )
+
+
+def _blocks_query(
+    currency_name: Optional[str], provider_id: Optional[int], since: Optional[datetime], until: Optional[datetime]
+):
+    query = Block.objects.all()
+
+    if currency_name:
+        query = query.filter(currency__name__iexact=currency_name)
+
+    if provider_id:
+        query = query.filter(providers__id=provider_id)
+
+    # Chain time range, half-open
+    if since:
+        query = query.filter(created_at__gte=since)
+    if until:
+        query = query.filter(created_at__lt=until)
+
+    # Order by stored_at descending
+    return query.order_by('-stored_at')
+
+
+async def _window_blocks_page(
+    request: Request,
+    currency_name: Optional[str],
+    filters: tuple,
+    page: int,
+    page_size: int,
+    block_fields: tuple[str, ...],
+) -> Optional[Response]:
+    """A /blocks page from the Redis window without touching the DB, or None if it can't serve it"""
+    offset = (page - 1) * page_size
+    window = await blocks_flight.do(
+        ("window", *filters, page, page_size),
+        lambda: asyncio.to_thread(latest_blocks.read_page, currency_name, offset, page_size)
+    )
+    if window is None:
+        return None
+
+    version, total, blocks, newest = window
+    etag = make_etag(
+        "blocks", version, total, newest and newest["stored_at"], newest and newest["id"],
+        page, page_size, *filters, block_fields
+    )
+    last_modified = parse_stored_at(newest) if newest else None
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    blocks = [project(block, block_fields) for block in blocks]
+    return _blocks_page(blocks, total, page, page_size, etag, last_modified)
+
+
+async def _db_blocks_page(
+    request: Request, query, filters: tuple, page: int, page_size: int, block_fields: tuple[str, ...]
+) -> Response:
+    """A /blocks page from the database, revalidated before the count and page queries run"""
+    offset = (page - 1) * page_size
+    page_key = (*filters, page, page_size, block_fields)
+
+    def _validators():
+        # The count and newest block cover inserts and deletes; the version,
+        # read first so it can't be newer than the aggregate, covers edits.
+        version = latest_blocks.version()
+        validators = query.aggregate(total=Count('id'), last_stored_at=Max('stored_at'), last_id=Max('id'))
+        return {**validators, "version": version}
+
+    def _process_page():
+        return serialize_blocks(query[offset:offset + page_size], block_fields)
+
+    if has_conditional_headers(request):
+        # Revalidation: answer 304 before running the count and page queries
+        validators = await blocks_flight.do(("validators", *filters), lambda: _read(_validators))
+        page_data = None
+    else:
+        validators, page_data = await blocks_flight.do(
+            ("validators+page", *page_key), lambda: _read(lambda: (_validators(), _process_page()))
+        )
+
+    etag = make_etag(
+        "blocks", validators["version"], validators["total"], validators["last_stored_at"], validators["last_id"],
+        page, page_size, *filters, block_fields
+    )
+    last_modified = validators["last_stored_at"]
+    if page_data is None:
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+        page_data = await blocks_flight.do(("page", *page_key), lambda: _read(_process_page))
+    return _blocks_page(page_data, validators["total"], page, page_size, etag, last_modified)
 
 
 class CryptoAPI:
-    
+    """Crypto read API.
+
+    Methods return ready responses built from plain dicts shaped like the
+    schemas in app.schemas.crypto (no re-validation), with ETag validators.
+    """
+
     @classmethod
     async def get_blocks(
         cls,
+        request: Request,
         page: int = Query(1, ge=1, description="Page number"),
         page_size: int = Query(10, ge=1, le=100, description="Items per page"),
         currency_name: Optional[str] = Query(None, description="Filter by currency name"),
         provider_id: Optional[int] = Query(None, description="Filter by provider ID"),
-        current_user: User = Depends(get_current_user)
-    ) -> BlockListResponse:
+        current_user: User = Depends(get_current_user),
+        expand: Optional[str] = None,
+        fields: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Response:
         """Get list of recorded blocks with filtering and pagination"""
-        
-        # Build query
-        query = Block.objects.all()
-        
-        if currency_name:
-            query = query.filter(currency__name__iexact=currency_name)
-        
-        if provider_id:
-            query = query.filter(providers__id=provider_id)
-        
-        # Order by stored_at descending
-        query = query.order_by('-stored_at')
-        
-        # Get total count
-        total = await sync_to_async(query.count)()
-        
-        # Apply pagination using slicing
-        offset = (page - 1) * page_size
-        blocks_queryset = query[offset:offset + page_size]
-        
-        # Convert to schemas
-        blocks = []
-        async for block in blocks_queryset:
-            # Get related objects
-            await block.currency
-            providers = [provider async for provider in block.providers.all()]
-            
-            block_schema = BlockSchema(
-                id=block.id,
-                currency=CurrencySchema(
-                    id=block.currency.id,
-                    name=block.currency.name
-                ),
-                block_number=block.block_number,
-                providers=[
-                    ProviderSchema(
-                        id=provider.id,
-                        name=provider.name,
-                        api_key=provider.api_key
-                    ) for provider in providers
-                ],
-                created_at=block.created_at,
-                stored_at=block.stored_at
-            )
-            blocks.append(block_schema)
-        
-        return BlockListResponse(
-            blocks=blocks,
-            total=total,
-            page=page,
-            page_size=page_size
-        )
-    
+
+        block_fields = parse_block_fields(fields, expand)
+        since, until = as_utc(since), as_utc(until)
+        # Normalized query for coalescing identical concurrent requests
+        filters = ((currency_name or "").lower(), provider_id, since, until)
+
+        if provider_id is None and since is None and until is None:
+            response = await _window_blocks_page(request, currency_name, filters, page, page_size, block_fields)
+            if response is not None:
+                return response
+
+        query = _blocks_query(currency_name, provider_id, since, until)
+        return await _db_blocks_page(request, query, filters, page, page_size, block_fields)
+
     @classmethod
     async def get_block_by_currency_and_number(
         cls,
+        request: Request,
         currency_name: str,
         block_number: int,
-        current_user: User = Depends(get_current_user)
-    ) -> BlockSchema:
+        current_user: User = Depends(get_current_user),
+        expand: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Response:
         """Get block by currency name and block number"""
-        
-        def _process_block():
-            try:
-                block = Block.objects.select_related('currency').prefetch_related('providers').get(
-                    currency__name__iexact=currency_name,
-                    block_number=block_number
-                )
-            except Block.DoesNotExist:
-                raise HTTPException(status_code=404, detail="Block not found")
-            
-            # Get providers (synchronous)
-            providers = list(block.providers.all())
-            
-            return BlockSchema(
-                id=block.id,
-                currency=CurrencySchema(
-                    id=block.currency.id,
-                    name=block.currency.name
-                ),
-                block_number=block.block_number,
-                providers=[
-                    ProviderSchema(
-                        id=provider.id,
-                        name=provider.name,
-                        api_key=provider.api_key
-                    ) for provider in providers
-                ],
-                created_at=block.created_at,
-                stored_at=block.stored_at
-            )
-        
-        return await sync_to_async(_process_block)()
-    
+
+        block_fields = parse_block_fields(fields, expand)
+
+        block = await _cached_block(
+            number_key(currency_name, block_number),
+            Block.objects.filter(currency__name__iexact=currency_name, block_number=block_number)
+        )
+        if block is None:
+            raise HTTPException(status_code=404, detail="Block not found")
+        return _respond(request, project(block, block_fields))
+
+    @classmethod
+    async def get_block_at_time(
+        cls,
+        request: Request,
+        timestamp: datetime,
+        currency_name: str,
+        current_user: User = Depends(get_current_user),
+        expand: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Response:
+        """Get the block whose chain time is nearest ``timestamp`` (the earlier one on a tie)"""
+
+        block_fields = parse_block_fields(fields, expand)
+        timestamp = as_utc(timestamp)
+
+        def _nearest():
+            currency_id = Currency.objects.filter(name__iexact=currency_name).values_list("id", flat=True).first()
+            if currency_id is None:
+                return None
+            # One seek each way on the (currency, created_at) index
+            blocks = Block.objects.filter(currency_id=currency_id)
+            before = blocks.filter(created_at__lte=timestamp).order_by("-created_at").values("id", "created_at")
+            after = blocks.filter(created_at__gt=timestamp).order_by("created_at").values("id", "created_at")
+            candidates = [row for row in (before.first(), after.first()) if row is not None]
+            if not candidates:
+                return None
+            nearest = min(candidates, key=lambda row: abs(row["created_at"] - timestamp))
+            return serialize_blocks(Block.objects.filter(id=nearest["id"]), block_fields)[0]
+
+        block = await _read(_nearest)
+        if block is None:
+            raise HTTPException(status_code=404, detail="Block not found")
+        return _respond(request, block)
+
+    @classmethod
+    async def get_block_by_hash(
+        cls,
+        request: Request,
+        block_hash: str,
+        current_user: User = Depends(get_current_user),
+        expand: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Response:
+        """Get block by its chain hash"""
+
+        block_fields = parse_block_fields(fields, expand)
+
+        block_hash = normalize_block_hash(block_hash)
+        block = await _cached_block(hash_key(block_hash), Block.objects.filter(hash=block_hash))
+        if block is None:
+            raise HTTPException(status_code=404, detail="Block not found")
+        return _respond(request, project(block, block_fields))
+
     @classmethod
     async def get_block_by_id(
         cls,
+        request: Request,
         block_id: int,
-        current_user: User = Depends(get_current_user)
-    ) -> BlockSchema:
+        current_user: User = Depends(get_current_user),
+        expand: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Response:
         """Get block by application ID"""
-        
-        def _process_block():
-            try:
-                block = Block.objects.select_related('currency').prefetch_related('providers').get(
-                    id=block_id
-                )
-            except Block.DoesNotExist:
-                raise HTTPException(status_code=404, detail="Block not found")
-            
-            # Get providers (synchronous)
-            providers = list(block.providers.all())
-            
-            return BlockSchema(
-                id=block.id,
-                currency=CurrencySchema(
-                    id=block.currency.id,
-                    name=block.currency.name
-                ),
-                block_number=block.block_number,
-                providers=[
-                    ProviderSchema(
-                        id=provider.id,
-                        name=provider.name,
-                        api_key=provider.api_key
-                    ) for provider in providers
-                ],
-                created_at=block.created_at,
-                stored_at=block.stored_at
-            )
-        
-        return await sync_to_async(_process_block)()
-    
+
+        block_fields = parse_block_fields(fields, expand)
+
+        block = await _cached_block(id_key(block_id), Block.objects.filter(id=block_id))
+        if block is None:
+            raise HTTPException(status_code=404, detail="Block not found")
+        return _respond(request, project(block, block_fields))
+
+    @classmethod
+    async def get_transactions(
+        cls,
+        request: Request,
+        block_id: Optional[int] = None,
+        tx_hash: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        current_user: User = Depends(get_current_user)
+    ) -> Response:
+        """Page through transactions in id order.
+
+        Keyset pagination: each page continues after the last id of the
+        previous one (carried in the opaque cursor), so deep pages cost the
+        same as the first and rows loaded meanwhile don't shift them.
+        """
+        query = Transaction.objects.order_by("id")
+        if cursor:
+            query = query.filter(id__gt=decode_cursor(cursor))
+        if block_id is not None:
+            query = query.filter(block_id=block_id)
+        if tx_hash:
+            query = query.filter(hash=normalize_block_hash(tx_hash))
+
+        # One extra row tells whether another page follows
+        rows = await _read(lambda: serialize_transactions(query[:limit + 1]))
+        next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+        return _respond(request, {"transactions": rows[:limit], "next_cursor": next_cursor, "limit": limit})
+
     @classmethod
     async def get_providers(
         cls,
+        request: Request,
         current_user: User = Depends(get_current_user)
-    ) -> List[ProviderSchema]:
+    ) -> Response:
         """Get list of available providers"""
-        
-        providers = []
-        async for provider in Provider.objects.all():
-            providers.append(ProviderSchema(
-                id=provider.id,
-                name=provider.name,
-                api_key=provider.api_key
-            ))
-        
-        return providers
-    
+        return _respond(request, await _read(serialize_providers))
+
+    @classmethod
+    async def get_provider_detail(
+        cls,
+        request: Request,
+        provider_id: int,
+        current_user: User = Depends(get_current_admin_user)
+    ) -> Response:
+        """Get a provider including its API key (admin only)"""
+
+        provider = provider_detail_cache.get(provider_id)
+        if provider is None:
+            # Credentials are read from the primary, never from a lagging replica
+            provider = await run_db(serialize_provider_detail, provider_id)
+            if provider is None:
+                raise HTTPException(status_code=404, detail="Provider not found")
+            provider_detail_cache.set(provider_id, provider)
+        return ORJSONResponse(provider)
+
     @classmethod
     async def get_currencies(
         cls,
+        request: Request,
         current_user: User = Depends(get_current_user)
-    ) -> List[CurrencySchema]:
+    ) -> Response:
         """Get list of available currencies"""
-        
-        currencies = []
-        async for currency in Currency.objects.all():
-            currencies.append(CurrencySchema(
-                id=currency.id,
-                name=currency.name
-            ))
-        
-        return currencies
+        return _respond(request, await _read(serialize_currencies))
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from app.models.crypto import Block
+from config.cache import LRUCache
+from config.db import DBExecutor
+from config.redis import get_redis
+
+# Readiness results are shared by every caller for HEALTH_CACHE_SECONDS so a
+# burst of load balancer probes costs one round of dependency checks.
+readiness_cache = LRUCache(maxsize=1, ttl=settings.HEALTH_CACHE_SECONDS)
+_readiness_lock = asyncio.Lock()
+
+# Database probes run on their own thread (and connection), so a hung
+# Postgres ties up one health thread rather than request executor threads.
+# A probe still running from an earlier round isn't started again.
+_health_executor = DBExecutor(max_workers=1, thread_name_prefix="health")
+_pending_probes: dict[str, asyncio.Future] = {}
+
+
+def _ping_db() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def _latest_stored_at():
+    return Block.objects.aggregate(latest=Max("stored_at"))["latest"]
+
+
+async def _probe(name: str, check: Callable[[], Awaitable[Any]], timeout: float) -> tuple[dict[str, Any], Any]:
+    """Run one dependency check under a hard timeout, timing it"""
+    started = time.perf_counter()
+    pending = _pending_probes.get(name)
+    if pending is not None and not pending.done():
+        return {"status": "timeout", "error": "previous check still running", "latency_ms": 0.0}, None
+    try:
+        pending = _pending_probes[name] = asyncio.ensure_future(check())
+        # Retrieve the outcome of checks that finish after their timeout
+        pending.add_done_callback(lambda future: future.cancelled() or future.exception())
+        value = await asyncio.wait_for(asyncio.shield(pending), timeout)
+    except asyncio.TimeoutError:
+        result, value = {"status": "timeout"}, None
+    except Exception as exc:
+        result, value = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}, None
+    else:
+        result = {"status": "ok"}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result, value
+
+
+class HealthAPI:
+    """Liveness and readiness probes for the load balancer / orchestrator."""
+
+    @classmethod
+    async def live(cls, request: Request) -> Response:
+        """The process is up and its event loop is serving requests"""
+        return ORJSONResponse({"status": "ok"})
+
+    @classmethod
+    async def ready(cls, request: Request) -> Response:
+        """Postgres and Redis are reachable; ingest freshness is reported.
+
+        A stale ingest pipeline is a worker problem, so it shows up as
+        ``stale`` without taking the API out of rotation.
+        """
+        result = readiness_cache.get("ready")
+        if result is None:
+            async with _readiness_lock:
+                result = readiness_cache.get("ready")
+                if result is None:
+                    result = await cls._check()
+                    readiness_cache.set("ready", result)
+        return ORJSONResponse(result, status_code=200 if result["status"] == "ok" else 503)
+
+    @classmethod
+    async def _check(cls) -> dict[str, Any]:
+        (database, _), (redis, _), (ingest, latest) = await asyncio.gather(
+            _probe("database", lambda: _health_executor.run(_ping_db), settings.HEALTH_DB_TIMEOUT),
+            _probe("redis", lambda: asyncio.to_thread(get_redis().ping), settings.HEALTH_REDIS_TIMEOUT),
+            _probe("ingest", lambda: _health_executor.run(_latest_stored_at), settings.HEALTH_DB_TIMEOUT),
+        )
+
+        if ingest["status"] == "ok":
+            ingest["latest_stored_at"] = latest
+            ingest["age_seconds"] = round((timezone.now() - latest).total_seconds(), 3) if latest else None
+            if latest is None or ingest["age_seconds"] > settings.HEALTH_INGEST_MAX_AGE:
+                ingest["status"] = "stale"
+
+        ready = database["status"] == "ok" and redis["status"] == "ok"
+        return {
+            "status": "ok" if ready else "unavailable",
+            "checks": {"database": database, "redis": redis, "ingest": ingest},
+        }
@@ -0,0 +1,273 @@
+"""Newest blocks kept in Redis so page 1 of ``/blocks`` skips Postgres.
+
+``store_block`` pushes every new block into a global sorted set and one per
+currency (keyed by the lower-cased name, matching the ``iexact`` filter),
+scored by ``stored_at`` and trimmed to the newest ``LATEST_BLOCKS_WINDOW``
+members. Each member is the block's full payload; a running total per set
+stands in for ``count()``.
+
+The window is only trusted while its ``ready`` marker exists. The first
+push after the marker expires (``LATEST_BLOCKS_TTL``) or is invalidated
+rebuilds every set from the database, which also heals anything a failed
+push left out. Pushes that arrive while the window isn't ready set a
+``dirty`` marker; a rebuild clears it before reading the database and only
+writes the window if it is still clear, otherwise it reads again. Readers fall back to the database
+whenever the window isn't ready, Redis is unreachable or the requested
+page lies beyond the window.
+
+``VERSION_KEY`` counts the commits that edited or deleted blocks, currencies
+or providers, or changed provider links. It goes into the ``/blocks`` ETag,
+which otherwise only notices new blocks.
+"""
+
+import time
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Optional, Sequence
+
+import orjson
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from redis import Redis
+from redis.exceptions import RedisError, WatchError
+
+from app.api.serializers import ALL_BLOCK_FIELDS, serialize_block, serialize_blocks
+from app.models.crypto import Block, Currency, Provider
+from config.db import on_commit_once
+from config.redis import get_redis
+
+logger = getLogger(__name__)
+
+READY_KEY = "blocks:latest:ready"
+SCOPES_KEY = "blocks:latest:scopes"
+REBUILD_LOCK_KEY = "blocks:latest:rebuild"
+DIRTY_KEY = "blocks:latest:dirty"
+VERSION_KEY = "blocks:version"
+# Upper bound on a rebuild; the lock expires by itself if its holder dies.
+REBUILD_LOCK_MS = 30_000
+# Database reads per rebuild before leaving the window to the next push
+REBUILD_ATTEMPTS = 3
+
+# KEYS: ready, global set, global total, currency set, currency total, scopes, dirty
+# ARGV: score, member, window, dirty marker ttl
+_PUSH_SCRIPT = """
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl <= 0 then
+    redis.call('SET', KEYS[7], 1, 'PX', ARGV[4])
+    return 0
+end
+for i = 2, 4, 2 do
+    if redis.call('ZADD', KEYS[i], ARGV[1], ARGV[2]) == 1 then
+        redis.call('INCR', KEYS[i + 1])
+    end
+    redis.call('ZREMRANGEBYRANK', KEYS[i], 0, -tonumber(ARGV[3]) - 1)
+    redis.call('PEXPIRE', KEYS[i], ttl)
+    redis.call('PEXPIRE', KEYS[i + 1], ttl)
+end
+redis.call('SADD', KEYS[6], KEYS[4], KEYS[5])
+redis.call('PEXPIRE', KEYS[6], ttl)
+return 1
+"""
+
+
+def scope_keys(currency_name: Optional[str] = None) -> tuple[str, str]:
+    """(sorted set, total) keys for all blocks or one currency"""
+    scope = f"currency:{currency_name.lower()}" if currency_name else "all"
+    return f"blocks:latest:{scope}", f"blocks:latest:{scope}:total"
+
+
+class LatestBlocks:
+    """Capped, Redis-backed window over the newest blocks."""
+
+    # After a Redis error readers go straight to the database for this long,
+    # so an unreachable Redis doesn't add a socket timeout to every request.
+    backoff_seconds = 5.0
+
+    def __init__(self, window: int, ttl: float) -> None:
+        self.window = window
+        self.ttl_ms = int(ttl * 1000)
+        self._push_script = None
+        self._skip_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def push(self, block: Block, providers: Sequence[Provider]) -> None:
+        """Add a freshly stored block, rebuilding the window if it isn't ready"""
+        if not self.enabled:
+            return
+        payload = serialize_block(block, providers)
+        redis = get_redis()
+        try:
+            if self._push_script is None:
+                self._push_script = redis.register_script(_PUSH_SCRIPT)
+            pushed = self._push_script(
+                keys=[READY_KEY, *scope_keys(), *scope_keys(block.currency.name), SCOPES_KEY, DIRTY_KEY],
+                args=[block.stored_at.timestamp(), orjson.dumps(payload), self.window, REBUILD_LOCK_MS],
+            )
+            if not pushed:
+                self.rebuild()
+        except RedisError:
+            logger.warning("Could not push block %s into the latest blocks window", block.pk, exc_info=True)
+
+    def rebuild(self) -> None:
+        """Reload every scope from the database; one process at a time"""
+        redis = get_redis()
+        if not redis.set(REBUILD_LOCK_KEY, 1, nx=True, px=REBUILD_LOCK_MS):
+            # The running rebuild sees this push's dirty marker and reads again
+            return
+        try:
+            for _ in range(REBUILD_ATTEMPTS):
+                redis.delete(DIRTY_KEY)
+                if self._write_scopes(redis, self._load_scopes()):
+                    return
+            logger.info("Blocks kept arriving during the latest blocks rebuild, leaving it to the next push")
+        finally:
+            redis.delete(REBUILD_LOCK_KEY)
+
+    def _load_scopes(self) -> dict[tuple[str, str], tuple[int, list[dict[str, Any]]]]:
+        """(total, newest blocks) per scope keys"""
+        scopes: dict[tuple[str, str], tuple[int, list[dict[str, Any]]]] = {}
+        totals = (
+            Block.objects.annotate(currency_key=Lower("currency__name"))
+            .values("currency_key").annotate(total=Count("id")).order_by()
+        )
+        newest = Block.objects.order_by("-stored_at")
+        scopes[scope_keys()] = (
+            sum(row["total"] for row in totals),
+            serialize_blocks(newest[:self.window], ALL_BLOCK_FIELDS),
+        )
+        for row in totals:
+            scopes[scope_keys(row["currency_key"])] = (
+                row["total"],
+                serialize_blocks(
+                    newest.filter(currency__name__iexact=row["currency_key"])[:self.window], ALL_BLOCK_FIELDS
+                ),
+            )
+        return scopes
+
+    def _write_scopes(self, redis: Redis, scopes: dict[tuple[str, str], tuple[int, list[dict[str, Any]]]]) -> bool:
+        """Replace the window with ``scopes`` and mark it ready, unless a push made it dirty"""
+        with redis.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(DIRTY_KEY)
+                if pipe.exists(DIRTY_KEY):
+                    return False
+                stale = pipe.smembers(SCOPES_KEY)
+                pipe.multi()
+                pipe.delete(SCOPES_KEY, *stale)
+                for (set_key, total_key), (total, blocks) in scopes.items():
+                    if blocks:
+                        pipe.zadd(set_key, {orjson.dumps(block): block["stored_at"].timestamp() for block in blocks})
+                        pipe.pexpire(set_key, self.ttl_ms)
+                    pipe.set(total_key, total, px=self.ttl_ms)
+                    pipe.sadd(SCOPES_KEY, set_key, total_key)
+                pipe.pexpire(SCOPES_KEY, self.ttl_ms)
+                pipe.set(READY_KEY, 1, px=self.ttl_ms)
+                pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    def invalidate(self) -> None:
+        """Stop serving from the window until the next push rebuilds it, and bump the version"""
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            if self.enabled:
+                pipe.delete(READY_KEY)
+            pipe.incr(VERSION_KEY)
+            pipe.execute()
+        except RedisError:
+            logger.warning("Could not invalidate the latest blocks window", exc_info=True)
+
+    def bump_version(self) -> None:
+        """Bump the version without touching the window"""
+        try:
+            get_redis().incr(VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not bump the blocks version", exc_info=True)
+
+    def version(self) -> Optional[int]:
+        """The current version, or None while Redis is unreachable"""
+        if time.monotonic() < self._skip_until:
+            return None
+        try:
+            version = get_redis().get(VERSION_KEY)
+        except RedisError:
+            self._skip_until = time.monotonic() + self.backoff_seconds
+            logger.debug("Blocks version unavailable", exc_info=True)
+            return None
+        return int(version or 0)
+
+    def read_page(
+        self, currency_name: Optional[str], offset: int, limit: int
+    ) -> Optional[tuple[int, int, list[dict[str, Any]], Optional[dict[str, Any]]]]:
+        """(version, total, page, newest block) from the window, or None to use the database"""
+        if not self.enabled or offset + limit > self.window or time.monotonic() < self._skip_until:
+            return None
+        set_key, total_key = scope_keys(currency_name)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.exists(READY_KEY)
+            pipe.get(VERSION_KEY)
+            pipe.get(total_key)
+            pipe.zcard(set_key)
+            pipe.zrevrange(set_key, 0, 0)
+            pipe.zrevrange(set_key, offset, offset + limit - 1)
+            ready, version, total, size, newest, page = pipe.execute()
+        except RedisError:
+            self._skip_until = time.monotonic() + self.backoff_seconds
+            # Logged quietly: while Redis is down this happens on every request
+            logger.debug("Latest blocks window unavailable, reading from the database", exc_info=True)
+            return None
+
+        total = int(total or 0)
+        # Serve only pages the window fully covers (or everything, when it
+        # holds every block of the scope).
+        if not ready or (offset + limit > size and size < total):
+            return None
+        return (
+            int(version or 0),
+            total,
+            [orjson.loads(member) for member in page],
+            orjson.loads(newest[0]) if newest else None,
+        )
+
+
+latest_blocks = LatestBlocks(window=settings.LATEST_BLOCKS_WINDOW, ttl=settings.LATEST_BLOCKS_TTL)
+
+
+def project(block: dict[str, Any], fields: Sequence[str]) -> dict[str, Any]:
+    """Reduce a full window payload to ``fields``"""
+    # Payloads cached before a field was added lack it until they expire
+    return {field: block.get(field) for field in fields}
+
+
+def parse_stored_at(block: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(block["stored_at"])
+
+
+@receiver([post_save, post_delete], sender=Block)
+@receiver([post_save, post_delete], sender=Currency)
+@receiver([post_save, post_delete], sender=Provider)
+def _invalidate_latest_blocks(sender, instance, created: bool = False, **kwargs) -> None:
+    # New blocks are pushed by store_block, and new providers and currencies
+    # don't change any stored payload. Edits and deletes make the window
+    # rebuild, once per transaction however many rows they touch.
+    if not created:
+        on_commit_once(latest_blocks.invalidate)
+
+
+@receiver(m2m_changed, sender=Block.providers.through)
+def _invalidate_latest_blocks_on_providers(sender, action: str, reverse: bool, **kwargs) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action == "post_add" and not reverse:
+        # store_block links the providers of every new block it pushes
+        on_commit_once(latest_blocks.bump_version)
+    else:
+        on_commit_once(latest_blocks.invalidate)
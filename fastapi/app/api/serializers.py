@@ -0,0 +1,124 @@
+"""Build crypto response payloads straight from ``.values()`` rows.
+
+The dicts produced here already have the shape of the schemas in
+``app.schemas.crypto`` and are trusted internal data, so routers hand them
+to ``ORJSONResponse`` without another round of Pydantic validation.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Optional, Sequence
+
+from django.db.models import QuerySet
+
+from app.models.crypto import Block, Currency, Provider
+
+BLOCK_COLUMNS = (
+    "id", "currency_id", "currency__name", "block_number", "hash", "parent_hash", "created_at", "stored_at"
+)
+PROVIDER_COLUMNS = ("id", "name")
+PROVIDER_DETAIL_COLUMNS = ("id", "name", "api_key")
+CURRENCY_COLUMNS = ("id", "name")
+TRANSACTION_COLUMNS = ("id", "block_id", "hash", "index", "sender", "recipient", "value", "fee", "gas_used", "failed")
+
+# Response field -> columns it needs from the block row. Provider fields come
+# from the block-provider link table instead.
+BLOCK_FIELD_COLUMNS: dict[str, tuple[str, ...]] = {
+    "id": ("id",),
+    "currency": ("currency_id", "currency__name"),
+    "block_number": ("block_number",),
+    "hash": ("hash",),
+    "parent_hash": ("parent_hash",),
+    "provider_ids": (),
+    "providers": (),
+    "created_at": ("created_at",),
+    "stored_at": ("stored_at",),
+}
+ALL_BLOCK_FIELDS = tuple(BLOCK_FIELD_COLUMNS)
+DEFAULT_BLOCK_FIELDS = ("id", "currency", "block_number", "hash", "provider_ids", "created_at", "stored_at")
+
+_BLOCK_FIELD_VALUES: dict[str, Callable[[dict[str, Any], list[dict[str, Any]]], Any]] = {
+    "id": lambda row, links: row["id"],
+    "currency": lambda row, links: {"id": row["currency_id"], "name": row["currency__name"]},
+    "block_number": lambda row, links: row["block_number"],
+    "hash": lambda row, links: row["hash"],
+    "parent_hash": lambda row, links: row["parent_hash"],
+    "provider_ids": lambda row, links: [link["provider_id"] for link in links],
+    "providers": lambda row, links: [{"id": link["provider_id"], "name": link["provider__name"]} for link in links],
+    "created_at": lambda row, links: row["created_at"],
+    "stored_at": lambda row, links: row["stored_at"],
+}
+
+
+def serialize_blocks(queryset: QuerySet, fields: Sequence[str] = DEFAULT_BLOCK_FIELDS) -> list[dict[str, Any]]:
+    """BlockSchema-shaped dicts holding only ``fields``.
+
+    The projection is pushed into the query: only the needed columns are
+    selected, the currency join happens only for ``currency`` and the
+    provider links are only loaded for ``provider_ids``/``providers`` (with
+    the provider join only for ``providers``).
+    """
+    columns = {"id"}
+    for field in fields:
+        columns.update(BLOCK_FIELD_COLUMNS[field])
+    rows = list(queryset.values(*columns))
+
+    links: dict[int, list[dict[str, Any]]] = {}
+    if "provider_ids" in fields or "providers" in fields:
+        links = _provider_links([row["id"] for row in rows], with_names="providers" in fields)
+
+    values = [(field, _BLOCK_FIELD_VALUES[field]) for field in fields]
+    return [{field: value(row, links.get(row["id"], [])) for field, value in values} for row in rows]
+
+
+def serialize_block(block: Block, providers: Sequence[Provider]) -> dict[str, Any]:
+    """All block fields from an in-memory instance (its currency already loaded)"""
+    row = {
+        "id": block.pk,
+        "currency_id": block.currency_id,
+        "currency__name": block.currency.name,
+        "block_number": block.block_number,
+        "hash": block.hash,
+        "parent_hash": block.parent_hash,
+        "created_at": block.created_at,
+        "stored_at": block.stored_at,
+    }
+    links = [{"provider_id": provider.pk, "provider__name": provider.name} for provider in providers]
+    return {field: value(row, links) for field, value in _BLOCK_FIELD_VALUES.items()}
+
+
+def normalize_block_hash(value: str) -> str:
+    """Block hashes are stored and looked up as lower-case ``0x...``"""
+    value = value.strip().lower()
+    return value if value.startswith("0x") else f"0x{value}"
+
+
+def serialize_providers() -> list[dict[str, Any]]:
+    return list(Provider.objects.values(*PROVIDER_COLUMNS))
+
+
+def serialize_provider_detail(provider_id: int) -> Optional[dict[str, Any]]:
+    return Provider.objects.filter(id=provider_id).values(*PROVIDER_DETAIL_COLUMNS).first()
+
+
+def serialize_currencies() -> list[dict[str, Any]]:
+    return list(Currency.objects.values(*CURRENCY_COLUMNS))
+
+
+def serialize_transactions(queryset: QuerySet) -> list[dict[str, Any]]:
+    """TransactionSchema-shaped dicts; wei amounts as decimal strings so JSON clients keep every digit"""
+    rows = list(queryset.values(*TRANSACTION_COLUMNS))
+    for row in rows:
+        for column in ("value", "fee"):
+            if row[column] is not None:
+                row[column] = str(int(row[column]))
+    return rows
+
+
+def _provider_links(block_ids: list[int], with_names: bool) -> dict[int, list[dict[str, Any]]]:
+    links: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    if not block_ids:
+        return links
+    columns = ("block_id", "provider_id", "provider__name") if with_names else ("block_id", "provider_id")
+    for link in Block.providers.through.objects.filter(block_id__in=block_ids).values(*columns):
+        links[link["block_id"]].append(link)
+    return links
@@ -4,3 +4,19 @@ from django.apps import AppConfig as DjangoAppConfig
 class AppConfig(DjangoAppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        # Connects the receivers that keep the block caches in step with writes
+        from app.api import block_cache, latest_blocks  # noqa: F401
+
+        from config.budget import install_statement_timeout
+        from config.db import install_connection_metrics
+        from config.metrics import install_sql_metrics
+        from config.profiling import install_sql_profiling
+
+        install_connection_metrics()
+        connection_created.connect(install_sql_metrics, dispatch_uid="install_sql_metrics")
+        connection_created.connect(install_sql_profiling, dispatch_uid="install_sql_profiling")
+        connection_created.connect(install_statement_timeout, dispatch_uid="install_statement_timeout")
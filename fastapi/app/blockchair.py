@@ -0,0 +1,52 @@
+"""Parsing of Blockchair block dashboards into transaction rows.
+
+Kept free of Django and app imports: large payloads are parsed in a pool of
+spawned processes (see ``app.workers.eth_fetcher``), which import only this
+module.
+"""
+
+from typing import Any, Optional
+
+import orjson
+
+# Column order of the tuples returned by parse_block_transactions
+TRANSACTION_ROW_COLUMNS = ("hash", "index", "sender", "recipient", "value", "fee", "gas_used", "failed")
+
+
+def _hash(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    value = value.lower()
+    return value if value.startswith("0x") else f"0x{value}"
+
+
+def _transaction_row(index: int, transaction: Any) -> tuple:
+    # Without ?transaction_details=true Blockchair lists bare hashes
+    if isinstance(transaction, str):
+        return (_hash(transaction), index, None, None, None, None, None, False)
+    gas_used = transaction.get("gas_used")
+    return (
+        _hash(transaction["hash"]),
+        int(transaction.get("index", index)),
+        _hash(transaction.get("sender")),
+        _hash(transaction.get("recipient")),
+        # wei amounts overflow 64 bits; kept as decimal strings
+        str(transaction["value"]) if transaction.get("value") is not None else None,
+        str(transaction["fee"]) if transaction.get("fee") is not None else None,
+        int(gas_used) if gas_used is not None else None,
+        bool(transaction.get("failed", False)),
+    )
+
+
+def parse_block_transactions(payload: bytes) -> dict[int, list[tuple]]:
+    """Height -> transaction rows for every block in a dashboards response body"""
+    data = orjson.loads(payload).get("data") or {}
+    blocks = {}
+    for item in data.values():
+        if not item or not item.get("block"):
+            continue
+        transactions = item.get("transactions") or []
+        blocks[int(item["block"]["id"])] = [
+            _transaction_row(index, transaction) for index, transaction in enumerate(transactions)
+        ]
+    return blocks
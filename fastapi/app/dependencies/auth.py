@@ -3,6 +3,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
 from app.models import User
+from config.db import run_db
 from config.exceptions import InvalidTokenException
 from config.jwt import jwt_decode_handler
 
@@ -15,7 +16,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise InvalidTokenException()
 
-    user = await User.objects.filter(uuid=payload.get("sub", "")).afirst()
+    user = await run_db(User.objects.filter(uuid=payload.get("sub", "")).first)
     if not user:
         raise InvalidTokenException()
     return user
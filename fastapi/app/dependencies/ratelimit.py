@@ -0,0 +1,63 @@
+from typing import Callable, Optional
+
+from django.conf import settings
+from fastapi import Depends, Request
+
+from app.dependencies.auth import get_current_user
+from app.models import User
+from config.exceptions import RateLimitExceededException
+from config.metrics import RATE_LIMITED
+from config.ratelimit import RateLimiter, parse_limits, retry_after_header
+
+rate_limiter = RateLimiter()
+limits = parse_limits(settings.RATE_LIMIT_DEFAULTS, settings.RATE_LIMITS)
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def page_cost(request: Request) -> int:
+    """One token per started 50 items, so page_size=100 costs twice page_size=10"""
+    try:
+        page_size = int(request.query_params.get("page_size") or request.query_params.get("limit") or 10)
+    except ValueError:
+        return 1
+    return max(1, -(-page_size // 50))
+
+
+async def _enforce(route: str, tier: str, identity: str, cost: int) -> None:
+    limit = limits.get(f"{route}:{tier}")
+    if limit is None or not settings.RATE_LIMIT_ENABLED:
+        return
+    decision = await rate_limiter.take(f"{route}:{identity}", limit, cost)
+    if not decision.allowed:
+        RATE_LIMITED.labels(route, tier).inc()
+        raise RateLimitExceededException(retry_after_header(decision))
+
+
+def limit_by_ip(route: str) -> Callable:
+    """Dependency limiting anonymous requests to ``route`` per client IP (tier ``anonymous``)"""
+
+    async def dependency(request: Request) -> None:
+        await _enforce(route, "anonymous", f"ip:{client_ip(request)}", 1)
+
+    return dependency
+
+
+def limit_by_user(route: str, cost: Optional[Callable[[Request], int]] = None) -> Callable:
+    """Dependency limiting authenticated requests to ``route`` per user.
+
+    The tier is ``admin`` or ``user``; the user comes from the same
+    ``get_current_user`` the route depends on, so it's loaded once.
+    """
+
+    async def dependency(request: Request, current_user: User = Depends(get_current_user)) -> None:
+        tier = "admin" if current_user.is_admin else "user"
+        await _enforce(route, tier, f"user:{current_user.uuid}", cost(request) if cost else 1)
+
+    return dependency
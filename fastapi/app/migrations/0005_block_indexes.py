@@ -0,0 +1,25 @@
+# Generated by Django 4.1 on 2026-10-19 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_block_block_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['-stored_at'], name='block_stored_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['currency', '-stored_at'], name='block_currency_stored_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['currency', 'block_number'], name='block_currency_number_idx'),
+        ),
+    ]
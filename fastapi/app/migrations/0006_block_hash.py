@@ -0,0 +1,27 @@
+# Generated by Django 4.1 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_block_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='block',
+            name='hash',
+            field=models.CharField(blank=True, max_length=66, null=True),
+        ),
+        migrations.AddField(
+            model_name='block',
+            name='parent_hash',
+            field=models.CharField(blank=True, max_length=66, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='block',
+            constraint=models.UniqueConstraint(fields=('hash',), name='block_hash_uniq'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1 on 2026-10-19 11:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_block_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='block',
+            name='transaction_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=66)),
+                ('index', models.IntegerField()),
+                ('sender', models.CharField(blank=True, max_length=42, null=True)),
+                ('recipient', models.CharField(blank=True, max_length=42, null=True)),
+                ('value', models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True)),
+                ('fee', models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True)),
+                ('gas_used', models.BigIntegerField(blank=True, null=True)),
+                ('failed', models.BooleanField(default=False)),
+                ('block', models.ForeignKey(
+                    db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='transactions',
+                    to='app.block',
+                )),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['hash'], name='transaction_hash_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('block', 'index'), name='transaction_block_index_uniq'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.1 on 2026-10-19 11:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# Postgres only: GIN for containment queries (payload @> '{...}') and
+# expression indexes matching the ORM's payload__<key> lookups. A low
+# toast_tuple_target makes Postgres compress payloads well below the default
+# 2 kB threshold.
+POSTGRES_SQL = [
+    (
+        'CREATE INDEX "ingest_payload_gin" ON "app_ingestevent" USING gin ("payload" jsonb_path_ops)',
+        'DROP INDEX "ingest_payload_gin"',
+    ),
+    (
+        """CREATE INDEX "ingest_best_height_idx" ON "app_ingestevent" (("payload" -> 'best_block_height'))""",
+        'DROP INDEX "ingest_best_height_idx"',
+    ),
+    (
+        """CREATE INDEX "ingest_best_hash_idx" ON "app_ingestevent" (("payload" -> 'best_block_hash'))""",
+        'DROP INDEX "ingest_best_hash_idx"',
+    ),
+    (
+        'ALTER TABLE "app_ingestevent" SET (toast_tuple_target = 256)',
+        'ALTER TABLE "app_ingestevent" RESET (toast_tuple_target)',
+    ),
+]
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for forward, _ in POSTGRES_SQL:
+            schema_editor.execute(forward)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for _, backward in reversed(POSTGRES_SQL):
+            schema_editor.execute(backward)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_transaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('payload', models.JSONField()),
+                ('block', models.ForeignKey(
+                    blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingest_events',
+                    to='app.block',
+                )),
+                ('currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.currency')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.provider')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ingestevent',
+            index=models.Index(fields=['provider', '-fetched_at'], name='ingest_provider_fetched_idx'),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1 on 2026-10-19 11:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+# Postgres only. Blocks arrive in chain order, so created_at follows the
+# table's physical order and a BRIN index (a few pages per million rows)
+# serves time-range scans.
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute('CREATE INDEX "block_created_at_brin" ON "app_block" USING brin ("created_at")')
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute('DROP INDEX "block_created_at_brin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_ingest_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='block',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['currency', 'created_at'], name='block_currency_created_idx'),
+        ),
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
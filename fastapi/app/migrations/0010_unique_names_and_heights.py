@@ -0,0 +1,78 @@
+# Generated by Django 4.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def _duplicates(model, *fields):
+    """(kept pk, duplicate pks) for every group of rows sharing ``fields``; the oldest row is kept"""
+    groups = model.objects.values(*fields).annotate(keep=Min("pk"), rows=Count("pk")).filter(rows__gt=1).order_by()
+    for group in groups:
+        keep = group.pop("keep")
+        del group["rows"]
+        yield keep, list(model.objects.filter(**group).exclude(pk=keep).values_list("pk", flat=True))
+
+
+def _merge_links(link, field, other, keep, duplicates):
+    """Give ``keep`` the provider links of its duplicates that it lacks"""
+    linked = link.objects.filter(**{field: keep}).values(other)
+    missing = set(
+        link.objects.filter(**{f"{field}__in": duplicates}).exclude(**{f"{other}__in": linked})
+        .values_list(other, flat=True)
+    )
+    link.objects.bulk_create([link(**{field: keep, other: pk}) for pk in missing])
+
+
+# Concurrent workers could store the same currency, provider or height twice
+# before these constraints existed. Duplicates are merged into the oldest row.
+def merge_duplicates(apps, schema_editor):
+    Currency = apps.get_model("app", "Currency")
+    Provider = apps.get_model("app", "Provider")
+    Block = apps.get_model("app", "Block")
+    IngestEvent = apps.get_model("app", "IngestEvent")
+    link = Block.providers.through
+
+    for keep, duplicates in _duplicates(Currency, "name"):
+        Block.objects.filter(currency_id__in=duplicates).update(currency_id=keep)
+        IngestEvent.objects.filter(currency_id__in=duplicates).update(currency_id=keep)
+        Currency.objects.filter(pk__in=duplicates).delete()
+
+    for keep, duplicates in _duplicates(Provider, "name"):
+        _merge_links(link, "provider_id", "block_id", keep, duplicates)
+        IngestEvent.objects.filter(provider_id__in=duplicates).update(provider_id=keep)
+        Provider.objects.filter(pk__in=duplicates).delete()
+
+    # Transactions of the removed copies go with them; the kept block's are
+    # loaded as usual if it has none yet
+    for keep, duplicates in _duplicates(Block, "currency_id", "block_number"):
+        _merge_links(link, "block_id", "provider_id", keep, duplicates)
+        IngestEvent.objects.filter(block_id__in=duplicates).update(block_id=keep)
+        Block.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_block_chain_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='currency',
+            constraint=models.UniqueConstraint(fields=('name',), name='currency_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='provider',
+            constraint=models.UniqueConstraint(fields=('name',), name='provider_name_uniq'),
+        ),
+        # The unique constraint's index takes over lookups by height
+        migrations.AddConstraint(
+            model_name='block',
+            constraint=models.UniqueConstraint(fields=('currency', 'block_number'), name='block_currency_number_uniq'),
+        ),
+        migrations.RemoveIndex(
+            model_name='block',
+            name='block_currency_number_idx',
+        ),
+    ]
@@ -1,2 +1,2 @@
 from .user import User
-from .crypto import Currency, Block, Provider
\ No newline at end of file
+from .crypto import Currency, Block, Provider, Transaction, IngestEvent
\ No newline at end of file
@@ -1,18 +1,99 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
 class Currency(models.Model):
     name = models.CharField(max_length=50)
 
+    class Meta:
+        constraints = [
+            # workers get_or_create their currency concurrently
+            models.UniqueConstraint(fields=["name"], name="currency_name_uniq"),
+        ]
+
+
 class Provider(models.Model):
     name = models.CharField(max_length=150)
     api_key = models.CharField(max_length=150)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["name"], name="provider_name_uniq"),
+        ]
+
 
 class Block(models.Model):
     currency = models.ForeignKey(Currency, on_delete=models.CASCADE)
     block_number = models.IntegerField(default=0)
+    # 0x-prefixed, lower-case; NULL for blocks stored before hashes were
+    # recorded until the reorg check fills them in
+    hash = models.CharField(max_length=66, null=True, blank=True)
+    parent_hash = models.CharField(max_length=66, null=True, blank=True)
+    # NULL until the block's transactions have been loaded
+    transaction_count = models.IntegerField(null=True, blank=True)
     providers = models.ManyToManyField(Provider, related_name="blocks")
-    created_at = models.DateTimeField(auto_now_add=True)
-    stored_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    # chain time: when the block was produced, as reported by the provider
+    created_at = models.DateTimeField(default=timezone.now)
+    stored_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # newest-first listings (API and admin) and the admin date hierarchy
+            models.Index(fields=["-stored_at"], name="block_stored_at_idx"),
+            models.Index(fields=["currency", "-stored_at"], name="block_currency_stored_at_idx"),
+            # since/until filters and the nearest-block seeks of /blocks/at-time; the
+            # Postgres-only BRIN index on created_at is in migration 0009
+            models.Index(fields=["currency", "created_at"], name="block_currency_created_idx"),
+        ]
+        constraints = [
+            # also the index behind lookups by hash
+            models.UniqueConstraint(fields=["hash"], name="block_hash_uniq"),
+            # one block per height, however many workers store it at once; also
+            # the index behind lookups and reorg checks by height
+            models.UniqueConstraint(fields=["currency", "block_number"], name="block_currency_number_uniq"),
+        ]
+
+
+class Transaction(models.Model):
+    # indexed through transaction_block_index_uniq, whose leading column it is
+    block = models.ForeignKey(Block, on_delete=models.CASCADE, related_name="transactions", db_index=False)
+    hash = models.CharField(max_length=66)
+    # position within the block
+    index = models.IntegerField()
+    sender = models.CharField(max_length=42, null=True, blank=True)
+    recipient = models.CharField(max_length=42, null=True, blank=True)
+    # wei
+    value = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True)
+    fee = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True)
+    gas_used = models.BigIntegerField(null=True, blank=True)
+    failed = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["hash"], name="transaction_hash_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["block", "index"], name="transaction_block_index_uniq"),
+        ]
+
+
+class IngestEvent(models.Model):
+    """One provider response as received, for querying provider stats later.
+
+    The GIN and expression indexes on ``payload`` are Postgres-only and
+    live in migration 0008 rather than ``Meta.indexes``.
+    """
+
+    currency = models.ForeignKey(Currency, on_delete=models.CASCADE)
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE)
+    # the block this response stored, if any
+    block = models.ForeignKey(Block, on_delete=models.SET_NULL, null=True, blank=True, related_name="ingest_events")
+    fetched_at = models.DateTimeField(default=timezone.now)
+    # the response's data, limited to INGEST_PAYLOAD_FIELDS when set
+    payload = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["provider", "-fetched_at"], name="ingest_provider_fetched_idx"),
+        ]
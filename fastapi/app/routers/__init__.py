@@ -1,4 +1,6 @@
 from .auth import *
 from .health import *
+from .metrics import *
+from .profiling import *
 from .user import *
 from .crypto import *
\ No newline at end of file
@@ -1,4 +1,5 @@
 from app.api import AuthAPI
+from app.dependencies.ratelimit import limit_by_ip
 from app.schemas import Token
 
 from fastapi import APIRouter, Depends, Request
@@ -7,7 +8,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 auth_router = APIRouter()
 
 
-@auth_router.post("/login", response_model=Token)
+@auth_router.post("/login", response_model=Token, dependencies=[Depends(limit_by_ip("auth_login"))])
 async def login(
     request: Request, form_data: OAuth2PasswordRequestForm = Depends()
 ) -> dict[str, str]:
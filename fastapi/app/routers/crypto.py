@@ -1,52 +1,133 @@
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import ORJSONResponse
 from app.api.crypto import CryptoAPI
 from app.models.user import User
 from app.schemas.crypto import (
     BlockSchema,
     BlockListResponse,
     ProviderSchema,
-    CurrencySchema
+    ProviderDetailSchema,
+    CurrencySchema,
+    TransactionPageResponse,
+)
+from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.dependencies.ratelimit import limit_by_user, page_cost
+
+# CryptoAPI returns ready responses built from trusted, already-shaped dicts,
+# which skips FastAPI's response_model re-validation; the response models are
+# kept for the OpenAPI docs.
+# Every crypto route draws from the caller's "crypto" bucket; larger pages cost more.
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["crypto"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(limit_by_user("crypto", cost=page_cost))],
 )
-from app.dependencies.auth import get_current_user
 
-router = APIRouter(prefix="/api/v1", tags=["crypto"])
+EXPAND_QUERY = Query(None, description="Comma-separated relations to embed: providers")
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated block fields to return "
+    "(id, currency, block_number, hash, parent_hash, provider_ids, providers, created_at, stored_at)",
+)
 
 # Block endpoints
 @router.get("/blocks", response_model=BlockListResponse)
 async def get_blocks(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     currency_name: str = Query(None, description="Filter by currency name"),
     provider_id: int = Query(None, description="Filter by provider ID"),
+    expand: str = EXPAND_QUERY,
+    fields: str = FIELDS_QUERY,
+    since: datetime = Query(None, description="Only blocks with chain time (created_at) at or after this"),
+    until: datetime = Query(None, description="Only blocks with chain time (created_at) before this"),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of recorded blocks with filtering and pagination"""
-    return await CryptoAPI.get_blocks(page, page_size, currency_name, provider_id, current_user)
+    return await CryptoAPI.get_blocks(
+        request, page, page_size, currency_name, provider_id, current_user, expand, fields, since, until
+    )
+
+# Declared before /blocks/{block_id}, which would otherwise match "at-time"
+@router.get("/blocks/at-time", response_model=BlockSchema)
+async def get_block_at_time(
+    request: Request,
+    timestamp: datetime = Query(..., description="ISO 8601 or Unix time; UTC when no offset is given"),
+    currency_name: str = Query(..., description="Currency name"),
+    expand: str = EXPAND_QUERY,
+    fields: str = FIELDS_QUERY,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the block whose chain time is nearest a timestamp"""
+    return await CryptoAPI.get_block_at_time(request, timestamp, currency_name, current_user, expand, fields)
 
 @router.get("/blocks/by-currency/{currency_name}/{block_number}", response_model=BlockSchema)
 async def get_block_by_currency_and_number(
+    request: Request,
     currency_name: str,
     block_number: int,
+    expand: str = EXPAND_QUERY,
+    fields: str = FIELDS_QUERY,
     current_user: User = Depends(get_current_user)
 ):
     """Get block by currency name and block number"""
-    return await CryptoAPI.get_block_by_currency_and_number(currency_name, block_number, current_user)
+    return await CryptoAPI.get_block_by_currency_and_number(
+        request, currency_name, block_number, current_user, expand, fields
+    )
+
+@router.get("/blocks/by-hash/{block_hash}", response_model=BlockSchema)
+async def get_block_by_hash(
+    request: Request,
+    block_hash: str = Path(..., regex=r"^(0x)?[0-9a-fA-F]{64}$", description="Block hash, 0x prefix optional"),
+    expand: str = EXPAND_QUERY,
+    fields: str = FIELDS_QUERY,
+    current_user: User = Depends(get_current_user)
+):
+    """Get block by its chain hash"""
+    return await CryptoAPI.get_block_by_hash(request, block_hash, current_user, expand, fields)
 
 @router.get("/blocks/{block_id}", response_model=BlockSchema)
 async def get_block_by_id(
+    request: Request,
     block_id: int,
+    expand: str = EXPAND_QUERY,
+    fields: str = FIELDS_QUERY,
     current_user: User = Depends(get_current_user)
 ):
     """Get block by application ID"""
-    return await CryptoAPI.get_block_by_id(block_id, current_user)
+    return await CryptoAPI.get_block_by_id(request, block_id, current_user, expand, fields)
+
+# Transaction endpoints
+@router.get("/transactions", response_model=TransactionPageResponse)
+async def get_transactions(
+    request: Request,
+    block_id: int = Query(None, description="Filter by block ID"),
+    hash: str = Query(None, regex=r"^(0x)?[0-9a-fA-F]{64}$", description="Filter by transaction hash"),
+    cursor: str = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Items per page"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get transactions in id order, paged with keyset cursors"""
+    return await CryptoAPI.get_transactions(request, block_id, hash, cursor, limit, current_user)
 
 # Reference data endpoints
 @router.get("/providers", response_model=list[ProviderSchema])
-async def get_providers(current_user: User = Depends(get_current_user)):
+async def get_providers(request: Request, current_user: User = Depends(get_current_user)):
     """Get list of available providers"""
-    return await CryptoAPI.get_providers(current_user)
+    return await CryptoAPI.get_providers(request, current_user)
+
+@router.get("/providers/{provider_id}", response_model=ProviderDetailSchema)
+async def get_provider_detail(
+    request: Request, provider_id: int, current_user: User = Depends(get_current_admin_user)
+):
+    """Get a provider including its API key (admin only)"""
+    return await CryptoAPI.get_provider_detail(request, provider_id, current_user)
 
 @router.get("/currencies", response_model=list[CurrencySchema])
-async def get_currencies(current_user: User = Depends(get_current_user)):
+async def get_currencies(request: Request, current_user: User = Depends(get_current_user)):
     """Get list of available currencies"""
-    return await CryptoAPI.get_currencies(current_user)
+    return await CryptoAPI.get_currencies(request, current_user)
@@ -1,3 +1,8 @@
+from typing import Any
+
+from app.api.health import HealthAPI
+from config.db import connection_stats, get_db_executor
+
 from fastapi import APIRouter, Request
 
 health_router = APIRouter()
@@ -6,3 +11,23 @@ health_router = APIRouter()
 @health_router.get("/")
 async def get(request: Request) -> dict[str, str]:
     return {"status": "ok"}
+
+
+@health_router.get("/live")
+async def get_live(request: Request):
+    """Liveness: the process is serving requests"""
+    return await HealthAPI.live(request)
+
+
+@health_router.get("/ready")
+async def get_ready(request: Request):
+    """Readiness: Postgres and Redis respond in time (503 otherwise), plus ingest freshness"""
+    return await HealthAPI.ready(request)
+
+
+@health_router.get("/db")
+async def get_db(request: Request) -> dict[str, Any]:
+    return {
+        "executor": get_db_executor().stats(),
+        "connections": connection_stats.stats(),
+    }
@@ -0,0 +1,13 @@
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from config.db import run_db
+
+from fastapi import APIRouter, Request, Response
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("")
+async def get(request: Request) -> Response:
+    # Some collectors query the database, so the scrape runs on the DB executor.
+    return Response(await run_db(generate_latest), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,26 @@
+from typing import Any
+
+from app.dependencies.auth import get_current_admin_user
+from app.models.user import User
+from config.profiling import sql_profiler
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+profiling_router = APIRouter()
+
+
+@profiling_router.get("/sql")
+async def get_sql(
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_admin_user),
+) -> dict[str, Any]:
+    """Top slow queries and N+1 patterns seen by this process (admin only)"""
+    return sql_profiler.report(limit)
+
+
+@profiling_router.delete("/sql", status_code=204, response_class=Response)
+async def clear_sql(request: Request, current_user: User = Depends(get_current_admin_user)) -> Response:
+    """Empty the slow-query and profile buffers (admin only)"""
+    sql_profiler.clear()
+    return Response(status_code=204)
@@ -1,5 +1,6 @@
 from app.api import UserAPI
 from app.dependencies.auth import get_current_user, get_current_admin_user
+from app.dependencies.ratelimit import limit_by_ip
 from app.models import User
 from app.schemas import CreateUserSchema, ReadUserSchema
 
@@ -21,7 +22,7 @@ async def create(request: Request, schema: CreateUserSchema) -> User:
     return await UserAPI.create(request, schema)
 
 
-@user_router.post("/register", response_model=ReadUserSchema)
+@user_router.post("/register", response_model=ReadUserSchema, dependencies=[Depends(limit_by_ip("user_register"))])
 async def create_account_public(user_data: CreateUserSchema):
     """Create a new account (public endpoint - auto activates)"""
     return await UserAPI.create_account_public(user_data)
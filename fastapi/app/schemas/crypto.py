@@ -6,6 +6,14 @@ from datetime import datetime
 class ProviderSchema(BaseModel):
     id: int
     name: str
+
+    class Meta:
+        model = "app.models.crypto.Provider"
+        fields = ["id", "name"]
+
+
+class ProviderDetailSchema(ProviderSchema):
+    """Provider including its credentials (admin only)"""
     api_key: str
 
     class Meta:
@@ -23,10 +31,16 @@ class CurrencySchema(BaseModel):
 
 
 class BlockSchema(BaseModel):
+    """Full block representation; ?fields= returns a subset of these keys"""
     id: int
     currency: CurrencySchema
     block_number: int
-    providers: List[ProviderSchema]
+    hash: Optional[str]
+    # Only with ?fields=parent_hash
+    parent_hash: Optional[str]
+    provider_ids: List[int]
+    # Only present with ?expand=providers
+    providers: Optional[List[ProviderSchema]]
     created_at: datetime
     stored_at: datetime
 
@@ -42,6 +56,31 @@ class BlockListResponse(BaseModel):
     page_size: int
 
 
+class TransactionSchema(BaseModel):
+    id: int
+    block_id: int
+    hash: str
+    index: int
+    sender: Optional[str]
+    recipient: Optional[str]
+    # wei, as a decimal string
+    value: Optional[str]
+    fee: Optional[str]
+    gas_used: Optional[int]
+    failed: bool
+
+    class Meta:
+        model = "app.models.crypto.Transaction"
+        fields = "__all__"
+
+
+class TransactionPageResponse(BaseModel):
+    transactions: List[TransactionSchema]
+    # Pass as ?cursor= for the next page; null on the last one
+    next_cursor: Optional[str]
+    limit: int
+
+
 class UserCreateSchema(BaseModel):
     username: str
     email: str
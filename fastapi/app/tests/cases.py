@@ -0,0 +1,28 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from app.tests.fake_redis import FakeRedis
+
+
+class RedisTestCase(TestCase):
+    """Points the block caches at an in-memory Redis."""
+
+    def setUp(self) -> None:
+        self.redis = FakeRedis()
+        for target in ("app.api.latest_blocks.get_redis", "app.api.block_cache.get_redis"):
+            patcher = mock.patch(target, return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def commit(self) -> None:
+        """Run and forget the on-commit callbacks registered so far, as a commit would.
+
+        captureOnCommitCallbacks leaves them registered, so on_commit_once
+        would skip registering them again later in the test.
+        """
+        while connection.run_on_commit:
+            callbacks, connection.run_on_commit[:] = list(connection.run_on_commit), []
+            for entry in callbacks:
+                entry[1]()
@@ -0,0 +1,138 @@
+"""Just enough of redis-py, in memory, for the block caches.
+
+Expiry is ignored; tests that care delete keys themselves. Pipelines queue
+commands until ``execute``, except between ``watch`` and ``multi``, and a
+transaction fails with ``WatchError`` when a watched key was written since
+``watch``. Lua can't run here: tests put a Python stand-in for each script
+they need in ``scripts``, keyed by its source.
+"""
+
+from typing import Any, Callable, Optional
+
+from redis.exceptions import WatchError
+
+
+def _bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._calls: list[tuple[str, tuple, dict]] = []
+        self._watched: Optional[dict[str, int]] = None
+        self._immediate = False
+
+    def __enter__(self) -> "FakePipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._watched = None
+
+    def watch(self, *keys: str) -> None:
+        self._watched = {key: self._redis.writes.get(key, 0) for key in keys}
+        self._immediate = True
+
+    def multi(self) -> None:
+        self._immediate = False
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def _queue(*args: Any, **kwargs: Any) -> Any:
+            if self._immediate:
+                return command(*args, **kwargs)
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    def execute(self) -> list[Any]:
+        calls, self._calls = self._calls, []
+        watched, self._watched = self._watched, None
+        if watched and any(self._redis.writes.get(key, 0) != count for key, count in watched.items()):
+            raise WatchError("Watched variable changed.")
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        # writes per key, for WATCH
+        self.writes: dict[str, int] = {}
+        self.scripts: dict[str, Callable[..., Any]] = {}
+
+    def _touch(self, *keys: str) -> None:
+        for key in keys:
+            self.writes[key] = self.writes.get(key, 0) + 1
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def register_script(self, script: str) -> Callable[..., Any]:
+        return self.scripts[script]
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False, px: Optional[int] = None) -> Optional[bool]:
+        if nx and key in self.data:
+            return None
+        self.data[key] = _bytes(value)
+        self._touch(key)
+        return True
+
+    def exists(self, *keys: str) -> int:
+        return sum(key in self.data for key in keys)
+
+    def delete(self, *keys: Any) -> int:
+        # Key names read back from sets arrive as bytes
+        keys = tuple(key.decode() if isinstance(key, bytes) else key for key in keys)
+        self._touch(*keys)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key: str) -> int:
+        value = int(self.data.get(key, 0)) + 1
+        self.set(key, value)
+        return value
+
+    def sadd(self, key: str, *members: str) -> int:
+        values = self.data.setdefault(key, set())
+        added = {_bytes(member) for member in members} - values
+        values.update(added)
+        self._touch(key)
+        return len(added)
+
+    def smembers(self, key: str) -> "set[bytes]":
+        return set(self.data.get(key, set()))
+
+    def zadd(self, key: str, mapping: dict[Any, float]) -> int:
+        values = self.data.setdefault(key, {})
+        added = sum(_bytes(member) not in values for member in mapping)
+        values.update({_bytes(member): score for member, score in mapping.items()})
+        self._touch(key)
+        return added
+
+    def zcard(self, key: str) -> int:
+        return len(self.data.get(key, {}))
+
+    def zrevrange(self, key: str, start: int, end: int) -> list[bytes]:
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1], reverse=True)
+        return [member for member, _ in (members[start:end + 1] if end >= 0 else members[start:])]
+
+    def zremrangebyrank(self, key: str, start: int, end: int) -> int:
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1])
+        end = len(members) + end if end < 0 else end
+        removed = members[start:end + 1] if end >= start else []
+        for member, _ in removed:
+            del self.data[key][member]
+        self._touch(key)
+        return len(removed)
+
+    def pexpire(self, key: str, ms: int) -> bool:
+        return key in self.data
+
+    def pttl(self, key: str) -> int:
+        return 60_000 if key in self.data else -2
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import orjson
+from django.test import SimpleTestCase
+
+from app.api.block_cache import BUSTED, BlockCache, block_cache, hash_key, id_key, number_key
+from app.models.crypto import Block, Currency, Provider
+from app.tests.cases import RedisTestCase
+from app.tests.fake_redis import FakeRedis
+
+
+def payload(block_id: int = 1, stored_at: datetime = datetime(2026, 1, 1, tzinfo=timezone.utc)) -> dict:
+    return {
+        "id": block_id,
+        "currency": {"id": 1, "name": "Ethereum"},
+        "block_number": 100 + block_id,
+        "hash": f"0x{block_id:02x}",
+        "stored_at": stored_at,
+    }
+
+
+class BlockCacheTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.redis = FakeRedis()
+        patcher = mock.patch("app.api.block_cache.get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = BlockCache(ttl=60, miss_ttl=5, l1_size=16, l1_ttl=60, bust_ttl=10)
+
+    async def test_fill_and_hit(self) -> None:
+        await self.cache.set(payload())
+        self.assertEqual(await self.cache.get(id_key(1)), (True, payload()))
+        self.cache.l1.clear()
+        cached = orjson.loads(orjson.dumps(payload()))
+        self.assertEqual(await self.cache.get(number_key("Ethereum", 101)), (True, cached))
+        self.assertEqual(await self.cache.get(hash_key("0x01")), (True, cached))
+
+    async def test_stale_fill_after_bust(self) -> None:
+        # A lookup reads the block, the block changes and is busted, then the lookup fills
+        self.cache.bust(id_key(1))
+        await self.cache.set(payload())
+        self.assertEqual(self.redis.get(id_key(1)), BUSTED)
+        self.assertEqual(await self.cache.get(id_key(1)), (False, None))
+        self.cache.l1.clear()
+        self.assertEqual(await self.cache.get(id_key(1)), (False, None))
+
+    async def test_missing_after_bust(self) -> None:
+        self.cache.bust(id_key(1))
+        await self.cache.set_missing(id_key(1))
+        self.assertEqual(await self.cache.get(id_key(1)), (False, None))
+
+    async def test_fill_after_marker_expires(self) -> None:
+        self.cache.bust(id_key(1))
+        self.redis.delete(id_key(1))
+        self.cache.l1.delete(id_key(1))
+        await self.cache.set(payload())
+        self.assertEqual(self.redis.get(id_key(1)), orjson.dumps(payload()))
+
+    async def test_unsettled_block_cached_briefly(self) -> None:
+        with mock.patch.object(self.cache, "_l2_set") as l2_set:
+            await self.cache.set(payload(stored_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        self.assertEqual(l2_set.call_args.args[2], self.cache.miss_ttl)
+
+
+class BustReceiverTests(RedisTestCase):
+    """Keys busted when the transaction commits"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.currency = Currency.objects.create(name="Ethereum")
+        self.provider = Provider.objects.create(name="Blockchair", api_key="N/A")
+        self.blocks = [
+            Block.objects.create(currency=self.currency, block_number=number, hash=f"0x{number:02x}")
+            for number in (1, 2)
+        ]
+        self.commit()
+        self.redis.data.clear()
+        block_cache.l1.clear()
+
+    def busted(self) -> set[str]:
+        return {key for key, value in self.redis.data.items() if value == BUSTED}
+
+    def keys(self, block: Block) -> set[str]:
+        return {id_key(block.pk), number_key("Ethereum", block.block_number), hash_key(block.hash)}
+
+    def test_save(self) -> None:
+        block = self.blocks[0]
+        block.transaction_count = 0
+        block.save()
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(block))
+
+    def test_not_busted_before_commit(self) -> None:
+        self.blocks[0].save()
+        self.assertEqual(self.busted(), set())
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[0]))
+
+    def test_link_from_block(self) -> None:
+        self.blocks[0].providers.add(self.provider)
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[0]))
+
+    def test_link_from_provider(self) -> None:
+        self.provider.blocks.add(*self.blocks)
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[0]) | self.keys(self.blocks[1]))
+
+    def test_clear_from_provider(self) -> None:
+        self.provider.blocks.add(self.blocks[1])
+        self.commit()
+        self.redis.data.clear()
+        self.provider.blocks.clear()
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[1]))
+
+    def test_provider_delete(self) -> None:
+        self.provider.blocks.add(self.blocks[0])
+        self.commit()
+        self.redis.data.clear()
+        self.provider.delete()
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[0]))
+
+    def test_cascade_delete(self) -> None:
+        # The cascade hands over blocks without their currency: it is looked up once
+        with mock.patch.object(Currency.objects, "values_list", wraps=Currency.objects.values_list) as lookup:
+            self.currency.delete()
+        self.commit()
+        self.assertEqual(lookup.call_count, 1)
+        self.assertEqual(self.busted(), self.keys(self.blocks[0]) | self.keys(self.blocks[1]))
+        self.assertFalse(Block.objects.exists())
+
+    def test_one_bust_per_commit(self) -> None:
+        self.blocks[0].delete()
+        self.commit()
+        self.redis.data.clear()
+        self.blocks[1].save()
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(self.blocks[1]))
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+from fastapi import HTTPException
+
+from app.api.crypto import parse_block_fields
+from app.api.serializers import DEFAULT_BLOCK_FIELDS
+
+
+class ParseBlockFieldsTests(SimpleTestCase):
+    def test_defaults_without_fields(self) -> None:
+        self.assertEqual(set(parse_block_fields(None, None)), set(DEFAULT_BLOCK_FIELDS))
+
+    def test_requested_fields_in_schema_order(self) -> None:
+        self.assertEqual(parse_block_fields("stored_at, block_number", None), ("block_number", "stored_at"))
+
+    def test_expand_adds_providers(self) -> None:
+        self.assertIn("providers", parse_block_fields("id", "providers"))
+
+    def test_unknown_field(self) -> None:
+        with self.assertRaises(HTTPException) as raised:
+            parse_block_fields("id,nope", None)
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_no_field_left(self) -> None:
+        for fields in ("", ",", " , ", "   "):
+            with self.subTest(fields=fields), self.assertRaises(HTTPException) as raised:
+                parse_block_fields(fields, None)
+            self.assertEqual(raised.exception.status_code, 400)
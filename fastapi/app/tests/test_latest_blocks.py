@@ -0,0 +1,168 @@
+from unittest import mock
+
+import orjson
+from redis.exceptions import RedisError
+
+from app.api.latest_blocks import (
+    _PUSH_SCRIPT,
+    DIRTY_KEY,
+    READY_KEY,
+    REBUILD_ATTEMPTS,
+    REBUILD_LOCK_KEY,
+    VERSION_KEY,
+    LatestBlocks,
+    latest_blocks,
+    scope_keys,
+)
+from app.models.crypto import Block, Currency, Provider
+from app.tests.cases import RedisTestCase
+from app.tests.fake_redis import FakeRedis
+
+
+class BlocksVersionTests(RedisTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.currency = Currency.objects.create(name="Ethereum")
+        self.provider = Provider.objects.create(name="Blockchair", api_key="N/A")
+        self.block = Block.objects.create(currency=self.currency, block_number=1, hash="0x01")
+        self.commit()
+        self.redis.set(READY_KEY, 1)
+
+    def version(self) -> int:
+        return int(self.redis.get(VERSION_KEY) or 0)
+
+    def test_new_block_keeps_version(self) -> None:
+        Block.objects.create(currency=self.currency, block_number=2, hash="0x02")
+        self.commit()
+        self.assertEqual(self.version(), 0)
+        self.assertTrue(self.redis.exists(READY_KEY))
+
+    def test_edit_bumps_once_per_transaction(self) -> None:
+        for number in (5, 6):
+            self.block.block_number = number
+            self.block.save()
+        self.commit()
+        self.assertEqual(self.version(), 1)
+        self.assertFalse(self.redis.exists(READY_KEY))
+
+    def test_delete_bumps(self) -> None:
+        self.block.delete()
+        self.commit()
+        self.assertEqual(self.version(), 1)
+
+    def test_ingest_link_keeps_window(self) -> None:
+        self.block.providers.add(self.provider)
+        self.commit()
+        self.assertEqual(self.version(), 1)
+        self.assertTrue(self.redis.exists(READY_KEY))
+
+    def test_link_changes_invalidate(self) -> None:
+        self.block.providers.add(self.provider)
+        for change in (
+            lambda: self.provider.blocks.add(self.block),
+            lambda: self.block.providers.remove(self.provider),
+            lambda: self.provider.blocks.clear(),
+        ):
+            self.redis.set(READY_KEY, 1)
+            change()
+            self.commit()
+            self.assertFalse(self.redis.exists(READY_KEY))
+
+    def test_version_in_window_page(self) -> None:
+        self.redis.incr(VERSION_KEY)
+        self.assertEqual(latest_blocks.read_page(None, 0, 10), (1, 0, [], None))
+
+    def test_version_unavailable(self) -> None:
+        with mock.patch.object(self.redis, "get", side_effect=RedisError):
+            self.assertIsNone(latest_blocks.version())
+        latest_blocks._skip_until = 0.0
+        self.assertEqual(latest_blocks.version(), 0)
+
+
+def push_script(redis: FakeRedis):
+    """_PUSH_SCRIPT in Python"""
+
+    def run(keys, args):
+        ready, _, _, _, _, scopes, dirty = keys
+        score, member, window, dirty_ms = args
+        if redis.pttl(ready) <= 0:
+            redis.set(dirty, 1, px=dirty_ms)
+            return 0
+        for set_key, total_key in (keys[1:3], keys[3:5]):
+            if redis.zadd(set_key, {member: score}):
+                redis.incr(total_key)
+            redis.zremrangebyrank(set_key, 0, -window - 1)
+        redis.sadd(scopes, keys[3], keys[4])
+        return 1
+
+    return run
+
+
+class LatestBlocksRebuildTests(RedisTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.redis.scripts[_PUSH_SCRIPT] = push_script(self.redis)
+        self.window = LatestBlocks(window=10, ttl=60)
+        self.currency = Currency.objects.create(name="Ethereum")
+        self.provider = Provider.objects.create(name="Blockchair", api_key="N/A")
+        self.heights = iter(range(1, 100))
+
+    def store(self) -> Block:
+        """A new block, stored and pushed the way store_block does"""
+        number = next(self.heights)
+        block = Block.objects.create(currency=self.currency, block_number=number, hash=f"0x{number:02x}")
+        block.providers.add(self.provider)
+        self.window.push(block, [self.provider])
+        return block
+
+    def stored_numbers(self, currency_name=None) -> list[int]:
+        set_key, total_key = scope_keys(currency_name)
+        members = [orjson.loads(member) for member in self.redis.zrevrange(set_key, 0, -1)]
+        self.assertEqual(int(self.redis.get(total_key)), len(members))
+        return sorted(block["block_number"] for block in members)
+
+    def test_push_rebuilds_when_not_ready(self) -> None:
+        self.store()
+        self.store()
+        self.assertTrue(self.redis.exists(READY_KEY))
+        self.assertFalse(self.redis.exists(DIRTY_KEY))
+        self.assertEqual(self.stored_numbers(), [1, 2])
+        self.assertEqual(self.stored_numbers("ethereum"), [1, 2])
+
+    def test_push_during_rebuild(self) -> None:
+        self.store()
+        self.redis.delete(READY_KEY)
+        load_scopes = self.window._load_scopes
+        pushed = []
+
+        def _load_scopes():
+            scopes = load_scopes()
+            if not pushed:
+                # Stored and pushed after this read: the push finds the rebuild lock taken
+                pushed.append(self.store())
+            return scopes
+
+        with mock.patch.object(self.window, "_load_scopes", side_effect=_load_scopes) as loads:
+            self.window.rebuild()
+        self.assertEqual(loads.call_count, 2)
+        self.assertTrue(self.redis.exists(READY_KEY))
+        self.assertEqual(self.stored_numbers(), [1, 2])
+        self.assertEqual(self.stored_numbers("ethereum"), [1, 2])
+
+    def test_rebuild_gives_up_while_pushes_keep_coming(self) -> None:
+        self.store()
+        self.redis.delete(READY_KEY)
+        load_scopes = self.window._load_scopes
+
+        def _load_scopes():
+            scopes = load_scopes()
+            self.store()
+            return scopes
+
+        with mock.patch.object(self.window, "_load_scopes", side_effect=_load_scopes):
+            self.window.rebuild()
+        self.assertFalse(self.redis.exists(READY_KEY))
+        self.assertFalse(self.redis.exists(REBUILD_LOCK_KEY))
+        # The next push rebuilds
+        self.store()
+        self.assertEqual(self.stored_numbers(), list(range(1, 2 + REBUILD_ATTEMPTS + 1)))
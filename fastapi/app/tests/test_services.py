@@ -0,0 +1,226 @@
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from app.api.block_cache import BUSTED, hash_key, id_key, number_key
+from app.api.latest_blocks import READY_KEY
+from app.models.crypto import Block, Currency, IngestEvent, Provider, Transaction
+from app.tests.cases import RedisTestCase
+from app.workers.services import (
+    BlockHeader,
+    _copy_transactions,
+    ethereum_sources,
+    load_transactions,
+    reconcile_blocks,
+    store_block,
+)
+
+STATS = {"best_block_height": 100, "best_block_hash": "0x" + "ab" * 32, "best_block_time": "2026-10-19 12:00:00"}
+
+
+class StoreBlockTests(TestCase):
+    def setUp(self) -> None:
+        for target in ("app.workers.services.latest_blocks.push", "app.workers.services.mark_primary_write"):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stores_new_height(self) -> None:
+        block = store_block(STATS)
+        self.assertEqual(block.block_number, 100)
+        self.assertEqual(list(block.providers.values_list("name", flat=True)), ["Blockchair"])
+        self.assertEqual(IngestEvent.objects.get().block, block)
+
+    def test_known_height(self) -> None:
+        store_block(STATS)
+        self.assertIsNone(store_block(STATS))
+        self.assertEqual(Block.objects.count(), 1)
+        self.assertEqual(IngestEvent.objects.count(), 2)
+
+    def test_height_stored_concurrently(self) -> None:
+        block = store_block(STATS)
+        # Another worker's insert landing between the exists() check and ours
+        with mock.patch("django.db.models.query.QuerySet.exists", return_value=False):
+            self.assertIsNone(store_block(STATS))
+        self.assertEqual(list(Block.objects.all()), [block])
+        self.assertEqual(list(block.providers.values_list("name", flat=True)), ["Blockchair"])
+        self.assertIsNone(IngestEvent.objects.latest("id").block)
+
+    def test_sources_are_unique(self) -> None:
+        self.assertEqual(ethereum_sources(), ethereum_sources())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Currency.objects.create(name="Ethereum")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Provider.objects.create(name="Blockchair", api_key="N/A")
+
+
+def block_hash(number: int, branch: str = "a") -> str:
+    return "0x" + f"{branch}{number}".rjust(64, "0")
+
+
+def chain(numbers, branch: str = "a") -> dict[int, BlockHeader]:
+    """Headers of ``branch`` at ``numbers``, each linked to the previous height"""
+    return {
+        number: BlockHeader(number, block_hash(number, branch), block_hash(number - 1, branch), None)
+        for number in numbers
+    }
+
+
+class ReconcileBlocksTests(RedisTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch("app.workers.services.mark_primary_write")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.currency = Currency.objects.create(name="Ethereum")
+        self.provider = Provider.objects.create(name="Blockchair", api_key="N/A")
+
+    def store(self, branches: str) -> dict[int, Block]:
+        """Blocks at heights 1.. on the given branch per height ("-" for no hash)"""
+        blocks = {}
+        for number, branch in enumerate(branches, start=1):
+            blocks[number] = Block.objects.create(
+                currency=self.currency,
+                block_number=number,
+                hash=block_hash(number, branch) if branch != "-" else None,
+                parent_hash=block_hash(number - 1, branch) if branch != "-" else None,
+            )
+        self.commit()
+        self.redis.data.clear()
+        self.redis.set(READY_KEY, 1)
+        return blocks
+
+    def busted(self) -> set[str]:
+        return {key for key, value in self.redis.data.items() if value == BUSTED}
+
+    def keys(self, block: Block) -> set[str]:
+        keys = {id_key(block.pk), number_key("Ethereum", block.block_number)}
+        return keys | {hash_key(block.hash)} if block.hash else keys
+
+    def stored(self) -> dict[int, Block]:
+        return {block.block_number: block for block in Block.objects.filter(currency=self.currency)}
+
+    def test_orphan_at_the_top(self) -> None:
+        blocks = self.store("aaab")
+        self.assertEqual(reconcile_blocks(self.currency, self.provider, chain(range(1, 5))), 1)
+
+        stored = self.stored()
+        replacement = stored[4]
+        self.assertNotEqual(replacement.pk, blocks[4].pk)
+        self.assertEqual((replacement.hash, replacement.parent_hash), (block_hash(4), block_hash(3)))
+        self.assertEqual(list(replacement.providers.all()), [self.provider])
+        self.assertEqual([stored[number].pk for number in (1, 2, 3)], [blocks[number].pk for number in (1, 2, 3)])
+
+        # Caches are only touched once the transaction commits
+        self.assertEqual(self.busted(), set())
+        self.assertTrue(self.redis.exists(READY_KEY))
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(blocks[4]) | self.keys(replacement))
+        self.assertFalse(self.redis.exists(READY_KEY))
+
+    def test_orphan_in_the_middle(self) -> None:
+        blocks = self.store("aabaa")
+        self.assertEqual(reconcile_blocks(self.currency, self.provider, chain(range(1, 6))), 1)
+
+        stored = self.stored()
+        self.assertEqual(stored[3].hash, block_hash(3))
+        self.assertNotEqual(stored[3].pk, blocks[3].pk)
+        for number in (1, 2, 4, 5):
+            self.assertEqual(stored[number].pk, blocks[number].pk)
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(blocks[3]) | self.keys(stored[3]))
+
+    def test_unlinked_headers_are_ignored(self) -> None:
+        blocks = self.store("aab")
+        headers = {**chain(range(1, 3)), 3: BlockHeader(3, block_hash(3), block_hash(2, "c"), None)}
+        self.assertEqual(reconcile_blocks(self.currency, self.provider, headers), 0)
+        self.assertEqual({number: block.hash for number, block in self.stored().items()},
+                         {number: block.hash for number, block in blocks.items()})
+        self.assertEqual(connection.run_on_commit, [])
+
+    def test_missing_hashes_filled_in(self) -> None:
+        blocks = self.store("a--")
+        self.assertEqual(reconcile_blocks(self.currency, self.provider, chain(range(1, 4))), 0)
+
+        stored = self.stored()
+        for number in (2, 3):
+            self.assertEqual(stored[number].pk, blocks[number].pk)
+            self.assertEqual((stored[number].hash, stored[number].parent_hash),
+                             (block_hash(number), block_hash(number - 1)))
+        self.commit()
+        self.assertEqual(self.busted(), self.keys(stored[2]) | self.keys(stored[3]))
+        # Backfills don't rebuild the latest blocks window
+        self.assertTrue(self.redis.exists(READY_KEY))
+
+    def test_nothing_to_do(self) -> None:
+        self.store("aaa")
+        self.assertEqual(reconcile_blocks(self.currency, self.provider, chain(range(1, 4))), 0)
+        self.assertEqual(connection.run_on_commit, [])
+
+
+# TRANSACTION_ROW_COLUMNS order: hash, index, sender, recipient, value, fee, gas_used, failed
+ROWS = [
+    ("0x" + "01" * 32, 0, "0x" + "aa" * 20, None, 10 ** 30, 21_000, 21_000, False),
+    ("0x" + "02" * 32, 1, None, "0x" + "bb" * 20, 0, None, None, True),
+]
+
+
+class LoadTransactionsTests(TestCase):
+    """Runs through COPY on Postgres and bulk_create elsewhere"""
+
+    def setUp(self) -> None:
+        patcher = mock.patch("app.workers.services.mark_primary_write")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.currency = Currency.objects.create(name="Ethereum")
+        self.blocks = [
+            Block.objects.create(currency=self.currency, block_number=number, hash=f"0x{number:02x}")
+            for number in (1, 2)
+        ]
+
+    def assertRowsStored(self, block: Block) -> None:
+        stored = [
+            (t.hash, t.index, t.sender, t.recipient, t.value, t.fee, t.gas_used, t.failed)
+            for t in Transaction.objects.filter(block=block).order_by("index")
+        ]
+        self.assertEqual(stored, [
+            (*row[:4], Decimal(row[4]), None if row[5] is None else Decimal(row[5]), *row[6:]) for row in ROWS
+        ])
+
+    def test_loads_rows_and_counts(self) -> None:
+        self.assertEqual(load_transactions(self.blocks, {1: ROWS, 2: []}, batch_size=1), 2)
+        self.assertRowsStored(self.blocks[0])
+        self.assertEqual(
+            list(Block.objects.order_by("block_number").values_list("transaction_count", flat=True)), [2, 0]
+        )
+
+    def test_blocks_without_rows_stay_pending(self) -> None:
+        self.assertEqual(load_transactions(self.blocks, {1: ROWS}, batch_size=10), 2)
+        self.assertIsNone(Block.objects.get(block_number=2).transaction_count)
+
+    def test_skips_replaced_and_loaded_blocks(self) -> None:
+        fetched = list(self.blocks)
+        # Block 1 was loaded by another run and block 2 replaced by a reorg since they were fetched
+        Block.objects.filter(pk=self.blocks[0].pk).update(transaction_count=5)
+        self.blocks[1].delete()
+        replacement = Block.objects.create(currency=self.currency, block_number=2, hash="0x22")
+
+        self.assertEqual(load_transactions(fetched, {1: ROWS, 2: ROWS}, batch_size=10), 0)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(Block.objects.get(pk=self.blocks[0].pk).transaction_count, 5)
+        replacement.refresh_from_db()
+        self.assertIsNone(replacement.transaction_count)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY is Postgres only")
+    def test_copy_round_trip(self) -> None:
+        tricky = ("0x" + "03" * 32, 2, 'quote " and, comma', "", 1, 2, 3, True)
+        _copy_transactions([(self.blocks[0].pk, *row) for row in (*ROWS, tricky)])
+        self.assertEqual(Transaction.objects.filter(block=self.blocks[0]).count(), 3)
+        stored = Transaction.objects.get(index=2)
+        self.assertEqual((stored.sender, stored.failed), ('quote " and, comma', True))
+        # An empty unquoted CSV field is NULL
+        self.assertIsNone(stored.recipient)
+        Transaction.objects.filter(index=2).delete()
+        self.assertRowsStored(self.blocks[0])
@@ -2,7 +2,7 @@ import os
 import django
 from celery import Celery
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.worker")
 django.setup()
 
 app = Celery("fastapi_django_template")
@@ -11,4 +11,5 @@ app.config_from_object("app.workers.settings", namespace="CELERY")
 # Import tasks explicitly to ensure registration
 from app.workers.eth_fetcher import fetch_ethereum_stats
 
-print("Registered tasks:", list(app.tasks.keys()))
+# Task duration metrics and the worker metrics endpoint
+from app.workers import metrics as _metrics  # noqa: F401
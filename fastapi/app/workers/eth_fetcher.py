@@ -1,11 +1,163 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger
+from typing import Optional, Union
+
 from celery import shared_task
-import requests
+from django.conf import settings
+
+from app.blockchair import parse_block_transactions
+
+from .services import (
+    BlockHeader,
+    ethereum_sources,
+    load_transactions,
+    parse_block_header,
+    pending_transaction_blocks,
+    recent_block_numbers,
+    reconcile_blocks,
+    store_block,
+)
+
+logger = getLogger(__name__)
+
+# Heights per Blockchair dashboards/blocks request (the API's maximum)
+HEADER_BATCH_SIZE = 10
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+# Set once parser processes couldn't be started; this process then parses inline
+_parse_pool_unavailable = False
+# Thread pool workers share one parse pool
+_parse_pool_lock = threading.Lock()
+
+
+def can_start_processes() -> bool:
+    """Whether this process may have children.
+
+    Celery's default prefork pool runs tasks in daemonic processes, which
+    can't start any (``--pool threads`` or ``solo`` workers can).
+    """
+    import billiard
+
+    return not (multiprocessing.current_process().daemon or billiard.current_process().daemon)
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """This worker process's pool for parsing large payloads, created on first use"""
+    global _parse_pool, _parse_pool_unavailable
+    if _parse_pool is not None or settings.BLOCK_PARSE_PROCESSES <= 0 or _parse_pool_unavailable:
+        return _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None and not _parse_pool_unavailable:
+            if not can_start_processes():
+                logger.info("Worker processes are daemonic, parsing full blocks inline")
+                _parse_pool_unavailable = True
+                return None
+            # Spawned rather than forked: a fork would inherit the worker's DB
+            # connections and threads, while spawned parsers only import app.blockchair
+            _parse_pool = ProcessPoolExecutor(
+                settings.BLOCK_PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+
+def _parse(pool: Optional[ProcessPoolExecutor], payload: bytes) -> Union[Future, dict[int, list[tuple]]]:
+    """Parse ``payload`` in ``pool`` (a Future) or inline if there is none or it can't start"""
+    global _parse_pool, _parse_pool_unavailable
+    if pool is not None:
+        try:
+            return pool.submit(parse_block_transactions, payload)
+        except (AssertionError, OSError):
+            # Parser processes are started on submit; e.g. a daemonic worker
+            # the check above missed, or the process limit was reached
+            logger.warning("Could not start block parser processes, parsing inline", exc_info=True)
+            pool.shutdown(wait=False)
+            _parse_pool, _parse_pool_unavailable = None, True
+    return parse_block_transactions(payload)
 
-from .services import store_block
 
 @shared_task
 def fetch_ethereum_stats():
-    response = requests.get("https://api.blockchair.com/ethereum/stats")
+    # Imported here so beat, which only schedules this task, never loads requests
+    import requests
+
+    response = requests.get(f"{settings.BLOCKCHAIR_API_URL}/ethereum/stats", timeout=settings.BLOCKCHAIR_TIMEOUT)
     if response.status_code == 200:
         data = response.json().get("data", {})
-        store_block(data)
+        block = store_block(data)
+        if block is not None and settings.REORG_CHECK_DEPTH > 0:
+            numbers = recent_block_numbers(block, settings.REORG_CHECK_DEPTH)
+            headers = fetch_block_headers(numbers)
+            if headers:
+                currency, provider = ethereum_sources()
+                reconcile_blocks(currency, provider, headers)
+        if block is not None and settings.TRANSACTIONS_ENABLED:
+            # New blocks and ones just replaced by a reorg
+            blocks = pending_transaction_blocks(
+                block, max(settings.REORG_CHECK_DEPTH, 1), settings.TRANSACTIONS_BLOCKS_PER_RUN
+            )
+            if blocks:
+                rows = fetch_block_transactions([pending.block_number for pending in blocks])
+                load_transactions(blocks, rows, settings.TRANSACTION_COPY_BATCH)
+
+
+def fetch_block_headers(numbers: list[int]) -> dict[int, BlockHeader]:
+    """Canonical headers for ``numbers``, batched; heights the provider doesn't have yet are left out"""
+    import requests
+
+    headers: dict[int, BlockHeader] = {}
+    with requests.Session() as session:
+        for start in range(0, len(numbers), HEADER_BATCH_SIZE):
+            batch = numbers[start:start + HEADER_BATCH_SIZE]
+            response = session.get(
+                f"{settings.BLOCKCHAIR_API_URL}/ethereum/dashboards/blocks/{','.join(map(str, batch))}",
+                timeout=settings.BLOCKCHAIR_TIMEOUT,
+            )
+            if response.status_code != 200:
+                # A partial view could hide where a reorg starts
+                logger.warning("Block headers request failed with %s, skipping reorg check", response.status_code)
+                return {}
+            for item in (response.json().get("data") or {}).values():
+                if item and item.get("block"):
+                    header = parse_block_header(item["block"])
+                    headers[header.number] = header
+    return headers
+
+
+def fetch_block_transactions(numbers: list[int]) -> dict[int, list[tuple]]:
+    """Height -> parsed transaction rows from full block dashboards, batched.
+
+    Responses of at least ``BLOCK_PARSE_POOL_MIN_BYTES`` are parsed in the
+    process pool while the next batch downloads; smaller ones inline, as are
+    all of them where the pool can't run. A
+    failed request ends the run early; its heights stay pending.
+    """
+    global _parse_pool
+    import requests
+
+    parsed: list = []
+    with requests.Session() as session:
+        for start in range(0, len(numbers), HEADER_BATCH_SIZE):
+            batch = numbers[start:start + HEADER_BATCH_SIZE]
+            response = session.get(
+                f"{settings.BLOCKCHAIR_API_URL}/ethereum/dashboards/blocks/{','.join(map(str, batch))}",
+                params={"transaction_details": "true"},
+                timeout=settings.BLOCKCHAIR_TIMEOUT,
+            )
+            if response.status_code != 200:
+                logger.warning("Full blocks request failed with %s", response.status_code)
+                break
+            large = len(response.content) >= settings.BLOCK_PARSE_POOL_MIN_BYTES
+            parsed.append(_parse(get_parse_pool() if large else None, response.content))
+
+    rows: dict[int, list[tuple]] = {}
+    try:
+        for item in parsed:
+            rows.update(item.result() if isinstance(item, Future) else item)
+    except BrokenProcessPool:
+        # A parser died (e.g. killed for memory); start a fresh pool next run
+        _parse_pool = None
+        raise
+    return rows
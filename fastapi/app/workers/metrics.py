@@ -0,0 +1,39 @@
+import os
+import time
+from typing import Any
+
+from celery.signals import task_postrun, task_prerun, worker_init
+from django.conf import settings
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess, start_http_server
+
+from config.metrics import CELERY_TASK_DURATION
+
+_task_started: dict[str, float] = {}
+
+
+@task_prerun.connect
+def _start_task_timer(task_id: str, **kwargs: Any) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _observe_task_duration(task_id: str, task: Any, state: str = "", **kwargs: Any) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def _start_metrics_server(**kwargs: Any) -> None:
+    """Serve worker metrics on CELERY_METRICS_PORT.
+
+    Prefork children record metrics in separate processes; set
+    PROMETHEUS_MULTIPROC_DIR so the main process can aggregate them.
+    """
+    if not settings.CELERY_METRICS_PORT:
+        return
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(settings.CELERY_METRICS_PORT, registry=registry)
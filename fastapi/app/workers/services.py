@@ -1,17 +1,276 @@
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from logging import getLogger
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
 from django.utils import timezone
-from app.models.crypto import Currency, Provider, Block
+from django.utils.dateparse import parse_datetime
+from app.api.block_cache import bust_block
+from app.api.latest_blocks import latest_blocks
+from app.api.serializers import normalize_block_hash
+from app.blockchair import TRANSACTION_ROW_COLUMNS
+from app.models.crypto import Currency, Provider, Block, IngestEvent, Transaction
+from config.db_router import mark_primary_write
+from config.metrics import INGEST_LAG, REORG_DEPTH
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BlockHeader:
+    number: int
+    hash: str
+    parent_hash: str
+    time: Optional[datetime]
+
+
+def parse_block_time(value) -> Optional[datetime]:
+    """Parse a provider timestamp; Blockchair sends naive UTC strings"""
+    if not value:
+        return None
+    parsed = value if isinstance(value, datetime) else parse_datetime(str(value))
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
 
-def store_block(data):
+
+def parse_block_header(data) -> BlockHeader:
+    """Header fields of a Blockchair block dashboard's ``block`` object"""
+    return BlockHeader(
+        number=int(data["id"]),
+        hash=normalize_block_hash(data["hash"]),
+        parent_hash=normalize_block_hash(data["parent_hash"]),
+        time=parse_block_time(data.get("time")),
+    )
+
+
+def ethereum_sources() -> tuple[Currency, Provider]:
+    # Both names are unique, so get_or_create falls back to a get when another
+    # worker creates the row first
     currency, _ = Currency.objects.get_or_create(name="Ethereum")
     provider, _ = Provider.objects.get_or_create(name="Blockchair", defaults={"api_key": "N/A"})
+    return currency, provider
+
+
+def store_block(data) -> Optional[Block]:
+    """Store the newest block from a Blockchair stats payload; None if already stored.
+
+    The payload itself is recorded as an ``IngestEvent`` either way.
+    """
+    currency, provider = ethereum_sources()
     block_number = data.get("best_block_height")
+    block_hash = data.get("best_block_hash")
     block_time = data.get("best_block_time")
 
-    if not Block.objects.filter(currency=currency, block_number=block_number).exists():
-        block = Block.objects.create(
-            currency=currency,
-            block_number=block_number,
-            created_at=block_time,
-            stored_at=timezone.now()
+    if Block.objects.filter(currency=currency, block_number=block_number).exists():
+        record_ingest_event(currency, provider, None, data)
+        return None
+
+    stored_at = timezone.now()
+    chain_time = parse_block_time(block_time)
+    try:
+        with transaction.atomic():
+            block = Block.objects.create(
+                currency=currency,
+                block_number=block_number,
+                hash=normalize_block_hash(block_hash) if block_hash else None,
+                created_at=chain_time or stored_at,
+                stored_at=stored_at
+            )
+            block.providers.add(provider)
+    except IntegrityError:
+        # Another worker stored this height since the check above
+        record_ingest_event(currency, provider, None, data)
+        return None
+    mark_primary_write()
+    latest_blocks.push(block, [provider])
+
+    record_ingest_event(currency, provider, block, data)
+
+    if chain_time is not None:
+        INGEST_LAG.observe((block.stored_at - chain_time).total_seconds())
+    return block
+
+
+def record_ingest_event(currency: Currency, provider: Provider, block: Optional[Block], data) -> None:
+    if not settings.INGEST_EVENTS_ENABLED:
+        return
+    fields = settings.INGEST_PAYLOAD_FIELDS
+    payload = {key: data[key] for key in fields if key in data} if fields else data
+    IngestEvent.objects.create(currency=currency, provider=provider, block=block, payload=payload)
+
+
+def recent_block_numbers(block: Block, depth: int) -> list[int]:
+    """Heights stored for ``block``'s currency in the ``depth`` heights up to it"""
+    return sorted(set(
+        Block.objects.filter(
+            currency_id=block.currency_id,
+            block_number__gt=block.block_number - depth,
+            block_number__lte=block.block_number,
+        ).values_list("block_number", flat=True)
+    ))
+
+
+def reconcile_blocks(currency: Currency, provider: Provider, headers: dict[int, BlockHeader]) -> int:
+    """Check stored blocks against the provider's canonical headers.
+
+    All stored blocks at the headers' heights are loaded in one query.
+    Blocks whose hash differs were orphaned by a reorganization. They are
+    deleted and replaced by the canonical blocks in one transaction. Blocks
+    missing their hash or parent hash get them filled in. Returns the number
+    of replaced blocks.
+    """
+    if not _headers_link(currency, headers):
+        return 0
+
+    stored = list(Block.objects.filter(currency=currency, block_number__in=sorted(headers)).select_related("currency"))
+    orphaned = [block for block in stored if block.hash and block.hash != headers[block.block_number].hash]
+    incomplete = [block for block in stored if block not in orphaned and not (block.hash and block.parent_hash)]
+    if not orphaned and not incomplete:
+        return 0
+
+    for block in incomplete:
+        header = headers[block.block_number]
+        block.hash, block.parent_hash = header.hash, header.parent_hash
+    replacements = _replace_blocks(currency, provider, headers, orphaned, incomplete)
+
+    if orphaned:
+        REORG_DEPTH.observe(len(replacements))
+        logger.warning(
+            "Reorganization of %s: replaced %d block(s) from height %d",
+            currency.name, len(replacements), replacements[0].block_number,
+        )
+    return len(replacements)
+
+
+def _headers_link(currency: Currency, headers: dict[int, BlockHeader]) -> bool:
+    """Whether adjacent headers link up by parent hash.
+
+    If not, the provider answered from two views of the chain; the next
+    check will see a settled one.
+    """
+    numbers = sorted(headers)
+    for previous, number in zip(numbers, numbers[1:]):
+        if number == previous + 1 and headers[number].parent_hash != headers[previous].hash:
+            logger.warning("Provider headers for %s don't link at %s, skipping reorg check", currency.name, number)
+            return False
+    return True
+
+
+def _replace_blocks(
+    currency: Currency,
+    provider: Provider,
+    headers: dict[int, BlockHeader],
+    orphaned: list[Block],
+    incomplete: list[Block],
+) -> list[Block]:
+    """Replace ``orphaned`` by canonical blocks and save ``incomplete`` in one transaction; returns the replacements"""
+    replacements = []
+    with transaction.atomic():
+        if orphaned:
+            # Deleted before inserting, so an orphan's hash can't clash with its replacement's
+            Block.objects.filter(pk__in=[block.pk for block in orphaned]).delete()
+            now = timezone.now()
+            replacements = Block.objects.bulk_create([
+                Block(
+                    currency=currency,
+                    block_number=number,
+                    hash=headers[number].hash,
+                    parent_hash=headers[number].parent_hash,
+                    created_at=headers[number].time or now,
+                    stored_at=now,
+                )
+                for number in sorted({block.block_number for block in orphaned})
+            ])
+            Block.providers.through.objects.bulk_create([
+                Block.providers.through(block_id=block.pk, provider_id=provider.pk) for block in replacements
+            ])
+        if incomplete:
+            Block.objects.bulk_update(incomplete, ["hash", "parent_hash"])
+        mark_primary_write()
+
+        def _after_commit() -> None:
+            # Readers may have re-cached orphans between the delete and the
+            # commit. This reaches Redis and this process's L1 only; API
+            # processes may serve an orphan from their L1 for up to
+            # BLOCK_CACHE_L1_TTL. Filled-in parent hashes only reach the
+            # latest blocks window at its next rebuild; rebuilding for every
+            # new block would defeat it.
+            for block in (*orphaned, *replacements, *incomplete):
+                bust_block(block)
+            if orphaned:
+                latest_blocks.invalidate()
+
+        transaction.on_commit(_after_commit)
+    return replacements
+
+
+def pending_transaction_blocks(block: Block, depth: int, limit: int) -> list[Block]:
+    """Stored blocks within ``depth`` heights up to ``block`` whose transactions aren't loaded, newest first"""
+    return list(
+        Block.objects.filter(
+            currency_id=block.currency_id,
+            block_number__gt=block.block_number - depth,
+            block_number__lte=block.block_number,
+            transaction_count__isnull=True,
+        ).order_by("-block_number")[:limit]
+    )
+
+
+def load_transactions(blocks: list[Block], rows_by_number: dict[int, list[tuple]], batch_size: int) -> int:
+    """Insert parsed transaction rows (``TRANSACTION_ROW_COLUMNS`` order) for ``blocks``.
+
+    One transaction covers all blocks, their rows and their
+    ``transaction_count``. On Postgres rows are streamed with ``COPY`` in
+    batches of ``batch_size``; other databases use ``bulk_create``. Blocks
+    without parsed rows are left pending. Returns the number of rows.
+    """
+    loaded = [block for block in blocks if block.block_number in rows_by_number]
+    if not loaded:
+        return 0
+
+    rows = []
+    for block in loaded:
+        block.transaction_count = len(rows_by_number[block.block_number])
+        rows.extend((block.pk, *row) for row in rows_by_number[block.block_number])
+
+    with transaction.atomic():
+        # The block may have been orphaned and replaced since it was fetched
+        existing = set(
+            Block.objects.filter(pk__in=[block.pk for block in loaded], transaction_count__isnull=True)
+            .select_for_update()
+            .values_list("pk", flat=True)
+        )
+        rows = [row for row in rows if row[0] in existing]
+        loaded = [block for block in loaded if block.pk in existing]
+        for start in range(0, len(rows), batch_size):
+            if connection.vendor == "postgresql":
+                _copy_transactions(rows[start:start + batch_size])
+            else:
+                Transaction.objects.bulk_create(
+                    [Transaction(block_id=row[0], **dict(zip(TRANSACTION_ROW_COLUMNS, row[1:])))
+                     for row in rows[start:start + batch_size]]
+                )
+        Block.objects.bulk_update(loaded, ["transaction_count"])
+        mark_primary_write()
+    return len(rows)
+
+
+def _copy_transactions(rows: list[tuple]) -> None:
+    """Stream rows into the transaction table with Postgres COPY (CSV; an empty unquoted field is NULL)"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    buffer.seek(0)
+    columns = ", ".join(
+        connection.ops.quote_name(Transaction._meta.get_field(name).column)
+        for name in ("block", *TRANSACTION_ROW_COLUMNS)
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {connection.ops.quote_name(Transaction._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
         )
-        block.providers.add(provider)
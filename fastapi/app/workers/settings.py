@@ -1,4 +1,10 @@
 from celery.schedules import crontab
+from django.conf import settings
+
+# Workers run a thread pool (see docker-compose.yml) and each thread keeps one
+# persistent connection (Celery's Django fixup closes it once CONN_MAX_AGE is
+# exceeded), so concurrency is the pool size.
+CELERY_WORKER_CONCURRENCY = settings.DB_POOL_SIZE
 
 CELERY_BROKER_URL = "redis://redis:6379"
 CELERY_RESULT_BACKEND = "redis://redis:6379"
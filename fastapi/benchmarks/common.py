@@ -0,0 +1,123 @@
+"""Shared setup for the benchmark scripts.
+
+Run benchmarks from the ``fastapi`` directory, e.g.::
+
+    python -m benchmarks.serialization
+
+Unless ``DB_ENGINE`` is set they use their own SQLite database
+(``benchmarks/bench.sqlite3``). Results are saved as JSON under
+``benchmarks/results`` so runs can be compared.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def setup_django(migrate: bool = True) -> None:
+    os.environ.setdefault("ENV_STATE", "local")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+    os.environ.setdefault("LOG_HANDLER_FILE_PATH", str(BENCH_DIR / "bench.log"))
+    if "DB_ENGINE" not in os.environ:
+        os.environ["DB_ENGINE"] = "django.db.backends.sqlite3"
+        os.environ.setdefault("DB_NAME", str(BENCH_DIR / "bench.sqlite3"))
+
+    import django
+
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+
+
+def seed(blocks: int, currencies: int = 1, providers: int = 1, providers_per_block: int = 1) -> None:
+    """Replace all crypto data with ``blocks`` blocks spread over the currencies."""
+    from app.models import Block, Currency, Provider
+
+    Block.objects.all().delete()
+    Currency.objects.all().delete()
+    Provider.objects.all().delete()
+
+    currency_objs = Currency.objects.bulk_create(Currency(name=f"Currency{i}") for i in range(currencies))
+    provider_objs = Provider.objects.bulk_create(
+        Provider(name=f"Provider{i}", api_key=f"{i:0>150}") for i in range(providers)
+    )
+    start = datetime.now(timezone.utc) - timedelta(seconds=blocks)
+    block_objs = Block.objects.bulk_create(
+        Block(
+            currency=currency_objs[i % currencies],
+            block_number=i // currencies,
+            created_at=start + timedelta(seconds=i),
+            stored_at=start + timedelta(seconds=i),
+        )
+        for i in range(blocks)
+    )
+    if not block_objs or block_objs[0].pk is None:
+        # Backends without RETURNING don't set primary keys on bulk_create.
+        block_objs = list(Block.objects.order_by("id"))
+    through = Block.providers.through
+    through.objects.bulk_create(
+        through(block_id=block.pk, provider_id=provider_objs[(i + j) % providers].pk)
+        for i, block in enumerate(block_objs)
+        for j in range(min(providers_per_block, providers))
+    )
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency summary in milliseconds for samples given in seconds."""
+    ordered = sorted(s * 1000 for s in samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) if ordered else 0.0,
+        "min_ms": ordered[0] if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+    }
+
+
+def bench(func: Callable[[], Any], repeat: int, warmup: int = 5) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def save_results(name: str, results: dict[str, Any], db_engine: Optional[str] = None) -> Path:
+    if db_engine is None:
+        from django.conf import settings
+
+        db_engine = settings.DATABASES["default"]["ENGINE"]
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "db_engine": db_engine,
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, default=str))
+    return path
@@ -0,0 +1,137 @@
+"""Ingest throughput: blocks per second through the fetch task and ``store_block``.
+
+``--mode task`` (default) starts the provider simulator in-process, points
+``BLOCKCHAIR_API_URL`` at it and runs ``fetch_ethereum_stats`` through
+Celery with ``task_always_eager`` (the broker stand-in: ``delay()`` runs
+the task in the calling thread) from ``--workers`` threads. ``--mode
+store`` calls ``store_block`` directly with simulator payloads to isolate
+the database work::
+
+    python -m benchmarks.ingest --fetches 1000 --workers 4 --block-rate 500
+    python -m benchmarks.ingest --fetches 500 --latency-ms 20 --error-rate 0.05
+    python -m benchmarks.ingest --mode store --fetches 5000
+
+Reports fetches and blocks per second, SQL queries per block and per
+fetch, per-fetch latency and, in task mode, end-to-end lag from the time
+the simulator produced a block to its ``stored_at``.
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from benchmarks.common import save_results, seed, setup_django, summarize
+from benchmarks.provider_sim import add_simulator_arguments, simulator_from_args
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting statements across threads"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):  # type: ignore[no-untyped-def]
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["task", "store"], default="task")
+    parser.add_argument("--fetches", type=int, default=1000, help="Task runs (or store_block calls)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent worker threads")
+    add_simulator_arguments(parser)
+    parser.set_defaults(block_rate=200.0)
+    args = parser.parse_args()
+
+    simulator = simulator_from_args(args).start()
+    os.environ["BLOCKCHAIR_API_URL"] = simulator.url
+    setup_django()
+    seed(0)
+
+    from django.db import connection, connections
+
+    from app.models import Block
+    from app.workers.celery import app as celery_app
+    from app.workers.eth_fetcher import fetch_ethereum_stats
+    from app.workers.services import store_block
+
+    celery_app.conf.task_always_eager = True
+    chain = simulator.chain
+    counter = QueryCounter()
+    latencies: list[float] = []
+    failures = 0
+    failures_lock = threading.Lock()
+
+    def ingest_once(i: int) -> None:
+        nonlocal failures
+        started = time.perf_counter()
+        if args.mode == "task":
+            result = fetch_ethereum_stats.delay()
+            if result.failed():
+                with failures_lock:
+                    failures += 1
+        else:
+            store_block(chain.stats("ethereum", chain.start_height + i))
+        latencies.append(time.perf_counter() - started)
+
+    def worker(indexes: range) -> None:
+        with connection.execute_wrapper(counter):
+            for i in indexes:
+                ingest_once(i)
+        connections.close_all()
+
+    shares = [range(w, args.fetches, args.workers) for w in range(args.workers)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(worker, shares))
+    elapsed = time.perf_counter() - started
+    simulator.stop()
+
+    rows = list(Block.objects.values("block_number", "stored_at"))
+    blocks = len(rows)
+    distinct = len({row["block_number"] for row in rows})
+    results: dict[str, Any] = {
+        "config": vars(args),
+        "seconds": elapsed,
+        "fetches": args.fetches,
+        "fetches_per_second": args.fetches / elapsed,
+        "failed_tasks": failures,
+        "blocks_stored": blocks,
+        "duplicate_blocks": blocks - distinct,
+        "blocks_per_second": blocks / elapsed,
+        "queries": counter.count,
+        "queries_per_fetch": counter.count / args.fetches,
+        "queries_per_block": counter.count / blocks if blocks else None,
+        "fetch_latency": summarize(latencies),
+        "provider": dict(simulator.counts),
+    }
+    if args.mode == "task":
+        results["lag"] = summarize([
+            max(0.0, row["stored_at"].timestamp() - chain.block_timestamp(row["block_number"])) for row in rows
+        ])
+
+    print(
+        f"{args.mode}: {results['fetches_per_second']:.1f} fetches/s, {results['blocks_per_second']:.1f} blocks/s, "
+        f"{blocks} blocks ({results['duplicate_blocks']} duplicates), {failures} failed tasks"
+    )
+    provider = results["provider"]
+    print(f"provider: {provider['requests']} requests, {provider['errors']} injected errors, "
+          f"{provider['throttled']} throttled (the task drops non-200 responses)")
+    print(f"queries: {results['queries_per_fetch']:.2f}/fetch, {results['queries_per_block'] or 0:.2f}/block")
+    latency = results["fetch_latency"]
+    print(f"fetch latency: p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms, "
+          f"p99 {latency['p99_ms']:.2f} ms")
+    if "lag" in results:
+        lag = results["lag"]
+        print(f"end-to-end lag: p50 {lag['p50_ms']:.1f} ms, p95 {lag['p95_ms']:.1f} ms, max {lag['max_ms']:.1f} ms")
+    print(f"saved {save_results('ingest', results)}")
+
+
+if __name__ == "__main__":
+    main()
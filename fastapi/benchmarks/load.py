@@ -0,0 +1,320 @@
+"""Concurrent load against the crypto, user and auth routes.
+
+Seeds ``--blocks`` blocks over ``--currencies`` currencies and
+``--providers`` providers, then sends ``--requests`` requests per scenario
+from ``--concurrency`` concurrent clients and reports p50/p95/p99 latency
+and requests per second::
+
+    python -m benchmarks.load --blocks 10000 --requests 2000 --concurrency 32
+    python -m benchmarks.load --scenario blocks --scenario block_by_id
+
+By default requests go straight into the ASGI app in this process (the
+full middleware stack and DB executor, no sockets). ``--url`` targets a
+running server instead; seeding then only reaches it when this process's
+``DB_*`` settings point at the server's database (or use ``--no-seed``
+against an already seeded one).
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+from urllib.parse import urlencode
+
+import orjson
+
+from benchmarks.common import save_results, seed, setup_django, summarize
+
+BENCH_EMAIL = "bench-admin@example.com"
+BENCH_PASSWORD = "bench-password"
+
+Request = tuple[str, str, dict[str, str], bytes]  # method, path, headers, body
+
+
+@dataclass
+class Scenario:
+    name: str
+    # (request index) -> request
+    build: Callable[[int], Request]
+    # Expensive scenarios (password hashing) run fewer requests
+    weight: float = 1.0
+
+
+@dataclass
+class Context:
+    blocks: int
+    currencies: int
+    providers: int
+    page_size: int
+    token: str = ""
+    # Unique suffixes for created users across warmup and measured runs
+    sequence: Iterator[int] = field(default_factory=itertools.count)
+    run_id: str = field(default_factory=lambda: f"{int(time.time())}{random.randrange(1000):03d}")
+
+    @property
+    def auth(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def get(path: str, headers: dict[str, str], **params: Any) -> Request:
+    query = urlencode({key: value for key, value in params.items() if value is not None})
+    return "GET", f"{path}?{query}" if query else path, headers, b""
+
+
+def scenarios(ctx: Context) -> list[Scenario]:
+    crypto = "/crypto/api/v1"
+    pages = max(1, ctx.blocks // ctx.page_size)
+    per_currency = max(1, ctx.blocks // ctx.currencies)
+
+    def register(i: int) -> Request:
+        n = next(ctx.sequence)
+        # usernames are unique too and limited to 20 characters
+        body = (
+            f'{{"username": "l{ctx.run_id[-9:]}{n}", "email": "load-{ctx.run_id}-{n}@example.com", '
+            f'"password": "pw{n}"}}'
+        )
+        return "POST", "/user/register", {"Content-Type": "application/json"}, body.encode()
+
+    def login(i: int) -> Request:
+        body = urlencode({"username": BENCH_EMAIL, "password": BENCH_PASSWORD}).encode()
+        return "POST", "/auth/login", {"Content-Type": "application/x-www-form-urlencoded"}, body
+
+    return [
+        Scenario("blocks", lambda i: get(f"{crypto}/blocks", ctx.auth, page_size=ctx.page_size)),
+        Scenario("blocks_deep_page", lambda i: get(
+            f"{crypto}/blocks", ctx.auth, page=random.randint(1, pages), page_size=ctx.page_size
+        )),
+        Scenario("blocks_by_currency", lambda i: get(
+            f"{crypto}/blocks", ctx.auth, currency_name=f"Currency{i % ctx.currencies}", page_size=ctx.page_size
+        )),
+        Scenario("blocks_by_provider", lambda i: get(
+            f"{crypto}/blocks", ctx.auth, provider_id=PROVIDER_IDS[i % len(PROVIDER_IDS)], page_size=ctx.page_size
+        )),
+        Scenario("blocks_expand_providers", lambda i: get(
+            f"{crypto}/blocks", ctx.auth, page_size=ctx.page_size, expand="providers"
+        )),
+        Scenario("block_by_id", lambda i: get(f"{crypto}/blocks/{random.choice(BLOCK_IDS)}", ctx.auth)),
+        Scenario("block_by_currency_number", lambda i: get(
+            f"{crypto}/blocks/by-currency/Currency{i % ctx.currencies}/{random.randrange(per_currency)}", ctx.auth
+        )),
+        Scenario("providers", lambda i: get(f"{crypto}/providers", ctx.auth)),
+        Scenario("provider_detail", lambda i: get(
+            f"{crypto}/providers/{PROVIDER_IDS[i % len(PROVIDER_IDS)]}", ctx.auth
+        )),
+        Scenario("currencies", lambda i: get(f"{crypto}/currencies", ctx.auth)),
+        Scenario("user_me", lambda i: get("/user/", ctx.auth)),
+        Scenario("user_register", register, weight=0.1),
+        Scenario("auth_login", login, weight=0.1),
+    ]
+
+
+# Filled in after seeding
+BLOCK_IDS: list[int] = []
+PROVIDER_IDS: list[int] = []
+
+
+def seed_data(args: argparse.Namespace) -> None:
+    from app.models import User
+
+    seed(
+        args.blocks,
+        currencies=args.currencies,
+        providers=args.providers,
+        providers_per_block=args.providers_per_block,
+    )
+    User.objects.filter(email=BENCH_EMAIL).delete()
+    User.objects.create_user("bench", BENCH_EMAIL, BENCH_PASSWORD, is_admin=True)
+
+
+def load_ids() -> None:
+    from app.models import Block, Provider
+
+    BLOCK_IDS[:] = list(Block.objects.values_list("id", flat=True)) or [0]
+    PROVIDER_IDS[:] = list(Provider.objects.values_list("id", flat=True)) or [0]
+
+
+class ASGITransport:
+    """Send requests straight into an ASGI app."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, request: Request) -> tuple[int, bytes]:
+        method, target, headers, body = request
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"bench")] + [
+                (key.lower().encode(), value.encode()) for key, value in headers.items()
+            ] + [(b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        done = asyncio.Event()
+        body_sent = False
+        status = 0
+        chunks: list[bytes] = []
+
+        async def receive() -> dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+class HTTPTransport:
+    """Send requests to a running server, one ``requests`` session per client."""
+
+    def __init__(self, base_url: str, concurrency: int) -> None:
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+        self.sessions = [requests.Session() for _ in range(concurrency)]
+        self.free = list(range(concurrency))
+
+    async def __call__(self, request: Request) -> tuple[int, bytes]:
+        method, path, headers, body = request
+        slot = self.free.pop()
+        try:
+            session = self.sessions[slot]
+            response = await asyncio.get_running_loop().run_in_executor(
+                self.pool, lambda: session.request(method, self.base_url + path, headers=headers, data=body or None)
+            )
+            return response.status_code, response.content
+        finally:
+            self.free.append(slot)
+
+
+async def run_scenario(transport: Callable, scenario: Scenario, requests: int, concurrency: int) -> dict[str, Any]:
+    counter = itertools.count()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def client() -> None:
+        while (i := next(counter)) < requests:
+            request = scenario.build(i)
+            started = time.perf_counter()
+            try:
+                status, _ = await transport(request)
+            except Exception as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "statuses": dict(statuses),
+        "latency": summarize(latencies),
+    }
+
+
+def import_asgi_app() -> Any:
+    # config.asgi mounts ./static and ./media, so import it from a scratch directory
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    for name in ("static", "media"):
+        os.mkdir(os.path.join(scratch, name))
+    os.chdir(scratch)
+    try:
+        from config.asgi import fastapi_app
+    finally:
+        os.chdir(cwd)
+    return fastapi_app
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    transport = HTTPTransport(args.url, args.concurrency) if args.url else ASGITransport(import_asgi_app())
+    ctx = Context(args.blocks, args.currencies, args.providers, args.page_size)
+
+    login = next(scenario for scenario in scenarios(ctx) if scenario.name == "auth_login")
+    status, body = await transport(login.build(0))
+    if status != 200:
+        raise SystemExit(f"Benchmark login failed ({status}): {body[:200]!r}")
+    ctx.token = orjson.loads(body)["access_token"]
+
+    results = {}
+    for scenario in scenarios(ctx):
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        requests = max(1, int(args.requests * scenario.weight))
+        # Warm caches and connections; not measured
+        await run_scenario(transport, scenario, min(requests, args.concurrency), args.concurrency)
+        result = await run_scenario(transport, scenario, requests, args.concurrency)
+        results[scenario.name] = result
+        latency = result["latency"]
+        print(
+            f"{scenario.name:26} {result['rps']:9.1f} rps  p50 {latency['p50_ms']:8.2f}  "
+            f"p95 {latency['p95_ms']:8.2f}  p99 {latency['p99_ms']:8.2f} ms  errors {result['errors']}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=10000)
+    parser.add_argument("--currencies", type=int, default=3)
+    parser.add_argument("--providers", type=int, default=3)
+    parser.add_argument("--providers-per-block", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable)")
+    parser.add_argument("--url", help="Base URL of a running server instead of the in-process app")
+    parser.add_argument("--no-seed", action="store_true", help="Use the data already in the database")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep rate limiting on for the in-process app")
+    args = parser.parse_args()
+
+    if not args.rate_limit:
+        # One benchmark user would otherwise be throttled to its tier's limit
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    setup_django()
+    if not args.no_seed:
+        seed_data(args)
+    load_ids()
+
+    results = asyncio.run(run(args))
+    path = save_results("load", {"config": vars(args), "scenarios": results})
+    print(f"saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Payload size and latency of block responses by provider representation.
+
+Compares the old embedding of full providers (with ``api_key``) in every
+block against the compact default (``provider_ids``) and
+``?expand=providers`` (ids and names).
+
+    python -m benchmarks.payload --providers 3 --repeat 200
+"""
+
+import argparse
+from collections import defaultdict
+from typing import Any, Callable
+
+from benchmarks.common import bench, save_results, seed, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--providers", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(args.blocks, providers=args.providers, providers_per_block=args.providers)
+
+    import orjson
+
+    from app.api.serializers import BLOCK_COLUMNS, DEFAULT_BLOCK_FIELDS, serialize_blocks
+    from app.models import Block
+
+    page = Block.objects.order_by("-stored_at")[: args.page_size]
+
+    def embedded_api_keys() -> list[dict[str, Any]]:
+        rows = list(page.values(*BLOCK_COLUMNS))
+        providers = defaultdict(list)
+        links = Block.providers.through.objects.filter(block_id__in=[row["id"] for row in rows]).values(
+            "block_id", "provider_id", "provider__name", "provider__api_key"
+        )
+        for link in links:
+            providers[link["block_id"]].append(
+                {"id": link["provider_id"], "name": link["provider__name"], "api_key": link["provider__api_key"]}
+            )
+        return [
+            {
+                "id": row["id"],
+                "currency": {"id": row["currency_id"], "name": row["currency__name"]},
+                "block_number": row["block_number"],
+                "providers": providers[row["id"]],
+                "created_at": row["created_at"],
+                "stored_at": row["stored_at"],
+            }
+            for row in rows
+        ]
+
+    variants: dict[str, Callable[[], list[dict[str, Any]]]] = {
+        "embedded_api_keys": embedded_api_keys,
+        "compact": lambda: serialize_blocks(page),
+        "expand_providers": lambda: serialize_blocks(page, DEFAULT_BLOCK_FIELDS + ("providers",)),
+    }
+
+    results = {}
+    for name, build in variants.items():
+        results[name] = {**bench(lambda: orjson.dumps(build()), args.repeat), "bytes": len(orjson.dumps(build()))}
+        print(f"{name:<18} {results[name]['bytes']:>8} bytes  p50 {results[name]['p50_ms']:8.3f} ms")
+
+    print(f"saved {save_results('payload', results)}")
+
+
+if __name__ == "__main__":
+    main()
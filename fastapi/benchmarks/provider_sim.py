@@ -0,0 +1,281 @@
+"""Local stand-in for the Blockchair API.
+
+Serves Blockchair-shaped ``/{chain}/stats``,
+``/{chain}/dashboards/block/{height}`` and
+``/{chain}/dashboards/blocks/{height},...`` responses for a synthetic chain that
+advances at ``--block-rate`` blocks per second, with configurable latency,
+error injection and a per-second request limit::
+
+    python -m benchmarks.provider_sim --port 8010 --block-rate 2 --latency-ms 50 --error-rate 0.05
+    BLOCKCHAIR_API_URL=http://localhost:8010 celery -A app.workers.celery:app worker
+
+Block hashes are deterministic (``sha256("<chain>:<height>")``) and each
+block's ``parent_hash`` is its predecessor's hash. Block dashboards list
+transaction hashes, or full transaction objects with
+``?transaction_details=true``.
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+import orjson
+
+STATS_PATH = re.compile(r"^/(?P<chain>[\w-]+)/stats/?$")
+BLOCK_PATH = re.compile(r"^/(?P<chain>[\w-]+)/dashboards/block/(?P<height>\d+)/?$")
+BLOCKS_PATH = re.compile(r"^/(?P<chain>[\w-]+)/dashboards/blocks/(?P<heights>\d+(?:,\d+)*)/?$")
+
+
+def blockchair_time(timestamp: float) -> str:
+    """Blockchair's UTC ``YYYY-MM-DD HH:MM:SS`` format"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SyntheticChain:
+    """A chain producing one block every ``1 / block_rate`` seconds from now."""
+
+    def __init__(
+        self, block_rate: float, start_height: int = 17_000_000, transactions_per_block: int = 150
+    ) -> None:
+        self.block_rate = block_rate
+        self.start_height = start_height
+        self.transactions_per_block = transactions_per_block
+        self.started_at = time.time()
+
+    def height(self, now: Optional[float] = None) -> int:
+        elapsed = (time.time() if now is None else now) - self.started_at
+        return self.start_height + int(elapsed * self.block_rate)
+
+    def block_timestamp(self, height: int) -> float:
+        """When ``height`` was (or will be) produced"""
+        return self.started_at + (height - self.start_height) / self.block_rate
+
+    @staticmethod
+    def block_hash(chain: str, height: int) -> str:
+        return "0x" + hashlib.sha256(f"{chain}:{height}".encode()).hexdigest()
+
+    @staticmethod
+    def transaction_hash(chain: str, height: int, index: int) -> str:
+        return "0x" + hashlib.sha256(f"{chain}:{height}:{index}".encode()).hexdigest()
+
+    def stats(self, chain: str, height: Optional[int] = None) -> dict[str, Any]:
+        height = self.height() if height is None else height
+        return {
+            "blocks": height + 1,
+            "transactions": (height + 1) * self.transactions_per_block,
+            "best_block_height": height,
+            "best_block_hash": self.block_hash(chain, height),
+            "best_block_time": blockchair_time(self.block_timestamp(height)),
+            "mempool_transactions": random.randint(100, 5000),
+            "market_price_usd": 1800.0,
+        }
+
+    def transaction(self, chain: str, height: int, index: int) -> dict[str, Any]:
+        """Blockchair-shaped transaction object (``?transaction_details=true``)"""
+        address = hashlib.sha256(f"{chain}:{height}:{index}:address".encode()).hexdigest()
+        return {
+            "block_id": height,
+            "index": index,
+            "hash": self.transaction_hash(chain, height, index),
+            "time": blockchair_time(self.block_timestamp(height)),
+            "failed": index % 50 == 49,
+            "type": "call",
+            "sender": "0x" + address[:40],
+            "recipient": "0x" + address[24:64],
+            "value": str(index * 10**16),
+            "fee": str(21000 * 30 * 10**9),
+            "gas_used": 21000,
+            "gas_limit": 21000,
+            "gas_price": 30 * 10**9,
+            "input_hex": "",
+            "nonce": index,
+        }
+
+    def block(self, chain: str, height: int, transaction_details: bool = False) -> dict[str, Any]:
+        transaction = self.transaction if transaction_details else self.transaction_hash
+        return {
+            "block": {
+                "id": height,
+                "hash": self.block_hash(chain, height),
+                "parent_hash": self.block_hash(chain, height - 1),
+                "date": blockchair_time(self.block_timestamp(height))[:10],
+                "time": blockchair_time(self.block_timestamp(height)),
+                "transaction_count": self.transactions_per_block,
+            },
+            "uncles": [],
+            "transactions": [transaction(chain, height, index) for index in range(self.transactions_per_block)],
+        }
+
+
+class ProviderSimulator:
+    """Threaded HTTP server serving a :class:`SyntheticChain`."""
+
+    def __init__(
+        self,
+        chain: SyntheticChain,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        max_rps: int = 0,
+    ) -> None:
+        self.chain = chain
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_rps = max_rps
+        self._lock = threading.Lock()
+        self._window = (0, 0)  # (second, requests in it)
+        self.counts = {"requests": 0, "errors": 0, "throttled": 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ProviderSimulator":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="provider-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _admit(self) -> str:
+        """``ok``, ``throttled`` or ``error`` for the next request"""
+        with self._lock:
+            self.counts["requests"] += 1
+            if self.max_rps:
+                second = int(time.time())
+                window, count = self._window
+                count = count + 1 if window == second else 1
+                self._window = (second, count)
+                if count > self.max_rps:
+                    self.counts["throttled"] += 1
+                    return "throttled"
+            if self.error_rate and random.random() < self.error_rate:
+                self.counts["errors"] += 1
+                return "error"
+        return "ok"
+
+    def _delay(self) -> None:
+        delay = random.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _data(self, path: str) -> Optional[dict[str, Any]]:
+        """The ``data`` of the response to ``path``, or None for an unknown route"""
+        path, _, query = path.partition("?")
+        details = "transaction_details=true" in query
+        if match := STATS_PATH.match(path):
+            return self.chain.stats(match["chain"])
+        if match := BLOCK_PATH.match(path):
+            height = int(match["height"])
+            if height > self.chain.height():
+                return {}
+            return {str(height): self.chain.block(match["chain"], height, details)}
+        if match := BLOCKS_PATH.match(path):
+            best = self.chain.height()
+            return {
+                height: self.chain.block(match["chain"], int(height), details)
+                for height in match["heights"].split(",") if int(height) <= best
+            }
+        return None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                simulator._delay()
+                outcome = simulator._admit()
+                if outcome == "throttled":
+                    self._send(429, {"data": None, "context": {"code": 429, "error": "Too many requests"}},
+                               {"Retry-After": "1"})
+                    return
+                if outcome == "error":
+                    code = simulator.error_status
+                    self._send(code, {"data": None, "context": {"code": code, "error": "Injected error"}})
+                    return
+
+                data = simulator._data(self.path)
+                if data is None:
+                    self._send(404, {"data": None, "context": {"code": 404, "error": "Not found"}})
+                    return
+                self._send(200, {"data": data, "context": {"code": 200, "source": "provider-sim",
+                                                           "state": simulator.chain.height()}})
+
+            def _send(self, status: int, payload: dict[str, Any], headers: Optional[dict[str, str]] = None) -> None:
+                body = orjson.dumps(payload)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def add_simulator_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--block-rate", type=float, default=1 / 12, help="Blocks per second (default one per 12s)")
+    parser.add_argument("--start-height", type=int, default=17_000_000)
+    parser.add_argument("--transactions-per-block", type=int, default=150)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--max-rps", type=int, default=0, help="Requests per second before 429s (0: unlimited)")
+
+
+def simulator_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> ProviderSimulator:
+    return ProviderSimulator(
+        SyntheticChain(args.block_rate, args.start_height, args.transactions_per_block),
+        host=host,
+        port=port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        max_rps=args.max_rps,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    add_simulator_arguments(parser)
+    args = parser.parse_args()
+
+    simulator = simulator_from_args(args, args.host, args.port)
+    print(f"Blockchair simulator on {simulator.url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
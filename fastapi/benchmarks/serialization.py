@@ -0,0 +1,124 @@
+"""Micro-benchmark: Pydantic response path vs. the ``.values()`` + ORJSON fast path.
+
+The baseline mirrors how the crypto endpoints used to respond: load model
+instances, build nested schema objects, let FastAPI validate them against
+``response_model`` and encode with the stdlib json encoder. The fast path is
+what the endpoints do now.
+
+    python -m benchmarks.serialization --blocks 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+from typing import Any, Callable
+
+from benchmarks.common import bench, save_results, seed, setup_django
+
+
+Endpoints = dict[str, tuple[Callable[[], bytes], Callable[[], bytes]]]
+
+
+def build_endpoints(page_size: int) -> Endpoints:
+    """Endpoint name -> (baseline, fast path) response builders"""
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.api.serializers import serialize_blocks, serialize_currencies, serialize_providers
+    from app.models import Block, Currency, Provider
+    from app.schemas.crypto import BlockListResponse, BlockSchema, CurrencySchema, ProviderSchema
+
+    loop = asyncio.new_event_loop()
+    fields: dict[Any, Any] = {}
+
+    def legacy_response(model: Any, content: Any) -> bytes:
+        # FastAPI builds the response field once per route.
+        if model not in fields:
+            fields[model] = create_response_field(name="response", type_=model)
+        field = fields[model]
+        return JSONResponse(loop.run_until_complete(serialize_response(field=field, response_content=content))).body
+
+    def legacy_block(block: Block) -> BlockSchema:
+        return BlockSchema(
+            id=block.id,
+            currency=CurrencySchema(id=block.currency.id, name=block.currency.name),
+            block_number=block.block_number,
+            provider_ids=[provider.id for provider in block.providers.all()],
+            created_at=block.created_at,
+            stored_at=block.stored_at,
+        )
+
+    blocks = Block.objects.order_by("-stored_at")
+    block_id = blocks.values_list("id", flat=True).first()
+
+    def legacy_blocks() -> bytes:
+        page = blocks.select_related("currency").prefetch_related("providers")[:page_size]
+        content = BlockListResponse(
+            blocks=[legacy_block(block) for block in page], total=blocks.count(), page=1, page_size=page_size
+        )
+        return legacy_response(BlockListResponse, content)
+
+    def fast_blocks() -> bytes:
+        content = {
+            "blocks": serialize_blocks(blocks[:page_size]),
+            "total": blocks.count(),
+            "page": 1,
+            "page_size": page_size,
+        }
+        return ORJSONResponse(content).body
+
+    def legacy_block_by_id() -> bytes:
+        block = Block.objects.select_related("currency").prefetch_related("providers").get(id=block_id)
+        return legacy_response(BlockSchema, legacy_block(block))
+
+    def fast_block_by_id() -> bytes:
+        return ORJSONResponse(serialize_blocks(Block.objects.filter(id=block_id))[0]).body
+
+    def legacy_providers() -> bytes:
+        content = [ProviderSchema(id=p.id, name=p.name) for p in Provider.objects.all()]
+        return legacy_response(list[ProviderSchema], content)
+
+    def legacy_currencies() -> bytes:
+        content = [CurrencySchema(id=c.id, name=c.name) for c in Currency.objects.all()]
+        return legacy_response(list[CurrencySchema], content)
+
+    return {
+        "GET /blocks": (legacy_blocks, fast_blocks),
+        "GET /blocks/{id}": (legacy_block_by_id, fast_block_by_id),
+        "GET /providers": (legacy_providers, lambda: ORJSONResponse(serialize_providers()).body),
+        "GET /currencies": (legacy_currencies, lambda: ORJSONResponse(serialize_currencies()).body),
+    }
+
+
+def compare(endpoints: Endpoints, repeat: int) -> dict[str, Any]:
+    results = {}
+    for name, (legacy, fast) in endpoints.items():
+        results[name] = {
+            "baseline": {**bench(legacy, repeat), "bytes": len(legacy())},
+            "fast_path": {**bench(fast, repeat), "bytes": len(fast())},
+        }
+        speedup = results[name]["baseline"]["p50_ms"] / max(results[name]["fast_path"]["p50_ms"], 1e-9)
+        print(
+            f"{name:<18} baseline p50 {results[name]['baseline']['p50_ms']:8.3f} ms"
+            f"  fast p50 {results[name]['fast_path']['p50_ms']:8.3f} ms  x{speedup:.1f}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--providers", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(args.blocks, providers=args.providers, providers_per_block=args.providers)
+
+    results = compare(build_endpoints(args.page_size), args.repeat)
+    print(f"saved {save_results('serialization', results)}")
+
+
+if __name__ == "__main__":
+    main()
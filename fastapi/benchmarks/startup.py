@@ -0,0 +1,110 @@
+"""Process startup: how long the API and worker entry points take to import.
+
+Each run starts a fresh interpreter with ``python -X importtime`` and times
+it; the slowest modules of the last run are listed so regressions can be
+traced to a specific import::
+
+    python -m benchmarks.startup --repeat 10
+    python -m benchmarks.startup --target worker --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.common import BENCH_DIR, save_results, summarize
+
+PROJECT_DIR = BENCH_DIR.parent
+
+# target -> (statement, extra environment)
+TARGETS = {
+    "api": ("import config.asgi", {"ENV_STATE": "local"}),
+    "worker": ("import app.workers.celery", {}),
+}
+
+
+def startup_env(extra: dict[str, str]) -> dict[str, str]:
+    env = dict(os.environ)
+    # Let each entry point pick its own settings module
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("LOG_HANDLER_FILE_PATH", str(BENCH_DIR / "bench.log"))
+    if "DB_ENGINE" not in env:
+        env["DB_ENGINE"] = "django.db.backends.sqlite3"
+        env.setdefault("DB_NAME", str(BENCH_DIR / "bench.sqlite3"))
+    env.update(extra)
+    return env
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def run_target(statement: str, env: dict[str, str], cwd: str) -> tuple[float, list[dict[str, Any]]]:
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if process.returncode:
+        raise RuntimeError(f"{statement!r} failed:\n{process.stderr[-2000:]}")
+    return elapsed, parse_importtime(process.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=[*TARGETS, "all"], default="all")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    targets = list(TARGETS) if args.target == "all" else [args.target]
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        # config.asgi mounts these directories relative to the working directory
+        for name in ("static", "media"):
+            Path(cwd, name).mkdir()
+
+        for target in targets:
+            statement, extra = TARGETS[target]
+            env = startup_env(extra)
+            timings, modules = [], []
+            for _ in range(args.repeat):
+                elapsed, modules = run_target(statement, env, cwd)
+                timings.append(elapsed)
+
+            slowest = sorted(modules, key=lambda module: -module["cumulative_ms"])[:args.top]
+            results[target] = {
+                "wall": summarize(timings),
+                "imported_modules": len(modules),
+                "import_ms": max((module["cumulative_ms"] for module in modules), default=0.0),
+                "slowest_imports": slowest,
+            }
+
+            wall = results[target]["wall"]
+            print(f"{target}: p50 {wall['p50_ms']:.1f} ms, p95 {wall['p95_ms']:.1f} ms, "
+                  f"{len(modules)} modules")
+            for module in slowest:
+                print(f"  {module['cumulative_ms']:8.1f} ms  {module['module']}")
+
+    save_results("startup", results, db_engine=startup_env({})["DB_ENGINE"])
+
+
+if __name__ == "__main__":
+    main()
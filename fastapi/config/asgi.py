@@ -31,18 +31,72 @@ django_app = get_asgi_application()
 """
 FastAPI settings
 """
-from app.routers import auth_router, health_router, user_router
+from app.routers import auth_router, health_router, metrics_router, profiling_router, user_router
 from app.routers.crypto import router as crypto_router
 
+from django.conf import settings
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from config.budget import QueryTimeout, parse_budgets
+from config.metrics import register_api_collectors
+from config.middleware import (
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    SQLProfilingMiddleware,
+    TimeBudgetMiddleware,
+    parse_route_limits,
+    query_timeout_handler,
+)
+
 fastapi_app = FastAPI()
 
+# middleware
+if settings.COMPRESSION_ENABLED:
+    fastapi_app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        brotli_enabled=settings.COMPRESSION_BROTLI_ENABLED,
+    )
+fastapi_app.add_middleware(
+    SQLProfilingMiddleware,
+    sample_rate=settings.SQL_PROFILE_SAMPLE_RATE,
+    header_enabled=settings.SQL_PROFILE_HEADER_ENABLED,
+)
+fastapi_app.add_middleware(
+    TimeBudgetMiddleware,
+    default=settings.QUERY_BUDGET_DEFAULT,
+    route_budgets=parse_budgets(settings.QUERY_BUDGETS),
+)
+if settings.ADMISSION_ENABLED:
+    fastapi_app.add_middleware(
+        AdmissionControlMiddleware,
+        initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_limit=settings.ADMISSION_MAX_LIMIT,
+        route_limits=parse_route_limits(settings.ADMISSION_ROUTE_LIMITS),
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        latency_target=settings.ADMISSION_LATENCY_TARGET,
+        db_queue_limit=settings.ADMISSION_DB_QUEUE_LIMIT,
+        exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+    )
+# outermost, so latency includes compression and shed requests
+fastapi_app.add_middleware(MetricsMiddleware)
+register_api_collectors()
+
+# exception handlers
+fastapi_app.add_exception_handler(QueryTimeout, query_timeout_handler)
+
 # routers
 fastapi_app.include_router(user_router, tags=["users"], prefix="/user")
 fastapi_app.include_router(auth_router, tags=["auth"], prefix="/auth")
 fastapi_app.include_router(health_router, tags=["health"], prefix="/health")
+fastapi_app.include_router(metrics_router, tags=["metrics"], prefix="/metrics")
+fastapi_app.include_router(profiling_router, tags=["profiling"], prefix="/profiling")
 fastapi_app.include_router(crypto_router,  tags=["cryptoApi"], prefix="/crypto")
 
 # to mount Django
@@ -0,0 +1,93 @@
+"""Per-request time budgets for database work.
+
+``TimeBudgetMiddleware`` gives each request a budget (per route template,
+``QUERY_BUDGETS``/``QUERY_BUDGET_DEFAULT``). ``run_db`` stops waiting for
+executor work once the budget is spent, and on Postgres every statement of
+the request runs under a ``statement_timeout`` of the route's budget, so the
+server cancels a runaway query instead of letting it hold a connection
+after the client got its timeout.
+
+The timeout is a session setting, applied lazily by an ``execute_wrapper``
+and only re-issued when it changes on a connection. It is skipped inside
+transactions (a rollback would silently undo it) and when connections are
+shared through pgbouncer, where a session setting would leak to
+other clients; there the asyncio deadline is the only bound.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+# Postgres SQLSTATE query_canceled, raised when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+
+class QueryTimeout(Exception):
+    """DB work ran out of its request's time budget (answered with 504)."""
+
+
+class BudgetExhausted(QueryTimeout):
+    """The budget was spent before the DB work could start (answered with 503)."""
+
+
+@dataclass(frozen=True)
+class TimeBudget:
+    route: str
+    seconds: float
+    deadline: float
+
+    @property
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+_budget: ContextVar[Optional[TimeBudget]] = ContextVar("time_budget", default=None)
+
+
+def start_budget(route: str, seconds: float) -> TimeBudget:
+    budget = TimeBudget(route, seconds, time.monotonic() + seconds)
+    _budget.set(budget)
+    return budget
+
+
+def current_budget() -> Optional[TimeBudget]:
+    return _budget.get()
+
+
+def parse_budgets(value: str) -> dict[str, float]:
+    """``"/crypto/api/v1/blocks=2,..."`` -> {route template: seconds}"""
+    budgets = {}
+    for part in value.split(","):
+        route, _, seconds = part.rpartition("=")
+        if route.strip() and seconds.strip():
+            budgets[route.strip()] = float(seconds)
+    return budgets
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    return getattr(exc.__cause__, "pgcode", None) == QUERY_CANCELED
+
+
+def statement_timeout_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    connection = context["connection"]
+    budget = _budget.get()
+    # 0 restores the server default for work outside a budgeted request
+    timeout_ms = int(budget.seconds * 1000) if budget else 0
+    raw = connection.connection
+    current = getattr(connection, "_statement_timeout", None)
+    if not connection.in_atomic_block and current != (id(raw), timeout_ms) and (timeout_ms or current):
+        with raw.cursor() as cursor:
+            cursor.execute("SET statement_timeout = %s", [timeout_ms])
+        connection._statement_timeout = (id(raw), timeout_ms)
+    return execute(sql, params, many, context)
+
+
+def install_statement_timeout(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """``connection_created`` receiver adding the statement timeout wrapper on Postgres."""
+    if connection.vendor != "postgresql" or settings.DB_POOL_MODE != "persistent":
+        return
+    if statement_timeout_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(statement_timeout_wrapper)
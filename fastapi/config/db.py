@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from config.budget import BudgetExhausted, QueryTimeout, current_budget, is_statement_timeout
+from config.metrics import DB_EXECUTOR_WAIT, QUERY_TIMEOUTS
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """Run blocking ORM work on a dedicated, sized thread pool.
+
+    ``sync_to_async`` is thread sensitive by default, so every ORM call made
+    through it is serialized onto a single thread. Self-contained units of
+    ORM work (a closure that opens, uses and finishes with the connection)
+    don't need that guarantee and run here with ``thread_sensitive=False``.
+    Each pool thread holds its own Django connection, so ``max_workers`` is
+    also the number of database connections this process can open.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "db") -> None:
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` on the pool and await its result.
+
+        Only use this for work that doesn't rely on thread-local state other
+        than the connection itself, e.g. a transaction spanning several
+        awaits must stay on ``sync_to_async``.
+        """
+        submitted = time.perf_counter()
+        # [dequeued]: set under the lock by whichever side takes the call
+        # off the queue first, the worker thread or a cancelled awaiter.
+        state = [False]
+
+        def _call() -> T:
+            self._on_start(state, time.perf_counter() - submitted)
+            try:
+                close_old_connections()
+                return func(*args, **kwargs)
+            finally:
+                close_old_connections()
+                self._on_finish()
+
+        with self._lock:
+            self._queued += 1
+        try:
+            return await sync_to_async(_call, thread_sensitive=False, executor=self._pool)()
+        finally:
+            with self._lock:
+                if not state[0]:
+                    # Cancelled before a worker thread picked the call up.
+                    state[0] = True
+                    self._queued -= 1
+
+    def _on_start(self, state: list[bool], waited: float) -> None:
+        with self._lock:
+            if not state[0]:
+                state[0] = True
+                self._queued -= 1
+            self._running += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        DB_EXECUTOR_WAIT.observe(waited)
+
+    def _on_finish(self) -> None:
+        with self._lock:
+            self._running -= 1
+            self._completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_max": self._wait_max,
+                "wait_seconds_avg": self._wait_total / completed if completed else 0.0,
+            }
+
+
+_db_executor: Optional[DBExecutor] = None
+_db_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DBExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _db_executor_lock:
+            if _db_executor is None:
+                _db_executor = DBExecutor(settings.DB_EXECUTOR_MAX_WORKERS)
+    return _db_executor
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ORM work on the DB executor within the current request's time budget.
+
+    Raises ``BudgetExhausted`` when the budget is spent before the call
+    starts and ``QueryTimeout`` when it runs out while waiting, or when
+    Postgres cancels a statement at its ``statement_timeout``.
+    """
+    budget = current_budget()
+    if budget is None:
+        return await get_db_executor().run(func, *args, **kwargs)
+
+    remaining = budget.remaining
+    if remaining <= 0:
+        QUERY_TIMEOUTS.labels(budget.route, "exhausted").inc()
+        raise BudgetExhausted()
+    try:
+        return await asyncio.wait_for(get_db_executor().run(func, *args, **kwargs), remaining)
+    except asyncio.TimeoutError:
+        QUERY_TIMEOUTS.labels(budget.route, "deadline").inc()
+        raise QueryTimeout()
+    except DatabaseError as exc:
+        if is_statement_timeout(exc):
+            QUERY_TIMEOUTS.labels(budget.route, "statement_timeout").inc()
+            raise QueryTimeout() from exc
+        raise
+
+
+def on_commit_once(func: Callable[[], None], using: Optional[str] = None) -> None:
+    """``transaction.on_commit`` that registers ``func`` at most once per transaction.
+
+    For signal receivers that fire per row: a delete or bulk save of many
+    rows triggers one callback when the transaction commits.
+    """
+    connection = transaction.get_connection(using)
+    if not any(entry[1] == func for entry in connection.run_on_commit):
+        transaction.on_commit(func, using=using)
+
+
+class ConnectionStats:
+    """Count connection churn and time spent acquiring connections, per alias.
+
+    With persistent connections ``opened`` should level off at roughly the
+    pool size; a steadily climbing value means connections are being thrown
+    away and re-established.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._aliases: dict[str, dict[str, float]] = defaultdict(
+            lambda: {"opened": 0, "closed": 0, "acquire_seconds_total": 0.0, "acquire_seconds_max": 0.0}
+        )
+
+    def record_open(self, alias: str, elapsed: float) -> None:
+        with self._lock:
+            stats = self._aliases[alias]
+            stats["opened"] += 1
+            stats["acquire_seconds_total"] += elapsed
+            stats["acquire_seconds_max"] = max(stats["acquire_seconds_max"], elapsed)
+
+    def record_close(self, alias: str) -> None:
+        with self._lock:
+            self._aliases[alias]["closed"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                alias: {
+                    **stats,
+                    "open": stats["opened"] - stats["closed"],
+                    "acquire_seconds_avg": (
+                        stats["acquire_seconds_total"] / stats["opened"] if stats["opened"] else 0.0
+                    ),
+                }
+                for alias, stats in self._aliases.items()
+            }
+
+
+connection_stats = ConnectionStats()
+
+
+def install_connection_metrics() -> None:
+    """Wrap ``connect``/``close`` of every database backend to feed ``connection_stats``."""
+    if getattr(BaseDatabaseWrapper.connect, "_metered", False):
+        return
+
+    original_connect = BaseDatabaseWrapper.connect
+    original_close = BaseDatabaseWrapper.close
+
+    @wraps(original_connect)
+    def connect(self: BaseDatabaseWrapper) -> None:
+        started = time.perf_counter()
+        original_connect(self)
+        connection_stats.record_open(self.alias, time.perf_counter() - started)
+
+    @wraps(original_close)
+    def close(self: BaseDatabaseWrapper) -> None:
+        was_open = self.connection is not None
+        try:
+            original_close(self)
+        finally:
+            if was_open and self.connection is None:
+                connection_stats.record_close(self.alias)
+
+    connect._metered = True  # type: ignore[attr-defined]
+    BaseDatabaseWrapper.connect = connect  # type: ignore[assignment]
+    BaseDatabaseWrapper.close = close  # type: ignore[assignment]
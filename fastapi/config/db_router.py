@@ -0,0 +1,132 @@
+"""Route crypto API reads to a read replica.
+
+Reads of ``Block``/``Currency``/``Provider`` made inside ``replica_reads()``
+go to the ``replica`` alias; every write goes to ``default``. Reads fall back
+to the primary while the replica is unhealthy or during the read-your-writes
+window that follows an ingest (see ``mark_primary_write``).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from redis.exceptions import RedisError
+
+from config.redis import get_redis
+
+logger = getLogger(__name__)
+
+PRIMARY_DB = "default"
+REPLICA_DB = "replica"
+REPLICA_MODELS = {"block", "block_providers", "currency", "provider"}
+PRIMARY_WRITE_KEY = "db:primary-write"
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Allow crypto model reads in this context to be served by the replica.
+
+    The flag lives in a context variable, so it follows the call into the
+    DB executor thread.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaState:
+    """Cached replica health and read-your-writes window for this process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._healthy = True
+        self._health_checked_at = 0.0
+        self._write_until = 0.0
+        self._write_seen = False
+        self._write_checked_at = 0.0
+
+    def mark_write(self) -> None:
+        window = settings.DB_REPLICA_WRITE_WINDOW
+        self._write_until = time.monotonic() + window
+        try:
+            # Share the window with the API processes that serve the reads.
+            get_redis().set(PRIMARY_WRITE_KEY, 1, px=int(window * 1000))
+        except RedisError:
+            logger.warning("Could not publish the primary write window", exc_info=True)
+
+    def in_write_window(self) -> bool:
+        now = time.monotonic()
+        if now < self._write_until:
+            return True
+        if now - self._write_checked_at < settings.DB_REPLICA_STATE_CACHE_SECONDS:
+            return self._write_seen
+        try:
+            seen = bool(get_redis().exists(PRIMARY_WRITE_KEY))
+        except RedisError:
+            # Without the shared window we can't rule out stale reads.
+            seen = True
+        self._write_seen, self._write_checked_at = seen, now
+        return seen
+
+    def is_healthy(self) -> bool:
+        now = time.monotonic()
+        if now - self._health_checked_at < settings.DB_REPLICA_HEALTH_INTERVAL:
+            return self._healthy
+        # One thread probes, the others keep using the last result.
+        if not self._lock.acquire(blocking=False):
+            return self._healthy
+        try:
+            self._healthy = self._probe()
+            self._health_checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self._healthy
+
+    def _probe(self) -> bool:
+        try:
+            with connections[REPLICA_DB].cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            logger.warning("Replica %r is unhealthy, reading from the primary", REPLICA_DB, exc_info=True)
+            connections[REPLICA_DB].close()
+            return False
+        return True
+
+
+replica_state = ReplicaState()
+
+
+def mark_primary_write() -> None:
+    """Pin crypto reads to the primary for DB_REPLICA_WRITE_WINDOW seconds."""
+    if REPLICA_DB in settings.DATABASES:
+        replica_state.mark_write()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        if (
+            REPLICA_DB not in settings.DATABASES
+            or not _replica_reads.get()
+            or model._meta.app_label != "app"
+            or model._meta.model_name not in REPLICA_MODELS
+        ):
+            return None
+        if replica_state.in_write_window() or not replica_state.is_healthy():
+            return PRIMARY_DB
+        return REPLICA_DB
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        # Both aliases hold the same data.
+        return True
@@ -27,3 +27,10 @@ class InvalidCredentialsException(HTTPException):
         self.status_code = status.HTTP_401_UNAUTHORIZED
         self.message = message
         super().__init__(self.status_code, self.message)
+
+
+class RateLimitExceededException(HTTPException):
+    def __init__(self, retry_after: str, message: str = "Too many requests."):
+        self.status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        self.message = message
+        super().__init__(self.status_code, self.message, headers={"Retry-After": retry_after})
@@ -1,4 +1,18 @@
+import atexit
+import logging
+import logging.config
+import os
+import queue
+import random
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from os import environ as env
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+
+import orjson
+
 
 LOG_HANDLER_LEVEL = env.get("LOG_HANDLER_LEVEL", "DEBUG")
 LOG_HANDLER_LEVEL_NULL = env.get("LOG_HANDLER_LEVEL_NULL", LOG_HANDLER_LEVEL)
@@ -8,6 +22,17 @@ LOG_HANDLER_FILE_PATH = env.get("LOG_HANDLER_FILE_PATH", "fastapi.log")
 LOG_LOGGER_LEVEL = env.get("LOG_LOGGER_LEVEL", "DEBUG")
 LOG_FILE_MAX_BYTES = int(env.get("LOG_FILE_MAX_BYTES", 1024 * 1024))
 LOG_FILE_BACKUP_COUNT = int(env.get("LOG_FILE_BACKUP_COUNT", 5))
+# queue: handlers (including file rotation) run on background listener
+#        threads, so logging never blocks the event loop on I/O
+# sync:  handlers run in the calling thread
+LOG_MODE = env.get("LOG_MODE", "queue")
+# verbose (text) or json
+LOG_FORMAT = env.get("LOG_FORMAT", "verbose")
+LOG_TIMEZONE = env.get("LOG_TIMEZONE", "Asia/Tokyo")
+# Comma-separated logger=rate pairs, e.g. "app.workers=0.1,uvicorn.error=0.5".
+# Records below WARNING from those loggers (and their children) are kept
+# with the given probability.
+LOG_SAMPLE_RATES = env.get("LOG_SAMPLE_RATES", "")
 
 
 LOGGING = {
@@ -18,6 +43,7 @@ LOGGING = {
             "format": '%(asctime)s [%(levelname)s] %(pathname)s:%(lineno)d "%(message)s"'
         },
         "simple": {"format": "%(levelname)s %(message)s"},
+        "json": {"()": "config.log.JSONFormatter"},
     },
     "filters": {},
     "handlers": {
@@ -28,14 +54,14 @@ LOGGING = {
         "console": {
             "level": LOG_HANDLER_LEVEL_CONSOLE,
             "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "formatter": LOG_FORMAT,
             "stream": "ext://sys.stdout",
         },
         "file": {
             "level": LOG_HANDLER_LEVEL_FILE,
             "class": "logging.handlers.RotatingFileHandler",
             "filename": LOG_HANDLER_FILE_PATH,
-            "formatter": "verbose",
+            "formatter": LOG_FORMAT,
             "maxBytes": LOG_FILE_MAX_BYTES,
             "backupCount": LOG_FILE_BACKUP_COUNT,
         },
@@ -81,3 +107,173 @@ LOGGING = {
         },
     },
 }
+
+
+class TimezoneConverter:
+    """``Formatter.converter`` rendering record times in a fixed zone.
+
+    The UTC offset is looked up once per 15 minutes (the granularity of
+    every real-world DST transition) instead of once per record.
+    """
+
+    BUCKET_SECONDS = 900
+
+    def __init__(self, tz: str) -> None:
+        self.tz = ZoneInfo(tz)
+        self._cached: tuple[int, int] = (-1, 0)
+
+    def utcoffset(self, secs: float) -> int:
+        bucket = int(secs // self.BUCKET_SECONDS)
+        cached_bucket, offset = self._cached
+        if bucket != cached_bucket:
+            start = datetime.fromtimestamp(bucket * self.BUCKET_SECONDS, self.tz)
+            offset = int(start.utcoffset().total_seconds())
+            self._cached = (bucket, offset)
+        return offset
+
+    def __call__(self, secs: Optional[float] = None) -> time.struct_time:
+        if secs is None:
+            secs = time.time()
+        return time.gmtime(secs + self.utcoffset(secs))
+
+
+converter = TimezoneConverter(LOG_TIMEZONE)
+
+# LogRecord attributes that aren't user-supplied ``extra`` fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields become top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        offset = converter.utcoffset(record.created)
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        payload: dict[str, Any] = {
+            "time": "%s.%03d%s%02d:%02d" % (
+                time.strftime("%Y-%m-%dT%H:%M:%S", converter(record.created)),
+                record.msecs,
+                "-" if offset < 0 else "+",
+                hours,
+                minutes,
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.pathname}:{record.lineno}",
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        return orjson.dumps(payload, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records from high-volume loggers"""
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        # Longest prefix first so "app.workers" wins over "app"
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                return random.random() < rate
+        return True
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class LogQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handlers.
+
+    The stock ``prepare`` renders the record with this handler's formatter,
+    which would bake plain text into records bound for a JSON handler.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listeners: list[tuple[QueueListener, LogQueueHandler]] = []
+
+
+def _stop_listeners() -> None:
+    while _listeners:
+        listener, _ = _listeners.pop()
+        listener.stop()
+
+
+def _pause_listeners() -> None:
+    # Drain and join before fork: a listener thread caught mid-write would
+    # leave its stream locks held in the child (e.g. Celery prefork).
+    for listener, _ in _listeners:
+        listener.stop()
+
+
+def _resume_listeners() -> None:
+    for listener, _ in _listeners:
+        listener.start()
+
+
+atexit.register(_stop_listeners)
+os.register_at_fork(
+    before=_pause_listeners, after_in_parent=_resume_listeners, after_in_child=_resume_listeners
+)
+
+
+def configure_logging(config: dict[str, Any]) -> None:
+    """Apply ``config`` (Django's ``LOGGING_CONFIG`` callable).
+
+    In queue mode every configured logger's handlers are moved behind a
+    QueueHandler; loggers sharing the same handlers share one listener.
+    """
+    _stop_listeners()
+    logging.Formatter.converter = converter  # type: ignore[assignment]
+    logging.config.dictConfig(config)
+
+    rates = parse_sample_rates(LOG_SAMPLE_RATES)
+    sampling = SamplingFilter(rates) if rates else None
+    loggers = [logging.getLogger()] + [logging.getLogger(name) for name in config.get("loggers", {}) if name]
+
+    if LOG_MODE != "queue":
+        if sampling:
+            for handler in {handler for logger in loggers for handler in logger.handlers}:
+                handler.addFilter(sampling)
+        return
+
+    queue_handlers: dict[tuple[int, ...], LogQueueHandler] = {}
+    for logger in loggers:
+        targets = [handler for handler in logger.handlers if not isinstance(handler, logging.NullHandler)]
+        if not targets:
+            continue
+        key = tuple(id(handler) for handler in targets)
+        queue_handler = queue_handlers.get(key)
+        if queue_handler is None:
+            queue_handler = queue_handlers[key] = LogQueueHandler(queue.SimpleQueue())
+            if sampling:
+                queue_handler.addFilter(sampling)
+            listener = QueueListener(queue_handler.queue, *targets, respect_handler_level=True)
+            listener.start()
+            _listeners.append((listener, queue_handler))
+        logger.handlers = [queue_handler]
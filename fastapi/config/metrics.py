@@ -0,0 +1,214 @@
+"""Prometheus metrics for the API, the DB layer and the Celery workers.
+
+Per-request SQL statistics are collected by an ``execute_wrapper`` installed
+on every connection; the request being served is tracked in a context
+variable, which ``sync_to_async`` carries into the DB executor threads.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable, Iterator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+
+logger = getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed.", ["alias"])
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement latency.", ["alias"], buckets=LATENCY_BUCKETS
+)
+DB_EXECUTOR_WAIT = Histogram(
+    "db_executor_wait_seconds",
+    "Time ORM work waited for a DB executor thread (sync_to_async queueing).",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Celery task run time.", ["task", "state"], buckets=LATENCY_BUCKETS
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total", "Reads executed on behalf of one or more identical requests.", ["call"]
+)
+SINGLEFLIGHT_COALESCED = Counter(
+    "singleflight_coalesced_total", "Requests that shared an identical in-flight read instead of running it.", ["call"]
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with 503 by admission control.", ["route", "reason"]
+)
+ADMISSION_LIMIT = Gauge("admission_concurrency_limit", "Current adaptive concurrency limit per route.", ["route"])
+QUERY_TIMEOUTS = Counter(
+    "query_timeouts_total",
+    "DB work cut off by a request's time budget (exhausted: before starting, deadline: while waiting, "
+    "statement_timeout: cancelled by Postgres).",
+    ["route", "kind"],
+)
+RATE_LIMITED = Counter("rate_limited_requests_total", "Requests refused with 429 by rate limiting.", ["route", "tier"])
+INGEST_LAG = Histogram(
+    "ingest_lag_seconds",
+    "Delay between a block's chain time and it being stored.",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+REORG_DEPTH = Histogram(
+    "block_reorg_depth",
+    "Stored blocks replaced per chain reorganization detected at ingest.",
+    buckets=(1, 2, 3, 5, 10, 20, 50),
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request_stats() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def sql_metrics_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    alias = context["connection"].alias
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_QUERIES.labels(alias).inc()
+        DB_QUERY_DURATION.labels(alias).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+def install_sql_metrics(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """``connection_created`` receiver adding the SQL wrapper once per connection object."""
+    if sql_metrics_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_metrics_wrapper)
+
+
+class DBStatsCollector(Collector):
+    """Expose DB executor and connection stats at scrape time."""
+
+    EXECUTOR_KEYS = ("max_workers", "queue_depth", "running")
+
+    def _connection_families(self) -> dict[str, GaugeMetricFamily]:
+        return {
+            "opened": GaugeMetricFamily("db_connections_opened", "Connections opened.", labels=["alias"]),
+            "closed": GaugeMetricFamily("db_connections_closed", "Connections closed.", labels=["alias"]),
+            "open": GaugeMetricFamily("db_connections_open", "Connections currently open.", labels=["alias"]),
+            "acquire_seconds_avg": GaugeMetricFamily(
+                "db_connection_acquire_seconds_avg", "Average time to open a connection.", labels=["alias"]
+            ),
+        }
+
+    def describe(self) -> list[GaugeMetricFamily]:
+        # Without describe() the registry runs collect() once at registration
+        executor = [
+            GaugeMetricFamily(f"db_executor_{key}", f"DB executor {key.replace('_', ' ')}.")
+            for key in self.EXECUTOR_KEYS
+        ]
+        return [*executor, *self._connection_families().values()]
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        from config.db import connection_stats, get_db_executor
+
+        executor = get_db_executor().stats()
+        for key in self.EXECUTOR_KEYS:
+            yield GaugeMetricFamily(f"db_executor_{key}", f"DB executor {key.replace('_', ' ')}.", value=executor[key])
+
+        families = self._connection_families()
+        for alias, stats in connection_stats.stats().items():
+            for key, family in families.items():
+                family.add_metric([alias], stats[key])
+        yield from families.values()
+
+
+class IngestFreshnessCollector(Collector):
+    """Age of the newest stored block per currency, read from the database at scrape time.
+
+    Must be collected from a thread that may use the ORM (the /metrics view
+    runs the scrape on the DB executor). A failed query is logged and
+    reported through ``ingest_freshness_scrape_error`` instead of failing
+    the whole scrape.
+    """
+
+    def _families(self) -> tuple[GaugeMetricFamily, GaugeMetricFamily]:
+        age = GaugeMetricFamily(
+            "ingest_latest_block_age_seconds", "Seconds since the newest block was stored.", labels=["currency"]
+        )
+        error = GaugeMetricFamily(
+            "ingest_freshness_scrape_error", "1 if the newest blocks couldn't be read at this scrape."
+        )
+        return age, error
+
+    def describe(self) -> list[GaugeMetricFamily]:
+        # The registry would otherwise run collect(), i.e. a query, at import time
+        return list(self._families())
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        from django.db import DatabaseError
+        from django.db.models import OuterRef, Subquery
+        from django.utils import timezone
+
+        from app.models.crypto import Block, Currency
+
+        age, error = self._families()
+        # One index seek on (currency, -stored_at) per currency instead of
+        # aggregating over every block.
+        newest = Block.objects.filter(currency=OuterRef("pk")).order_by("-stored_at").values("stored_at")[:1]
+        try:
+            latest = list(Currency.objects.annotate(last=Subquery(newest)).values_list("name", "last"))
+        except DatabaseError:
+            logger.warning("Could not read the newest blocks for ingest freshness", exc_info=True)
+            error.add_metric([], 1)
+            yield error
+            return
+
+        now = timezone.now()
+        for name, last in latest:
+            if last is None:
+                continue
+            age.add_metric([name], (now - last).total_seconds())
+        error.add_metric([], 0)
+        yield age
+        yield error
+
+
+_api_collectors_registered = False
+
+
+def register_api_collectors() -> None:
+    global _api_collectors_registered
+    if not _api_collectors_registered:
+        REGISTRY.register(DBStatsCollector())
+        REGISTRY.register(IngestFreshnessCollector())
+        _api_collectors_registered = True
@@ -0,0 +1,5 @@
+from .admission import AdmissionControlMiddleware, parse_route_limits
+from .budget import TimeBudgetMiddleware, query_timeout_handler
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import SQLProfilingMiddleware
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.db import get_db_executor
+from config.metrics import ADMISSION_LIMIT, ADMISSION_REJECTED
+from config.middleware.metrics import route_template
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit for one route, with a FIFO of waiting requests.
+
+    A request finishing within ``target`` seconds while the route was at
+    least half busy raises the limit by ``1 / limit`` (about one per
+    ``limit`` completions). A slower or failed (5xx) request cuts it by
+    ``backoff``, at most once per ``target`` so a burst of slow completions
+    counts as one congestion signal.
+    """
+
+    def __init__(
+        self, route: str, initial: int, min_limit: int, max_limit: int, target: float, backoff: float = 0.9
+    ) -> None:
+        self.route = route
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.target = target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+        ADMISSION_LIMIT.labels(route).set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float, max_queue: int) -> Optional[str]:
+        """Take a slot; returns why the request was rejected, or None"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The slot is handed over (in_flight already counted) by _wake
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the client went away
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        return None
+
+    def release(self, latency: Optional[float], failed: bool = False) -> None:
+        """Free a slot; ``latency`` None gives back the slot without adapting the limit"""
+        busy = self.in_flight
+        self.in_flight -= 1
+        if latency is None:
+            pass
+        elif failed or latency > self.target:
+            now = time.monotonic()
+            if now - self._decreased_at >= self.target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = now
+        elif busy * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.labels(self.route).set(self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class AdmissionControlMiddleware:
+    """Shed load before it queues up behind the database.
+
+    Requests are rejected with ``503`` and ``Retry-After`` when the DB
+    executor already has ``db_queue_limit`` calls waiting for a thread (each
+    thread holds one connection, so this is also pool saturation), when
+    their route's queue is full, or when they waited longer than
+    ``queue_timeout`` for a slot under the route's adaptive limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        route_limits: Optional[dict[str, int]] = None,
+        queue_timeout: float = 0.5,
+        max_queue: int = 100,
+        latency_target: float = 0.5,
+        db_queue_limit: int = 0,
+        exempt_paths: tuple[str, ...] = ("/health", "/metrics"),
+    ) -> None:
+        self.app = app
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.route_limits = route_limits or {}
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.latency_target = latency_target
+        self.db_queue_limit = db_queue_limit
+        self.exempt_paths = exempt_paths
+        self._limits: dict[str, AdaptiveLimit] = {}
+
+    def limit_for(self, route: str) -> AdaptiveLimit:
+        limit = self._limits.get(route)
+        if limit is None:
+            max_limit = self.route_limits.get(route, self.max_limit)
+            limit = self._limits[route] = AdaptiveLimit(
+                route, min(self.initial_limit, max_limit), min(self.min_limit, max_limit), max_limit,
+                self.latency_target,
+            )
+        return limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        executor = get_db_executor()
+        db_queue_limit = self.db_queue_limit or executor.max_workers * 4
+        if executor.queue_depth >= db_queue_limit:
+            await self._reject(route, "db_saturated", send)
+            return
+
+        limit = self.limit_for(route)
+        reason = await limit.acquire(self.queue_timeout, self.max_queue)
+        if reason is not None:
+            await self._reject(route, reason, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except asyncio.CancelledError:
+            # The client went away; that says nothing about our latency
+            limit.release(None)
+            raise
+        except BaseException:
+            limit.release(time.perf_counter() - started, failed=True)
+            raise
+        else:
+            limit.release(time.perf_counter() - started, failed=status >= 500)
+
+    async def _reject(self, route: str, reason: str, send: Send) -> None:
+        ADMISSION_REJECTED.labels(route, reason).inc()
+        body = orjson.dumps({"detail": "Server is overloaded, retry later."})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def parse_route_limits(value: str) -> dict[str, int]:
+    """``"/crypto/api/v1/blocks=32,..."`` -> {route template: max concurrency}"""
+    limits = {}
+    for part in value.split(","):
+        route, _, limit = part.rpartition("=")
+        if route.strip() and limit.strip():
+            limits[route.strip()] = int(limit)
+    return limits
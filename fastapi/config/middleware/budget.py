@@ -0,0 +1,41 @@
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.budget import BudgetExhausted, QueryTimeout, start_budget
+from config.middleware.metrics import route_template
+
+
+class TimeBudgetMiddleware:
+    """Give each request the time budget of its route (see ``config.budget``)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default: float,
+        route_budgets: Optional[dict[str, float]] = None,
+        exempt_paths: tuple[str, ...] = ("/django",),
+    ) -> None:
+        self.app = app
+        self.default = default
+        self.route_budgets = route_budgets or {}
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(self.exempt_paths):
+            route = route_template(scope)
+            seconds = self.route_budgets.get(route, self.default)
+            if seconds > 0:
+                start_budget(route, seconds)
+        await self.app(scope, receive, send)
+
+
+async def query_timeout_handler(request: Request, exc: QueryTimeout) -> ORJSONResponse:
+    """504 when DB work timed out, 503 when the budget was gone before it started"""
+    if isinstance(exc, BudgetExhausted):
+        return ORJSONResponse(
+            {"detail": "Server is overloaded, retry later."}, status_code=503, headers={"Retry-After": "1"}
+        )
+    return ORJSONResponse({"detail": "The request took too long."}, status_code=504)
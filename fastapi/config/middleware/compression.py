@@ -0,0 +1,161 @@
+import zlib
+from typing import Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.http import weak_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional at runtime
+    brotli = None
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits=31 writes a gzip header and trailer.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings from an Accept-Encoding header, minus the ones refused with q=0."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        if coding and quality not in ("0", "0.0", "0.00", "0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses with brotli or gzip.
+
+    Brotli is preferred when the client accepts it and the ``brotli`` package
+    is installed. Bodies smaller than ``minimum_size`` and responses that are
+    already encoded pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled and brotli is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accepted = accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+            if self.brotli_enabled and "br" in accepted:
+                responder = CompressionResponder(self.app, self.minimum_size, "br", self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+            if "gzip" in accepted:
+                responder = CompressionResponder(self.app, self.minimum_size, "gzip", self.gzip_level)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str, level: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.level = level
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.compressor: Optional[Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _new_compressor(self) -> Compressor:
+        if self.encoding == "br":
+            return BrotliCompressor(self.level)
+        return GzipCompressor(self.level)
+
+    async def send_compressed(self, message: Message) -> None:
+        assert self.send is not None
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers back until the first body chunk tells us
+            # whether the response is worth compressing.
+            self.initial_message = message
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if "content-encoding" in headers or (len(body) < self.minimum_size and not more_body):
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = self._new_compressor()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                # The encoded bytes differ from the identity representation
+                headers["ETag"] = weak_etag(headers["etag"])
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if self.compressor is None:
+            # Passed through uncompressed.
+            await self.send(message)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        message["body"] = data
+        await self.send(message)
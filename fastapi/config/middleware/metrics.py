@@ -0,0 +1,61 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    start_request_stats,
+)
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, keeping label cardinality bounded."""
+    # Remembered on the scope: several middlewares ask for it per request
+    template = scope.get("route_template")
+    if template is None:
+        template = "unmatched"
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        scope["route_template"] = template
+    return template
+
+
+class MetricsMiddleware:
+    """Record latency, in-flight requests and SQL work per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = start_request_stats()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(stats.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
@@ -0,0 +1,54 @@
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.middleware.metrics import route_template
+from config.profiling import PROFILE_HEADER, sql_profiler, start_request_profile
+
+
+class SQLProfilingMiddleware:
+    """Profile SQL for requests that opt in via header or sampling.
+
+    Every request gets a (disabled) profile so slow statements can be
+    attributed to it. Profiled responses carry an ``X-SQL-Profile`` summary
+    header; the details are served by the admin profiling endpoint.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0, header_enabled: bool = False) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = PROFILE_HEADER.encode() if header_enabled else None
+
+    def _enabled(self, scope: Scope) -> bool:
+        if self.header is not None:
+            for name, value in scope["headers"]:
+                if name == self.header and value not in (b"", b"0"):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = start_request_profile(scope["method"], scope["path"], self._enabled(scope))
+        if not profile.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_with_summary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                db_ms = sum(query["duration_ms"] for query in profile.queries)
+                headers = MutableHeaders(scope=message)
+                headers.append("X-SQL-Profile", f"queries={len(profile.queries)}; db_ms={db_ms:.3f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            profile.route = route_template(scope)
+            sql_profiler.finish(profile, time.perf_counter() - started)
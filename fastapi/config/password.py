@@ -1,8 +1,10 @@
 from django.contrib.auth.hashers import make_password
-from passlib.handlers.django import django_pbkdf2_sha256
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    # passlib pulls in all of its hash handlers; only load it on first login
+    from passlib.handlers.django import django_pbkdf2_sha256
+
     return django_pbkdf2_sha256.verify(plain_password, hashed_password)
 
 
@@ -0,0 +1,215 @@
+"""Request-scoped SQL profiling and slow-query capture.
+
+Every statement slower than ``SQL_SLOW_QUERY_MS`` is kept in a bounded ring
+buffer together with the project frames that issued it. Requests that opt
+in (``X-SQL-Profile`` header or ``SQL_PROFILE_SAMPLE_RATE``) additionally
+record every statement, which is what N+1 detection works from.
+
+Statements are stored with their ``%s`` placeholders; parameters are never
+kept, so credentials and emails don't end up in the buffers.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_HEADER = "x-sql-profile"
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+# Frames from the DB plumbing itself are never the origin of a query.
+_INTERNAL_FILES = {
+    __file__,
+    os.path.join(_PROJECT_ROOT, "config", "db.py"),
+    os.path.join(_PROJECT_ROOT, "config", "metrics.py"),
+}
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse literals and IN-lists so repeats of one statement compare equal"""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def stack_origin(limit: int = 5) -> list[str]:
+    """Innermost project frames (outside the DB plumbing) on the current stack"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < limit:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_ROOT)
+            and filename not in _INTERNAL_FILES
+            and "site-packages" not in filename
+        ):
+            frames.append(f"{filename[len(_PROJECT_ROOT):]}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return frames
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    # False: only slow statements are captured for this request
+    enabled: bool = False
+    route: str = ""
+    queries: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.route or self.path}"
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def start_request_profile(method: str, path: str, enabled: bool) -> RequestProfile:
+    profile = RequestProfile(method, path, enabled)
+    _request_profile.set(profile)
+    return profile
+
+
+class SQLProfiler:
+    """Ring buffers of slow statements and of recent profiled requests."""
+
+    def __init__(self, slow_query_ms: float, slow_buffer_size: int, profile_buffer_size: int, n_plus_one: int) -> None:
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one
+        self._lock = threading.Lock()
+        self._slow: deque[dict[str, Any]] = deque(maxlen=slow_buffer_size)
+        self._profiles: deque[dict[str, Any]] = deque(maxlen=profile_buffer_size)
+
+    def record(self, sql: str, alias: str, elapsed: float, profile: Optional[RequestProfile]) -> None:
+        slow = elapsed >= self.slow_query_seconds
+        profiled = profile is not None and profile.enabled
+        if not (slow or profiled):
+            return
+        entry = {
+            "sql": sql,
+            "alias": alias,
+            "duration_ms": round(elapsed * 1000, 3),
+            "stack": stack_origin(),
+        }
+        if profiled:
+            profile.queries.append(entry)
+        if slow:
+            with self._lock:
+                self._slow.append({
+                    **entry,
+                    "request": profile.label if profile else None,
+                    "at": timezone.now().isoformat(),
+                })
+
+    def finish(self, profile: RequestProfile, elapsed: float) -> dict[str, Any]:
+        """Summarise a profiled request and keep it for the report"""
+        summary = {
+            "request": profile.label,
+            "at": timezone.now().isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "queries": len(profile.queries),
+            "db_ms": round(sum(query["duration_ms"] for query in profile.queries), 3),
+            "n_plus_one": self.detect_n_plus_one(profile.queries),
+            "statements": profile.queries,
+        }
+        with self._lock:
+            self._profiles.append(summary)
+        return summary
+
+    def detect_n_plus_one(self, queries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Statements repeated from the same call site at least ``n_plus_one_threshold`` times"""
+        groups: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for query in queries:
+            origin = query["stack"][0] if query["stack"] else ""
+            groups.setdefault((normalize_sql(query["sql"]), origin), []).append(query)
+        findings = [
+            {
+                "sql": sql,
+                "origin": origin,
+                "count": len(group),
+                "total_ms": round(sum(query["duration_ms"] for query in group), 3),
+            }
+            for (sql, origin), group in groups.items()
+            if len(group) >= self.n_plus_one_threshold
+        ]
+        return sorted(findings, key=lambda finding: -finding["count"])
+
+    def report(self, limit: int = 20) -> dict[str, Any]:
+        with self._lock:
+            slow = list(self._slow)
+            profiles = list(self._profiles)
+
+        by_statement: dict[str, dict[str, Any]] = {}
+        for entry in slow:
+            key = normalize_sql(entry["sql"])
+            stats = by_statement.setdefault(key, {"sql": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + entry["duration_ms"], 3)
+            if entry["duration_ms"] >= stats["max_ms"]:
+                stats.update(max_ms=entry["duration_ms"], slowest=entry)
+
+        n_plus_one: dict[tuple[str, str], dict[str, Any]] = {}
+        for profile in profiles:
+            for finding in profile["n_plus_one"]:
+                key = (profile["request"], finding["sql"])
+                stats = n_plus_one.setdefault(
+                    key, {"request": profile["request"], "sql": finding["sql"], "origin": finding["origin"],
+                          "occurrences": 0, "max_count": 0}
+                )
+                stats["occurrences"] += 1
+                stats["max_count"] = max(stats["max_count"], finding["count"])
+
+        return {
+            "slow_query_ms": self.slow_query_seconds * 1000,
+            "slow_queries": sorted(by_statement.values(), key=lambda stats: -stats["max_ms"])[:limit],
+            "n_plus_one": sorted(n_plus_one.values(), key=lambda stats: -stats["max_count"])[:limit],
+            "recent_profiles": [
+                {key: value for key, value in profile.items() if key != "statements"}
+                for profile in profiles[-limit:]
+            ],
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slow.clear()
+            self._profiles.clear()
+
+
+sql_profiler = SQLProfiler(
+    slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+    slow_buffer_size=settings.SQL_SLOW_QUERY_BUFFER_SIZE,
+    profile_buffer_size=settings.SQL_PROFILE_BUFFER_SIZE,
+    n_plus_one=settings.SQL_N_PLUS_ONE_THRESHOLD,
+)
+
+
+def sql_profiling_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sql_profiler.record(
+            sql, context["connection"].alias, time.perf_counter() - started, _request_profile.get()
+        )
+
+
+def install_sql_profiling(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """``connection_created`` receiver adding the profiling wrapper once per connection object."""
+    if sql_profiling_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_profiling_wrapper)
@@ -0,0 +1,137 @@
+"""Token-bucket rate limiting shared through Redis.
+
+Each bucket holds up to ``capacity`` tokens and refills continuously at
+``capacity / period`` tokens per second; a request takes ``cost`` tokens or
+is refused with the time until enough have refilled. The refill-and-take
+step runs as one Lua script, so concurrent API processes can't overspend a
+bucket. While Redis is unreachable every process falls back to its own
+in-memory buckets, which keeps limits per process instead of global.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+
+from redis.exceptions import RedisError
+
+from config.redis import get_redis
+
+logger = getLogger(__name__)
+
+# KEYS: bucket; ARGV: capacity, refill rate (tokens per ms), cost
+# Returns {allowed, retry after (ms), tokens left}. Reading TIME before
+# writing needs effect replication, the default since Redis 5.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed, retry = 0, 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {allowed, retry, math.floor(tokens)}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens refilled per second"""
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    retry_after: float
+    remaining: int
+
+
+def parse_limits(*values: str) -> dict[str, Limit]:
+    """``"route:tier=capacity/seconds,..."``; later values override earlier ones"""
+    limits = {}
+    for value in values:
+        for part in value.split(","):
+            name, _, spec = part.partition("=")
+            if not name.strip() or not spec.strip():
+                continue
+            capacity, _, period = spec.partition("/")
+            limits[name.strip()] = Limit(int(capacity), float(period or 1))
+    return limits
+
+
+class MemoryBuckets:
+    """Process-local token buckets, least recently used evicted first."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, limit: Limit, cost: int) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (float(limit.capacity), now))
+            tokens = min(limit.capacity, tokens + (now - ts) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / limit.rate
+        return Decision(allowed, retry_after, int(tokens))
+
+
+class RateLimiter:
+    """Redis token buckets with an in-memory fallback."""
+
+    # After a Redis error the in-memory buckets are used for this long.
+    backoff_seconds = 5.0
+
+    def __init__(self, prefix: str = "ratelimit") -> None:
+        self.prefix = prefix
+        self.memory = MemoryBuckets()
+        self._script = None
+        self._skip_until = 0.0
+
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> Decision:
+        # A request costing more than the bucket holds could never pass
+        cost = min(cost, limit.capacity)
+        if time.monotonic() >= self._skip_until:
+            try:
+                return await asyncio.to_thread(self._take_redis, f"{self.prefix}:{key}", limit, cost)
+            except RedisError:
+                self._skip_until = time.monotonic() + self.backoff_seconds
+                logger.warning("Rate limiting falls back to in-memory buckets", exc_info=True)
+        return self.memory.take(key, limit, cost)
+
+    def _take_redis(self, key: str, limit: Limit, cost: int) -> Decision:
+        if self._script is None:
+            self._script = get_redis().register_script(_TAKE_SCRIPT)
+        allowed, retry_ms, remaining = self._script(keys=[key], args=[limit.capacity, limit.rate / 1000, cost])
+        return Decision(bool(allowed), retry_ms / 1000, int(remaining))
+
+
+def retry_after_header(decision: Decision) -> str:
+    """Whole seconds, rounded up so clients never retry too early"""
+    return str(max(1, math.ceil(decision.retry_after)))
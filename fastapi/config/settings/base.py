@@ -9,14 +9,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
-import logging
-import logging.config
 import os
-from datetime import datetime
 from pathlib import Path
 
-from config.log import LOGGING
-from pytz import timezone
+from config.log import LOGGING  # noqa: F401
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -128,11 +124,151 @@ AUTH_USER_MODEL = "app.User"
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_MINUTES: int = 60 * 24 * 5
 
+# Database executor
+# Threads used to run ORM work from async views. Every thread holds its own
+# connection, so keep this at or below the connections Postgres allows us.
+DB_EXECUTOR_MAX_WORKERS = int(os.getenv("DB_EXECUTOR_MAX_WORKERS", 10))
+
+# Read replica
+# Seconds crypto reads stay on the primary after an ingest writes a block.
+DB_REPLICA_WRITE_WINDOW = float(os.getenv("DB_REPLICA_WRITE_WINDOW", 5))
+# How long this process trusts its last look at the shared write window.
+DB_REPLICA_STATE_CACHE_SECONDS = float(os.getenv("DB_REPLICA_STATE_CACHE_SECONDS", 0.5))
+# Seconds between replica health probes; reads use the primary while unhealthy.
+DB_REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", 5))
+
+# Seconds the admin-only provider detail (with its API key) is cached per
+# process; edits reach other processes only once their entry expires.
+PROVIDER_DETAIL_CACHE_TTL = float(os.getenv("PROVIDER_DETAIL_CACHE_TTL", 60))
+
+# Latest blocks window
+# Newest blocks kept in Redis (globally and per currency) for /blocks pages
+# that fall inside it; 0 disables the window.
+LATEST_BLOCKS_WINDOW = int(os.getenv("LATEST_BLOCKS_WINDOW", 1000))
+# Seconds before the window is rebuilt from the database on the next ingest.
+LATEST_BLOCKS_TTL = float(os.getenv("LATEST_BLOCKS_TTL", 3600))
+
+# Block lookup cache
+# Single-block lookups are cached in-process (L1) and in Redis (L2);
+# BLOCK_CACHE_TTL=0 disables both.
+BLOCK_CACHE_TTL = float(os.getenv("BLOCK_CACHE_TTL", 86400))
+# Lookups that found nothing; store_block busts them when the block arrives.
+BLOCK_CACHE_MISS_TTL = float(os.getenv("BLOCK_CACHE_MISS_TTL", 5))
+BLOCK_CACHE_L1_SIZE = int(os.getenv("BLOCK_CACHE_L1_SIZE", 4096))
+# L1 entries can't be busted from other processes, so keep them short: it is
+# also how long an API process may serve a block orphaned by a reorg.
+BLOCK_CACHE_L1_TTL = float(os.getenv("BLOCK_CACHE_L1_TTL", 60))
+# Busted keys refuse fills this long: longer than a lookup takes from its
+# query to its fill, and than replica lag.
+BLOCK_CACHE_BUST_TTL = float(os.getenv("BLOCK_CACHE_BUST_TTL", 10))
+
+# Rate limiting
+# Token buckets per "route:tier" as capacity/seconds: a bucket holds
+# `capacity` requests and refills at capacity/seconds per second. Tiers are
+# anonymous (per client IP), user and admin (per account). RATE_LIMITS
+# overrides single entries of the defaults; routes or tiers without an
+# entry are not limited.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULTS = (
+    "auth_login:anonymous=10/60,user_register:anonymous=5/600,"
+    "crypto:user=20/1,crypto:admin=100/1"
+)
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+# Take the client IP from X-Forwarded-For; only behind a proxy that sets it.
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+# Admission control
+# Each route gets an adaptive (AIMD) concurrency limit between the min and
+# max, growing while requests finish within the latency target and shrinking
+# when they don't. Requests wait at most ADMISSION_QUEUE_TIMEOUT seconds for
+# a slot, then get a 503 with Retry-After.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", 20))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", 2))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", 200))
+# Per-route maximums as "route template=limit,...", e.g. "/crypto/api/v1/blocks=32"
+ADMISSION_ROUTE_LIMITS = os.getenv("ADMISSION_ROUTE_LIMITS", "")
+ADMISSION_LATENCY_TARGET = float(os.getenv("ADMISSION_LATENCY_TARGET", 0.5))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.5))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 100))
+# Shed everything once this many calls wait for a DB executor thread
+# (0: four per executor thread).
+ADMISSION_DB_QUEUE_LIMIT = int(os.getenv("ADMISSION_DB_QUEUE_LIMIT", 0))
+# Probes and scrapes are never shed.
+ADMISSION_EXEMPT_PATHS = tuple(
+    path.strip() for path in os.getenv("ADMISSION_EXEMPT_PATHS", "/health,/metrics").split(",") if path.strip()
+)
 
-# Logging
-def tokyo_time(*args):  # type: ignore
-    return datetime.now(timezone("Asia/Tokyo")).timetuple()
+# Query time budgets
+# Seconds a request may spend on DB work; also its Postgres statement_timeout
+# (persistent connections only). QUERY_BUDGETS sets per-route budgets as
+# "route template=seconds,..."; 0 disables the budget.
+QUERY_BUDGET_DEFAULT = float(os.getenv("QUERY_BUDGET_DEFAULT", 5))
+QUERY_BUDGETS = os.getenv("QUERY_BUDGETS", "")
+
+# Response compression
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Smaller bodies are sent as-is: compressing them costs more than it saves.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_ENABLED = os.getenv("COMPRESSION_BROTLI_ENABLED", "true").lower() == "true"
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+# Block providers
+# Override to point the fetcher at a mirror or the local simulator
+# (python -m benchmarks.provider_sim).
+BLOCKCHAIR_API_URL = os.getenv("BLOCKCHAIR_API_URL", "https://api.blockchair.com")
+BLOCKCHAIR_TIMEOUT = float(os.getenv("BLOCKCHAIR_TIMEOUT", 10))
+# After storing a new block, the stored blocks this many heights below it are
+# checked against the provider's hashes to catch reorganizations (0 disables).
+# Costs one provider request per 10 stored blocks in range.
+REORG_CHECK_DEPTH = int(os.getenv("REORG_CHECK_DEPTH", 64))
+# Full blocks are fetched for stored blocks within REORG_CHECK_DEPTH heights
+# of each new one whose transactions are missing, up to this many per run.
+TRANSACTIONS_ENABLED = os.getenv("TRANSACTIONS_ENABLED", "true").lower() == "true"
+TRANSACTIONS_BLOCKS_PER_RUN = int(os.getenv("TRANSACTIONS_BLOCKS_PER_RUN", 10))
+# Parser processes per worker process (0 parses inline) and the response size
+# from which parsing moves off the worker process.
+BLOCK_PARSE_PROCESSES = int(os.getenv("BLOCK_PARSE_PROCESSES", 2))
+BLOCK_PARSE_POOL_MIN_BYTES = int(os.getenv("BLOCK_PARSE_POOL_MIN_BYTES", 256 * 1024))
+# Rows per COPY (Postgres) or bulk_create batch
+TRANSACTION_COPY_BATCH = int(os.getenv("TRANSACTION_COPY_BATCH", 5000))
+# Every stats response is kept as an IngestEvent. INGEST_PAYLOAD_FIELDS limits
+# the stored keys ("best_block_height,market_price_usd,..."); empty keeps all.
+INGEST_EVENTS_ENABLED = os.getenv("INGEST_EVENTS_ENABLED", "true").lower() == "true"
+INGEST_PAYLOAD_FIELDS = tuple(
+    field.strip() for field in os.getenv("INGEST_PAYLOAD_FIELDS", "").split(",") if field.strip()
+)
+
+# Health checks
+# Readiness results are cached this long so probe storms don't hit the DB.
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", 2))
+HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", 1))
+HEALTH_REDIS_TIMEOUT = float(os.getenv("HEALTH_REDIS_TIMEOUT", 0.5))
+# Ingest is reported stale when the newest block was stored longer ago than this.
+HEALTH_INGEST_MAX_AGE = float(os.getenv("HEALTH_INGEST_MAX_AGE", 300))
+
+# Metrics
+# Port for the Celery worker's Prometheus endpoint (0 disables it).
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", 0))
+
+# SQL profiling
+# Requests sampled at SQL_PROFILE_SAMPLE_RATE (or sending "X-SQL-Profile: 1"
+# when SQL_PROFILE_HEADER_ENABLED) record every statement; slower statements
+# are always captured. The header is off by default: any client could send it.
+SQL_PROFILE_HEADER_ENABLED = os.getenv("SQL_PROFILE_HEADER_ENABLED", "false").lower() == "true"
+SQL_PROFILE_SAMPLE_RATE = float(os.getenv("SQL_PROFILE_SAMPLE_RATE", 0))
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 100))
+SQL_SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SQL_SLOW_QUERY_BUFFER_SIZE", 500))
+SQL_PROFILE_BUFFER_SIZE = int(os.getenv("SQL_PROFILE_BUFFER_SIZE", 100))
+# Same statement from the same call site this many times in one request is flagged as N+1.
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+
+# Redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.25))
 
 
-logging.Formatter.converter = tokyo_time
-logging.config.dictConfig(LOGGING)
+# Logging
+# Applied by django.setup(); see config.log for LOG_MODE / LOG_FORMAT.
+LOGGING_CONFIG = "config.log.configure_logging"
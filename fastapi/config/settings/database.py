@@ -0,0 +1,52 @@
+"""Database connection settings shared by every settings module.
+
+Connections are configured from ``<PREFIX>_*`` environment variables so the
+same helper builds the primary and any additional aliases.
+"""
+
+import os
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+# The API, Celery workers and beat run as separate processes with their own
+# connections. PROCESS_ROLE picks which pool size applies to this process.
+PROCESS_ROLE = os.getenv("PROCESS_ROLE", "api")
+
+DB_POOL_SIZES = {
+    "api": int(os.getenv("DB_POOL_SIZE_API", 10)),
+    "worker": int(os.getenv("DB_POOL_SIZE_WORKER", 4)),
+    "beat": int(os.getenv("DB_POOL_SIZE_BEAT", 1)),
+}
+DB_POOL_SIZE = DB_POOL_SIZES.get(PROCESS_ROLE, DB_POOL_SIZES["api"])
+
+# persistent: one connection per thread, reused for DB_CONN_MAX_AGE seconds
+# pgbouncer:  persistent connections to a transaction-pooling pgbouncer
+DB_POOL_MODES = ("persistent", "pgbouncer")
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "persistent")
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 60))
+
+
+def database_config(prefix: str = "DB", base_dir: Any = "") -> dict[str, Any]:
+    """Build a ``DATABASES`` entry from ``<prefix>_*`` environment variables."""
+    config: dict[str, Any] = {
+        "ENGINE": os.getenv(f"{prefix}_ENGINE", os.getenv("DB_ENGINE", "django.db.backends.postgresql_psycopg2")),
+        "NAME": os.getenv(f"{prefix}_NAME", os.getenv("DB_NAME", os.path.join(base_dir, "db.sqlite3"))),
+        "USER": os.getenv(f"{prefix}_USER", os.getenv("DB_USER", "user")),
+        "PASSWORD": os.getenv(f"{prefix}_PASSWORD", os.getenv("DB_PASSWORD", "password")),
+        "HOST": os.getenv(f"{prefix}_HOST", os.getenv("DB_HOST", "localhost")),
+        "PORT": os.getenv(f"{prefix}_PORT", os.getenv("DB_PORT", "5432")),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        # Ping reused connections before handing them out so a restarted
+        # Postgres doesn't surface as errors on the first query.
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+
+    if DB_POOL_MODE not in DB_POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE must be one of {', '.join(DB_POOL_MODES)}.")
+
+    if DB_POOL_MODE == "pgbouncer":
+        # Server-side cursors don't survive transaction pooling.
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return config
@@ -1,34 +1,31 @@
 import os
 from typing import List
 
-from celery.schedules import crontab
-
 from .base import *  # noqa
+from .database import *  # noqa
 
 DEBUG = True
 
 ALLOWED_HOSTS: List[str] = ["*"]
 
 
-CELERY_BROKER_URL = "redis://redis:6379"
-CELERY_RESULT_BACKEND = "redis://redis:6379"
-
-CELERY_BEAT_SCHEDULE = {
-    "fetch-ethereum-stats-every-minute": {
-        "task": "workers.eth_fetcher.fetch_ethereum_stats", "schedule": crontab(minute="*"),
-    },
-}
-
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
 DATABASES = {
-    "default": {
-        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.postgresql_psycopg2"),
-        "NAME": os.getenv("DB_NAME", os.path.join(BASE_DIR, "db.sqlite3")),
-        "USER": os.getenv("DB_USER", "user"),
-        "PASSWORD": os.getenv("DB_PASSWORD", "password"),
-        "HOST": os.getenv("DB_HOST", "localhost"),
-        "PORT": os.getenv("DB_PORT", "5432"),
-    }
+    "default": database_config("DB", BASE_DIR),
 }
+
+# Read replica for the crypto read API, configured via DB_REPLICA_* (any
+# unset value falls back to its DB_* counterpart). Two SQLite files work for
+# local testing: migrate both with `manage.py migrate --database replica`.
+if os.getenv("DB_REPLICA_HOST") or os.getenv("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **database_config("DB_REPLICA", BASE_DIR),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+
+# The API's ORM threads are its connection pool.
+DB_EXECUTOR_MAX_WORKERS = int(os.getenv("DB_EXECUTOR_MAX_WORKERS", DB_POOL_SIZE))
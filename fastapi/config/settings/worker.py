@@ -0,0 +1,22 @@
+"""Settings for the Celery worker and beat processes.
+
+Workers only use the ORM, so the admin, sessions, messages and static
+files apps (and the middleware and template context wiring for them) are
+left out to keep worker boot from loading the admin stack.
+"""
+
+from .local import *  # noqa
+
+WORKER_EXCLUDED_APPS = {
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WORKER_EXCLUDED_APPS]  # noqa: F405
+
+# No requests are served, so no request middleware or templates.
+MIDDLEWARE: list[str] = []
+TEMPLATES: list[dict] = []
+ROOT_URLCONF = "config.worker_urls"
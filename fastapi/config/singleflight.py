@@ -0,0 +1,34 @@
+"""Coalesce identical concurrent reads into one execution.
+
+The first caller for a key starts the work as a task; callers arriving
+while it runs await the same task instead of repeating it. The task is
+shielded, so a caller that disconnects doesn't cancel the work for the
+others. Results are shared only while in flight; nothing is cached.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from config.metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COALESCED
+
+
+class SingleFlight:
+    """In-flight calls of one kind (``name`` labels the metrics)."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.labels(self.name).inc()
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            SINGLEFLIGHT_COALESCED.labels(self.name).inc()
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,141 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from config.middleware.admission import AdaptiveLimit, parse_route_limits
+
+
+def adaptive_limit(initial: int = 4, **kwargs) -> AdaptiveLimit:
+    options = {"min_limit": 1, "max_limit": 10, "target": 0.5, "backoff": 0.5, **kwargs}
+    return AdaptiveLimit("/test", initial, **options)
+
+
+class AdaptiveLimitTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch("config.middleware.admission.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_initial_clamped(self) -> None:
+        self.assertEqual(adaptive_limit(50).limit, 10)
+        self.assertEqual(adaptive_limit(0).limit, 1)
+
+    def test_fast_completion_while_busy_increases(self) -> None:
+        limit = adaptive_limit(4)
+        limit.in_flight = 2
+        limit.release(0.1)
+        self.assertAlmostEqual(limit.limit, 4.25)
+        self.assertEqual(limit.in_flight, 1)
+
+    def test_fast_completion_while_idle_keeps_limit(self) -> None:
+        limit = adaptive_limit(4)
+        limit.in_flight = 1
+        limit.release(0.1)
+        self.assertEqual(limit.limit, 4)
+
+    def test_increase_capped(self) -> None:
+        limit = adaptive_limit(10)
+        limit.in_flight = 10
+        limit.release(0.1)
+        self.assertEqual(limit.limit, 10)
+
+    def test_slow_completion_decreases_once_per_target(self) -> None:
+        limit = adaptive_limit(8)
+        limit.in_flight = 3
+        limit.release(1.0)
+        limit.release(1.0)
+        self.assertEqual(limit.limit, 4)
+        self.now += 0.5
+        limit.release(1.0)
+        self.assertEqual(limit.limit, 2)
+
+    def test_failure_decreases_to_minimum(self) -> None:
+        limit = adaptive_limit(2, min_limit=2)
+        limit.in_flight = 1
+        limit.release(0.1, failed=True)
+        self.assertEqual(limit.limit, 2)
+
+    def test_release_without_latency_keeps_limit(self) -> None:
+        limit = adaptive_limit(4)
+        limit.in_flight = 4
+        limit.release(None)
+        self.assertEqual((limit.limit, limit.in_flight), (4, 3))
+
+
+class AdaptiveLimitQueueTests(SimpleTestCase):
+    async def test_slots_then_queue_full(self) -> None:
+        limit = adaptive_limit(2)
+        self.assertIsNone(await limit.acquire(1, max_queue=0))
+        self.assertIsNone(await limit.acquire(1, max_queue=0))
+        self.assertEqual(await limit.acquire(1, max_queue=0), "queue_full")
+        self.assertEqual(limit.in_flight, 2)
+
+    async def test_queue_timeout(self) -> None:
+        limit = adaptive_limit(1)
+        await limit.acquire(1, max_queue=1)
+        self.assertEqual(await limit.acquire(0.01, max_queue=1), "queue_timeout")
+        self.assertEqual((limit.in_flight, limit.queued), (1, 0))
+
+    async def test_release_hands_slot_to_first_waiter(self) -> None:
+        limit = adaptive_limit(1)
+        await limit.acquire(1, max_queue=2)
+        first = asyncio.create_task(limit.acquire(1, max_queue=2))
+        second = asyncio.create_task(limit.acquire(1, max_queue=2))
+        await asyncio.sleep(0)
+        self.assertEqual(limit.queued, 2)
+
+        limit.release(None)
+        self.assertIsNone(await first)
+        self.assertFalse(second.done())
+        self.assertEqual(limit.in_flight, 1)
+        limit.release(None)
+        self.assertIsNone(await second)
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        limit = adaptive_limit(1)
+        await limit.acquire(1, max_queue=2)
+        first = asyncio.create_task(limit.acquire(1, max_queue=2))
+        second = asyncio.create_task(limit.acquire(1, max_queue=2))
+        await asyncio.sleep(0)
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertEqual(limit.queued, 1)
+
+        limit.release(None)
+        self.assertIsNone(await second)
+        self.assertEqual(limit.in_flight, 1)
+
+    async def test_slot_handed_to_cancelled_waiter_is_not_lost(self) -> None:
+        limit = adaptive_limit(1)
+        await limit.acquire(1, max_queue=2)
+        first = asyncio.create_task(limit.acquire(1, max_queue=2))
+        second = asyncio.create_task(limit.acquire(1, max_queue=2))
+        await asyncio.sleep(0)
+
+        # The slot goes to the first waiter, whose client disconnects before it runs
+        limit.release(None)
+        first.cancel()
+        try:
+            await first
+        except asyncio.CancelledError:
+            # It gave the slot on to the next waiter
+            self.assertIsNone(await second)
+        else:
+            # wait_for returned the result despite the cancellation: it holds the slot
+            self.assertFalse(second.done())
+            limit.release(None)
+            self.assertIsNone(await second)
+        self.assertEqual(limit.in_flight, 1)
+        limit.release(None)
+        self.assertEqual((limit.in_flight, limit.queued), (0, 0))
+
+
+class ParseRouteLimitsTests(SimpleTestCase):
+    def test_route_limits(self) -> None:
+        self.assertEqual(
+            parse_route_limits("/crypto/api/v1/blocks=32, /auth/token=8,,=3"),
+            {"/crypto/api/v1/blocks": 32, "/auth/token": 8},
+        )
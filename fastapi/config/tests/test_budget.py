@@ -0,0 +1,155 @@
+import asyncio
+import time
+from unittest import mock
+
+import orjson
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from config.budget import (
+    QUERY_CANCELED,
+    BudgetExhausted,
+    QueryTimeout,
+    _budget,
+    parse_budgets,
+    start_budget,
+    statement_timeout_wrapper,
+)
+from config.db import run_db
+from config.middleware.budget import query_timeout_handler
+
+
+class FakeCursor:
+    def __init__(self, executed: list) -> None:
+        self.executed = executed
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def execute(self, sql: str, params: list) -> None:
+        self.executed.append((sql, params))
+
+
+class FakeRawConnection:
+    def __init__(self) -> None:
+        self.executed: list = []
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.executed)
+
+
+class FakeConnection:
+    """The parts of a Django connection the wrapper reads"""
+
+    def __init__(self) -> None:
+        self.connection = FakeRawConnection()
+        self.in_atomic_block = False
+
+
+class BudgetTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        token = _budget.set(None)
+        self.addCleanup(_budget.reset, token)
+
+
+class StatementTimeoutWrapperTests(BudgetTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.connection = FakeConnection()
+        self.execute = mock.Mock(return_value="result")
+
+    def run_statement(self) -> list:
+        result = statement_timeout_wrapper(self.execute, "SELECT 1", None, False, {"connection": self.connection})
+        self.assertEqual(result, "result")
+        return self.connection.connection.executed
+
+    def test_set_once_per_budget(self) -> None:
+        start_budget("/blocks", 2)
+        self.run_statement()
+        self.assertEqual(self.run_statement(), [("SET statement_timeout = %s", [2000])])
+        self.assertEqual(self.execute.call_count, 2)
+
+    def test_not_set_inside_atomic_block(self) -> None:
+        start_budget("/blocks", 2)
+        self.connection.in_atomic_block = True
+        self.assertEqual(self.run_statement(), [])
+
+    def test_reset_outside_budget(self) -> None:
+        start_budget("/blocks", 2)
+        self.run_statement()
+        _budget.set(None)
+        self.assertEqual(self.run_statement()[-1], ("SET statement_timeout = %s", [0]))
+        self.assertEqual(len(self.run_statement()), 2)
+
+    def test_nothing_to_reset_on_fresh_connection(self) -> None:
+        self.assertEqual(self.run_statement(), [])
+
+    def test_set_again_on_new_raw_connection(self) -> None:
+        start_budget("/blocks", 2)
+        self.run_statement()
+        self.connection.connection = FakeRawConnection()
+        self.assertEqual(self.run_statement(), [("SET statement_timeout = %s", [2000])])
+
+
+class RunDbTests(BudgetTestCase):
+    async def test_without_budget(self) -> None:
+        self.assertEqual(await run_db(lambda: 1), 1)
+
+    async def test_budget_spent_before_start(self) -> None:
+        start_budget("/blocks", 0)
+        func = mock.Mock()
+        with self.assertRaises(BudgetExhausted):
+            await run_db(func)
+        func.assert_not_called()
+
+    async def test_deadline(self) -> None:
+        start_budget("/blocks", 0.05)
+        with self.assertRaises(QueryTimeout) as raised:
+            await run_db(time.sleep, 0.3)
+        self.assertNotIsInstance(raised.exception, BudgetExhausted)
+
+    async def test_statement_timeout(self) -> None:
+        start_budget("/blocks", 5)
+
+        def cancelled():
+            try:
+                raise Exception("canceling statement due to statement timeout")
+            except Exception as exc:
+                exc.pgcode = QUERY_CANCELED
+                raise DatabaseError() from exc
+
+        with self.assertRaises(QueryTimeout) as raised:
+            await run_db(cancelled)
+        self.assertNotIsInstance(raised.exception, BudgetExhausted)
+
+    async def test_other_database_errors_pass_through(self) -> None:
+        start_budget("/blocks", 5)
+
+        def broken():
+            raise DatabaseError("connection refused")
+
+        with self.assertRaises(DatabaseError):
+            await run_db(broken)
+
+
+class QueryTimeoutHandlerTests(SimpleTestCase):
+    def test_exhausted_is_503(self) -> None:
+        response = asyncio.run(query_timeout_handler(mock.Mock(), BudgetExhausted()))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], "1")
+
+    def test_timeout_is_504(self) -> None:
+        response = asyncio.run(query_timeout_handler(mock.Mock(), QueryTimeout()))
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(orjson.loads(response.body), {"detail": "The request took too long."})
+
+
+class ParseBudgetsTests(SimpleTestCase):
+    def test_budgets(self) -> None:
+        self.assertEqual(
+            parse_budgets("/crypto/api/v1/blocks=2, /crypto/api/v1/blocks/{block_id}=0.5,,="),
+            {"/crypto/api/v1/blocks": 2.0, "/crypto/api/v1/blocks/{block_id}": 0.5},
+        )
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import warnings
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, override_settings
+
+from app.models.crypto import Block, Currency
+from config.db_router import PRIMARY_DB, REPLICA_DB, ReplicaState, mark_primary_write, replica_reads
+
+
+class FakeRedis:
+    """Just enough of redis-py for the primary write window."""
+
+    def __init__(self) -> None:
+        self.keys: set[str] = set()
+
+    def set(self, key: str, value: object, px: int) -> None:
+        self.keys.add(key)
+
+    def exists(self, key: str) -> int:
+        return int(key in self.keys)
+
+
+def sqlite_database(name: str) -> dict:
+    return {"ENGINE": "django.db.backends.sqlite3", "NAME": name}
+
+
+class RouterTestCase(SimpleTestCase):
+    """Routes against a primary and a replica SQLite file in a temporary directory."""
+
+    replica_name = "replica.sqlite3"
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        databases = {
+            PRIMARY_DB: sqlite_database(os.path.join(directory.name, "default.sqlite3")),
+            REPLICA_DB: sqlite_database(os.path.join(directory.name, self.replica_name)),
+        }
+        connections = ConnectionHandler(databases)
+        self.addCleanup(connections.close_all)
+
+        with warnings.catch_warnings():
+            # Only the router's view of DATABASES changes; its connections are patched below.
+            warnings.simplefilter("ignore")
+            overrides = override_settings(
+                DATABASES=databases,
+                DATABASE_ROUTERS=["config.db_router.ReplicaRouter"],
+                DB_REPLICA_WRITE_WINDOW=60,
+                DB_REPLICA_STATE_CACHE_SECONDS=0,
+                DB_REPLICA_HEALTH_INTERVAL=0,
+            )
+            overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.redis = FakeRedis()
+        for target, value in (
+            ("config.db_router.connections", connections),
+            ("config.db_router.replica_state", ReplicaState()),
+            ("config.db_router.get_redis", lambda: self.redis),
+        ):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class ReplicaRouterTests(RouterTestCase):
+    def test_crypto_reads_use_the_replica(self) -> None:
+        with replica_reads():
+            self.assertEqual(Block.objects.all().db, REPLICA_DB)
+            self.assertEqual(Currency.objects.all().db, REPLICA_DB)
+
+    def test_reads_outside_replica_reads_use_the_primary(self) -> None:
+        self.assertEqual(Block.objects.all().db, PRIMARY_DB)
+
+    def test_other_models_read_from_the_primary(self) -> None:
+        with replica_reads():
+            self.assertEqual(get_user_model().objects.all().db, PRIMARY_DB)
+
+    def test_writes_go_to_the_primary(self) -> None:
+        with replica_reads():
+            self.assertEqual(router.db_for_write(Block), PRIMARY_DB)
+            self.assertEqual(Block.objects.db_manager().select_for_update().db, PRIMARY_DB)
+
+    def test_write_window_pins_reads_to_the_primary(self) -> None:
+        mark_primary_write()
+        with replica_reads():
+            self.assertEqual(Block.objects.all().db, PRIMARY_DB)
+
+    def test_write_window_is_shared_through_redis(self) -> None:
+        # A write made by another process (a worker) pins this one's reads too
+        self.redis.keys.add("db:primary-write")
+        with replica_reads():
+            self.assertEqual(Block.objects.all().db, PRIMARY_DB)
+        self.redis.keys.clear()
+        with replica_reads():
+            self.assertEqual(Block.objects.all().db, REPLICA_DB)
+
+    def test_mark_primary_write_without_replica_is_a_no_op(self) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with override_settings(DATABASES={PRIMARY_DB: settings.DATABASES[PRIMARY_DB]}):
+                mark_primary_write()
+                with replica_reads():
+                    self.assertEqual(Block.objects.all().db, PRIMARY_DB)
+        self.assertFalse(self.redis.keys)
+
+
+class UnhealthyReplicaRouterTests(RouterTestCase):
+    # SQLite can't create a database file in a missing directory
+    replica_name = os.path.join("missing", "replica.sqlite3")
+
+    def test_crypto_reads_fall_back_to_the_primary(self) -> None:
+        with replica_reads(), self.assertLogs("config.db_router", "WARNING"):
+            self.assertEqual(Block.objects.all().db, PRIMARY_DB)
+
+    def test_writes_go_to_the_primary(self) -> None:
+        self.assertEqual(router.db_for_write(Block), PRIMARY_DB)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from redis.exceptions import RedisError
+
+from config.ratelimit import Decision, Limit, MemoryBuckets, RateLimiter, parse_limits, retry_after_header
+
+
+class ParseLimitsTests(SimpleTestCase):
+    def test_limits(self) -> None:
+        self.assertEqual(
+            parse_limits("auth:ip=10/60, crypto:user=100"),
+            {"auth:ip": Limit(10, 60.0), "crypto:user": Limit(100, 1.0)},
+        )
+
+    def test_later_values_override(self) -> None:
+        limits = parse_limits("auth:ip=10/60,register:ip=5/3600", "auth:ip=20/60")
+        self.assertEqual(limits, {"auth:ip": Limit(20, 60.0), "register:ip": Limit(5, 3600.0)})
+
+    def test_blank_parts_skipped(self) -> None:
+        self.assertEqual(parse_limits("", ",auth:ip=,=5/1,"), {})
+
+    def test_rate(self) -> None:
+        self.assertEqual(Limit(10, 5).rate, 2.0)
+
+
+class MemoryBucketsTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch("config.ratelimit.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.buckets = MemoryBuckets(maxsize=2)
+        self.limit = Limit(capacity=3, period=6)  # one token every 2 seconds
+
+    def test_empties_then_refuses(self) -> None:
+        decisions = [self.buckets.take("a", self.limit, 1) for _ in range(4)]
+        self.assertEqual([decision.allowed for decision in decisions], [True, True, True, False])
+        self.assertEqual(decisions[2].remaining, 0)
+        self.assertEqual(decisions[3], Decision(False, 2.0, 0))
+
+    def test_refills_over_time(self) -> None:
+        self.assertTrue(self.buckets.take("a", self.limit, 3).allowed)
+        self.now += 1
+        refused = self.buckets.take("a", self.limit, 1)
+        self.assertFalse(refused.allowed)
+        self.assertAlmostEqual(refused.retry_after, 1.0)
+        self.now += 1
+        self.assertTrue(self.buckets.take("a", self.limit, 1).allowed)
+
+    def test_refill_capped_at_capacity(self) -> None:
+        self.buckets.take("a", self.limit, 1)
+        self.now += 3600
+        self.assertEqual(self.buckets.take("a", self.limit, 1).remaining, 2)
+
+    def test_cost(self) -> None:
+        self.assertTrue(self.buckets.take("a", self.limit, 2).allowed)
+        refused = self.buckets.take("a", self.limit, 2)
+        self.assertFalse(refused.allowed)
+        self.assertAlmostEqual(refused.retry_after, 2.0)
+
+    def test_buckets_per_key(self) -> None:
+        self.buckets.take("a", self.limit, 3)
+        self.assertTrue(self.buckets.take("b", self.limit, 1).allowed)
+
+    def test_least_recently_used_evicted(self) -> None:
+        self.buckets.take("a", self.limit, 3)
+        self.buckets.take("b", self.limit, 3)
+        self.buckets.take("a", self.limit, 0)
+        self.buckets.take("c", self.limit, 3)
+        # "a" kept its empty bucket; "b" was evicted and starts full again
+        self.assertFalse(self.buckets.take("a", self.limit, 1).allowed)
+        self.assertTrue(self.buckets.take("b", self.limit, 3).allowed)
+
+
+class RetryAfterHeaderTests(SimpleTestCase):
+    def test_rounds_up_to_whole_seconds(self) -> None:
+        self.assertEqual(retry_after_header(Decision(False, 0.2, 0)), "1")
+        self.assertEqual(retry_after_header(Decision(False, 1.01, 0)), "2")
+        self.assertEqual(retry_after_header(Decision(False, 0.0, 0)), "1")
+
+
+class RateLimiterTests(SimpleTestCase):
+    async def test_falls_back_to_memory_while_redis_is_down(self) -> None:
+        limiter = RateLimiter()
+        limit = Limit(capacity=1, period=60)
+        with mock.patch("config.ratelimit.get_redis", side_effect=RedisError) as get_redis:
+            self.assertTrue((await limiter.take("a", limit)).allowed)
+            self.assertFalse((await limiter.take("a", limit)).allowed)
+        # Redis is only tried again after the backoff
+        self.assertEqual(get_redis.call_count, 1)
+
+    async def test_cost_capped_at_capacity(self) -> None:
+        limiter = RateLimiter()
+        limiter._skip_until = float("inf")
+        self.assertTrue((await limiter.take("a", Limit(capacity=2, period=60), cost=5)).allowed)
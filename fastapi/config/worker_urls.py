@@ -0,0 +1,3 @@
+"""URLconf for worker processes, which serve no Django views (see config.settings.worker)."""
+
+urlpatterns: list = []
@@ -6,7 +6,8 @@ Run this to test the endpoints after starting the FastAPI server
 import requests
 import json
 
-BASE_URL = "http://localhost:8000/api/v1"
+BASE_URL = "http://localhost:8000"
+CRYPTO_URL = f"{BASE_URL}/crypto/api/v1"
 
 def test_endpoints():
     print("Testing Crypto API Endpoints")
@@ -21,7 +22,7 @@ def test_endpoints():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/register", json=register_data)
+        response = requests.post(f"{BASE_URL}/user/register", json=register_data)
         if response.status_code == 200:
             print("Account created successfully:")
             print(json.dumps(response.json(), indent=2))
@@ -31,27 +32,8 @@ def test_endpoints():
     except Exception as e:
         print(f"Error creating account: {e}")
     
-    # Test 2: Create account (admin)
-    print("\n2. Testing admin account creation...")
-    admin_register_data = {
-        "username": "adminuser",
-        "email": "admin@example.com", 
-        "password": "adminpass123"
-    }
-    
-    try:
-        response = requests.post(f"{BASE_URL}/accounts", json=admin_register_data)
-        if response.status_code == 200:
-            print("Admin account created successfully:")
-            print(json.dumps(response.json(), indent=2))
-        else:
-            print(f"Admin account creation failed: {response.status_code}")
-            print(response.text)
-    except Exception as e:
-        print(f"Error creating admin account: {e}")
-    
-    # Test 3: Login
-    print("\n3. Testing login...")
+    # Test 2: Login
+    print("\n2. Testing login...")
     login_data = {
         "username": "test@example.com",
         "password": "testpass123"
@@ -59,7 +41,7 @@ def test_endpoints():
     
     try:
         response = requests.post(
-            f"{BASE_URL.replace('/api/v1', '')}/auth/login",
+            f"{BASE_URL}/auth/login",
             data=login_data
         )
         if response.status_code == 200:
@@ -75,12 +57,46 @@ def test_endpoints():
         print(f"Error logging in: {e}")
         access_token = None
     
-    # Test 4: Get currencies
-    print("\n4. Testing get currencies...")
     headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+
+    # Test 3: Current user
+    print("\n3. Testing current user...")
+
+    try:
+        response = requests.get(f"{BASE_URL}/user/", headers=headers)
+        if response.status_code == 200:
+            print("Current user:")
+            print(json.dumps(response.json(), indent=2))
+        else:
+            print(f"Failed to get current user: {response.status_code}")
+            print(response.text)
+    except Exception as e:
+        print(f"Error getting current user: {e}")
+
+    # Test 4: Create account (admin only; needs an admin token)
+    print("\n4. Testing admin account creation...")
+    admin_register_data = {
+        "username": "adminuser",
+        "email": "admin@example.com", 
+        "password": "adminpass123"
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/user/accounts", json=admin_register_data, headers=headers)
+        if response.status_code == 200:
+            print("Admin account created successfully:")
+            print(json.dumps(response.json(), indent=2))
+        else:
+            print(f"Admin account creation failed: {response.status_code}")
+            print(response.text)
+    except Exception as e:
+        print(f"Error creating admin account: {e}")
     
+    # Test 5: Get currencies
+    print("\n5. Testing get currencies...")
+
     try:
-        response = requests.get(f"{BASE_URL}/currencies", headers=headers)
+        response = requests.get(f"{CRYPTO_URL}/currencies", headers=headers)
         if response.status_code == 200:
             print("Currencies retrieved:")
             print(json.dumps(response.json(), indent=2))
@@ -90,11 +106,11 @@ def test_endpoints():
     except Exception as e:
         print(f"Error getting currencies: {e}")
     
-    # Test 5: Get providers
-    print("\n5. Testing get providers...")
+    # Test 6: Get providers
+    print("\n6. Testing get providers...")
     
     try:
-        response = requests.get(f"{BASE_URL}/providers", headers=headers)
+        response = requests.get(f"{CRYPTO_URL}/providers", headers=headers)
         if response.status_code == 200:
             print("Providers retrieved:")
             print(json.dumps(response.json(), indent=2))
@@ -104,11 +120,11 @@ def test_endpoints():
     except Exception as e:
         print(f"Error getting providers: {e}")
     
-    # Test 6: Get blocks
-    print("\n6. Testing get blocks...")
+    # Test 7: Get blocks
+    print("\n7. Testing get blocks...")
     
     try:
-        response = requests.get(f"{BASE_URL}/blocks", headers=headers)
+        response = requests.get(f"{CRYPTO_URL}/blocks", headers=headers)
         if response.status_code == 200:
             print("Blocks retrieved:")
             print(json.dumps(response.json(), indent=2))